@@ -12,16 +12,14 @@ from utils.helpers import (
     INACTIVITY_THRESHOLD_DAYS, load_users_from_sheets,
     load_user_pins_from_sheets,
     user_selectbox_with_pin,
-    load_data_from_sheets,
-    load_activity_log,
+    load_user_data_bundle,
+    load_activity_calendar,
     calculate_training_streak,
     get_bodyweight,
-    get_user_1rm,
-    get_working_max,
+    get_strength_matrix,
     calculate_relative_strength,
     estimate_1rm_epley,
     calculate_plates,
-    load_custom_workout_logs,
     render_bug_report_form,
     get_endurance_training_enabled,
     get_workout_count
@@ -107,44 +105,35 @@ if selected_user == USER_PLACEHOLDER:
 # ==================== QUICK STATS OVERVIEW ====================
 # All data comes from Supabase now
 if True:
-    df = load_data_from_sheets(None, user=selected_user)
+    # One batched fetch for everything this page shows
+    bundle = load_user_data_bundle(selected_user)
+    df = bundle["workouts"]
     
     # Check if user has ANY activity (gym workouts, custom workouts, or activity log)
-    activity_df = load_activity_log(selected_user)
-    custom_workout_df = load_custom_workout_logs(selected_user)
+    activity_df = bundle["activity_log"]
+    custom_workout_df = bundle["custom_workout_logs"]
     has_any_data = (len(df) > 0) or (len(activity_df) > 0) or (len(custom_workout_df) > 0)
     
     if len(df) > 0:
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        df['DateOnly'] = df['Date'].dt.date
-        valid_dates = df['DateOnly'].dropna()
-        total_sessions = len(valid_dates.unique())
-        unique_dates_sorted = sorted(valid_dates.unique())
-        current_streak = calculate_training_streak(unique_dates_sorted)
-        last_workout = df['Date'].dropna().max()
-        days_since = (pd.Timestamp.now() - last_workout).days if pd.notna(last_workout) else None
-        df['WeekID'] = df['Date'].dt.to_period('W')
-        active_weeks = len(df['WeekID'].dropna().unique())
+        # Maintained incrementally as workouts sync - no full pass over the frame
+        stats = bundle["stats"]
+        total_sessions = stats["total_sessions"]
+        current_streak = calculate_training_streak(stats["session_days"])
+        days_since = stats["days_since_last"]
+        active_weeks = stats["active_weeks"]
 
         if days_since is not None and days_since >= INACTIVITY_THRESHOLD_DAYS:
             st.warning(f"⏰ It's been {days_since} days since your last logged workout. Head to **Log Workout** to keep the streak alive!")
         elif days_since is None:
             st.info("No dated workouts yet. Log your first session to start earning badges!")
         
-        df_volume = df[~df['Exercise'].str.contains('1RM Test', na=False)]
-        total_volume = (pd.to_numeric(df_volume['Actual_Load_kg'], errors='coerce') *
-                        pd.to_numeric(df_volume['Reps_Per_Set'], errors='coerce') *
-                        pd.to_numeric(df_volume['Sets_Completed'], errors='coerce')).sum()
-        today_date = datetime.now().date()
-        week_start = today_date - timedelta(days=today_date.weekday())
-        df_week = df[(df["DateOnly"] >= week_start) & (df["DateOnly"] <= today_date)]
-        sessions_this_week = len(df_week["DateOnly"].dropna().unique())
+        total_volume = stats["total_volume"]
+        sessions_this_week = stats["sessions_this_week"]
 
         next_workout = None
         try:
-            df_ex = df[df["Exercise"].isin(["Pinch", "Wrist Roller"])].copy()
+            df_ex = df[df["Exercise"].isin(["Pinch", "Wrist Roller"])]
             if len(df_ex) > 0:
-                df_ex["Date"] = pd.to_datetime(df_ex["Date"], errors="coerce")
                 last_row = df_ex.sort_values("Date").iloc[-1]
                 last_ex = last_row["Exercise"]
                 next_workout = "Wrist Roller" if last_ex == "Pinch" else "Pinch"
@@ -163,10 +152,10 @@ if True:
         hero_subtitle = f"{total_sessions} sessions • {active_weeks} active weeks"
         
         # Get endurance mode info
-        endurance_enabled = get_endurance_training_enabled(selected_user)
+        endurance_enabled = get_endurance_training_enabled(selected_user, bundle=bundle)
         endurance_section = ""
         if endurance_enabled:
-            workout_count_edge = get_workout_count(selected_user, "20mm Edge")
+            workout_count_edge = get_workout_count(selected_user, "20mm Edge", bundle=bundle)
             cycle_position = (workout_count_edge % 3) + 1
             next_is_endurance = (workout_count_edge % 3) == 2
             
@@ -249,70 +238,22 @@ if True:
     if has_any_data:
         st.markdown("### 📅 Training Activity Calendar")
         
-        # Load all activities
-        activity_df_cal = load_activity_log(selected_user)
-        workout_df = df if len(df) > 0 else pd.DataFrame()
-            
-        calendar_data = {}
-        
-        # Add gym workouts
-        if len(workout_df) > 0:
-            workout_df["Date"] = pd.to_datetime(workout_df["Date"], errors="coerce").dt.date
-            for date in workout_df["Date"].dropna().unique():
-                calendar_data[str(date)] = "Gym"
-        
-        # Add custom workouts
-        if len(custom_workout_df) > 0:
-            custom_workout_df["Date"] = pd.to_datetime(custom_workout_df["Date"], errors="coerce").dt.date
-            for date in custom_workout_df["Date"].dropna().unique():
-                date_str = str(date)
-                if date_str not in calendar_data:
-                    calendar_data[date_str] = "Custom"
-        
-        # Add climbing and work
-        if len(activity_df_cal) > 0:
-            activity_df_cal["Date"] = pd.to_datetime(activity_df_cal["Date"], errors="coerce").dt.date
-            for _, row in activity_df_cal.iterrows():
-                date_str = str(row["Date"])
-                activity_type = row["ActivityType"]
-                if date_str not in calendar_data:
-                    calendar_data[date_str] = activity_type
-        
-        # Generate calendar
-        today_cal = datetime.now().date()
-        start_date = today_cal - timedelta(days=364)
+        # Last 365 days as one categorical array (gym > custom > activity log), with day counts
+        calendar, calendar_counts = load_activity_calendar(selected_user, days=365)
         
-        squares_list = []
-        for i in range(365):
-            current_date = start_date + timedelta(days=i)
-            date_str = str(current_date)
-            
-            if date_str in calendar_data:
-                activity = calendar_data[date_str]
-                if activity == "Gym":
-                    color = "#667eea"
-                    label = "Gym"
-                elif activity == "Custom":
-                    color = "#14b8a6"
-                    label = "Custom"
-                elif activity == "Climbing":
-                    color = "#4ade80"
-                    label = "Climbing"
-                elif activity == "Board":
-                    color = "#a855f7"
-                    label = "Board"
-                elif activity == "Work":
-                    color = "#fb923c"
-                    label = "Work"
-                else:
-                    color = "#667eea"
-                    label = "Gym"
-            else:
-                color = "#2d2d2d"
-                label = "Rest"
-            
-            square = f'<div title="{current_date.strftime("%Y-%m-%d")} - {label}" style="width: 18px; height: 18px; background: {color}; border-radius: 3px;"></div>'
-            squares_list.append(square)
+        calendar_styles = {
+            "Gym": ("#667eea", "Gym"),
+            "Custom": ("#14b8a6", "Custom"),
+            "Climbing": ("#4ade80", "Climbing"),
+            "Board": ("#a855f7", "Board"),
+            "Work": ("#fb923c", "Work"),
+            "Other": ("#667eea", "Gym"),
+            "Rest": ("#2d2d2d", "Rest"),
+        }
+        squares_list = [
+            f'<div title="{day:%Y-%m-%d} - {calendar_styles[activity][1]}" style="width: 18px; height: 18px; background: {calendar_styles[activity][0]}; border-radius: 3px;"></div>'
+            for day, activity in calendar.items()
+        ]
         
         calendar_html = '<div style="display: flex; flex-wrap: wrap; gap: 4px; max-width: 100%; margin: 20px 0;">' + ''.join(squares_list) + '</div>'
         
@@ -329,11 +270,11 @@ if True:
         
         st.markdown(calendar_html + legend_html, unsafe_allow_html=True)
         
-        gym_days = sum(1 for v in calendar_data.values() if v == "Gym")
-        custom_days = sum(1 for v in calendar_data.values() if v == "Custom")
-        board_days = sum(1 for v in calendar_data.values() if v == "Board")
-        climb_days = sum(1 for v in calendar_data.values() if v == "Climbing")
-        work_days = sum(1 for v in calendar_data.values() if v == "Work")
+        gym_days = calendar_counts["Gym"]
+        custom_days = calendar_counts["Custom"]
+        board_days = calendar_counts["Board"]
+        climb_days = calendar_counts["Climbing"]
+        work_days = calendar_counts["Work"]
         
         col1, col2, col3, col4, col5 = st.columns(5)
         with col1:
@@ -354,13 +295,16 @@ if True:
         st.markdown("### 💪 Your Current Strength")
         st.caption("📊 Based on recent training performance (auto-updated from last 8 weeks)")
         
+        # Stored 1RM and working max for every exercise × arm in one pass
+        strength = get_strength_matrix(bundle["profile"], bundle["workouts"])
+        
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            edge_L_kg = get_working_max(selected_user, "20mm Edge", "L")
-            edge_R_kg = get_working_max(selected_user, "20mm Edge", "R")
-            stored_edge_L_kg = get_user_1rm(selected_user, "20mm Edge", "L")
-            stored_edge_R_kg = get_user_1rm(selected_user, "20mm Edge", "R")
+            edge_L_kg = strength.at[("20mm Edge", "L"), 'Working_Max']
+            edge_R_kg = strength.at[("20mm Edge", "R"), 'Working_Max']
+            stored_edge_L_kg = strength.at[("20mm Edge", "L"), 'Stored_1RM']
+            stored_edge_R_kg = strength.at[("20mm Edge", "R"), 'Stored_1RM']
             
             if edge_L_kg > stored_edge_L_kg + 1:
                 indicator_L = f'<div style="font-size: 11px; color: rgba(255,255,255,0.95); margin-top: 8px; background: rgba(74,222,128,0.35); padding: 6px 10px; border-radius: 8px; text-shadow: 0 1px 2px rgba(0,0,0,0.3);">📈 +{(edge_L_kg - stored_edge_L_kg):.1f}kg from baseline</div>'
@@ -393,10 +337,10 @@ if True:
             """, unsafe_allow_html=True)
         
         with col2:
-            pinch_L_kg = get_working_max(selected_user, "Pinch", "L")
-            pinch_R_kg = get_working_max(selected_user, "Pinch", "R")
-            stored_pinch_L_kg = get_user_1rm(selected_user, "Pinch", "L")
-            stored_pinch_R_kg = get_user_1rm(selected_user, "Pinch", "R")
+            pinch_L_kg = strength.at[("Pinch", "L"), 'Working_Max']
+            pinch_R_kg = strength.at[("Pinch", "R"), 'Working_Max']
+            stored_pinch_L_kg = strength.at[("Pinch", "L"), 'Stored_1RM']
+            stored_pinch_R_kg = strength.at[("Pinch", "R"), 'Stored_1RM']
             
             if pinch_L_kg > stored_pinch_L_kg + 1:
                 indicator_L = f'<div style="font-size: 11px; color: rgba(255,255,255,0.95); margin-top: 8px; background: rgba(74,222,128,0.35); padding: 6px 10px; border-radius: 8px; text-shadow: 0 1px 2px rgba(0,0,0,0.3);">📈 +{(pinch_L_kg - stored_pinch_L_kg):.1f}kg from baseline</div>'
@@ -429,10 +373,10 @@ if True:
             """, unsafe_allow_html=True)
         
         with col3:
-            wrist_L_kg = get_working_max(selected_user, "Wrist Roller", "L")
-            wrist_R_kg = get_working_max(selected_user, "Wrist Roller", "R")
-            stored_wrist_L_kg = get_user_1rm(selected_user, "Wrist Roller", "L")
-            stored_wrist_R_kg = get_user_1rm(selected_user, "Wrist Roller", "R")
+            wrist_L_kg = strength.at[("Wrist Roller", "L"), 'Working_Max']
+            wrist_R_kg = strength.at[("Wrist Roller", "R"), 'Working_Max']
+            stored_wrist_L_kg = strength.at[("Wrist Roller", "L"), 'Stored_1RM']
+            stored_wrist_R_kg = strength.at[("Wrist Roller", "R"), 'Stored_1RM']
             
             if wrist_L_kg > stored_wrist_L_kg + 1:
                 indicator_L = f'<div style="font-size: 11px; color: rgba(255,255,255,0.95); margin-top: 8px; background: rgba(74,222,128,0.35); padding: 6px 10px; border-radius: 8px; text-shadow: 0 1px 2px rgba(0,0,0,0.3);">📈 +{(wrist_L_kg - stored_wrist_L_kg):.1f}kg from baseline</div>'
@@ -1,13 +1,12 @@
 import streamlit as st
 import sys
-import time
 sys.path.append('.')
 from utils.helpers import *
 from utils.helpers import USER_PLACEHOLDER
 from datetime import datetime
 from utils.helpers import (
     is_endurance_workout,
-    increment_workout_count,
+    next_workout_count,
     get_endurance_training_enabled,
     get_workout_count
 )
@@ -47,10 +46,13 @@ if selected_user == USER_PLACEHOLDER:
     st.info("🔒 Select a profile from the sidebar to log a workout.")
     st.stop()
 
+# One batched fetch shared by the modals and the recommendations below
+bundle = load_user_data_bundle(selected_user)
+
 # Bodyweight input
 st.sidebar.markdown("---")
 st.sidebar.subheader("⚖️ Bodyweight")
-current_bw_kg = get_bodyweight(selected_user)
+current_bw_kg = get_bodyweight(selected_user, bundle=bundle)
 
 new_bw_kg = st.sidebar.number_input(
     "Your bodyweight (kg):",
@@ -76,6 +78,41 @@ if 'show_1rm_modal' not in st.session_state:
     st.session_state.show_1rm_modal = False
 if 'selected_activity_type' not in st.session_state:
     st.session_state.selected_activity_type = None
+if 'modal_context' not in st.session_state:
+    st.session_state.modal_context = {}
+
+MODAL_FLAGS = ("show_standard_modal", "show_custom_modal", "show_activity_modal", "show_1rm_modal")
+
+
+def open_modal(flag):
+    """Button callback: show one modal (closing the others) with freshly fetched context"""
+    for name in MODAL_FLAGS:
+        st.session_state[name] = name == flag
+    st.session_state.modal_context = {}
+
+
+def modal_context(key, fetch):
+    """
+    Data a modal needs, fetched once per opening and kept in session state.
+    Dialogs rerun as fragments, so interactions inside them only rerun the
+    dialog body - this keeps those reruns from repeating the lookups too.
+    """
+    if key not in st.session_state.modal_context:
+        st.session_state.modal_context[key] = fetch()
+    return st.session_state.modal_context[key]
+
+
+def set_state(key, value):
+    """Button callback: store a selection without a full-page rerun"""
+    st.session_state[key] = value
+
+
+def add_quick_note(note_text):
+    """Button callback: append a quick tag to the pending session note"""
+    if st.session_state.modal_quick_note:
+        st.session_state.modal_quick_note += f" {note_text}"
+    else:
+        st.session_state.modal_quick_note = note_text
 
 # ==================== MAIN SELECTION GRID ====================
 st.markdown("## 🎯 What would you like to log?")
@@ -96,13 +133,7 @@ with col1:
             </div>
         </div>
     """, unsafe_allow_html=True)
-    if st.button("Log Standard Workout", use_container_width=True, type="primary", key="btn_standard"):
-        # Reset all other modals
-        st.session_state.show_custom_modal = False
-        st.session_state.show_activity_modal = False
-        st.session_state.show_1rm_modal = False
-        st.session_state.show_standard_modal = True
-        st.rerun()
+    st.button("Log Standard Workout", use_container_width=True, type="primary", key="btn_standard", on_click=open_modal, args=("show_standard_modal",))
 
 with col2:
     st.markdown("""
@@ -116,13 +147,7 @@ with col2:
             </div>
         </div>
     """, unsafe_allow_html=True)
-    if st.button("Log Custom Workout", use_container_width=True, type="primary", key="btn_custom"):
-        # Reset all other modals
-        st.session_state.show_standard_modal = False
-        st.session_state.show_activity_modal = False
-        st.session_state.show_1rm_modal = False
-        st.session_state.show_custom_modal = True
-        st.rerun()
+    st.button("Log Custom Workout", use_container_width=True, type="primary", key="btn_custom", on_click=open_modal, args=("show_custom_modal",))
 
 with col3:
     st.markdown("""
@@ -136,13 +161,7 @@ with col3:
             </div>
         </div>
     """, unsafe_allow_html=True)
-    if st.button("Log Activity", use_container_width=True, type="primary", key="btn_activity"):
-        # Reset all other modals
-        st.session_state.show_standard_modal = False
-        st.session_state.show_custom_modal = False
-        st.session_state.show_1rm_modal = False
-        st.session_state.show_activity_modal = True
-        st.rerun()
+    st.button("Log Activity", use_container_width=True, type="primary", key="btn_activity", on_click=open_modal, args=("show_activity_modal",))
 
 st.markdown("")
 
@@ -160,17 +179,11 @@ with col_center:
             </div>
         </div>
     """, unsafe_allow_html=True)
-    if st.button("Update 1RM", use_container_width=True, type="primary", key="btn_1rm"):
-        # Reset all other modals
-        st.session_state.show_standard_modal = False
-        st.session_state.show_custom_modal = False
-        st.session_state.show_activity_modal = False
-        st.session_state.show_1rm_modal = True
-        st.rerun()
+    st.button("Update 1RM", use_container_width=True, type="primary", key="btn_1rm", on_click=open_modal, args=("show_1rm_modal",))
 
 # ==================== MODAL: STANDARD WORKOUT ====================
 @st.dialog("🏋️ Log Standard Workout", width="large")
-def show_standard_workout_modal():
+def show_standard_workout_modal(bundle):
     # Date picker
     workout_date = st.date_input(
         "📅 Workout Date:",
@@ -188,34 +201,32 @@ def show_standard_workout_modal():
         st.session_state.selected_exercise = "20mm Edge"
     
     with col1:
-        if st.button("🖐️ 20mm Edge", use_container_width=True, type="primary" if st.session_state.selected_exercise == "20mm Edge" else "secondary", key="modal_20mm"):
-            st.session_state.selected_exercise = "20mm Edge"
-            st.rerun()
+        st.button("🖐️ 20mm Edge", use_container_width=True, type="primary" if st.session_state.selected_exercise == "20mm Edge" else "secondary", key="modal_20mm", on_click=set_state, args=("selected_exercise", "20mm Edge"))
     
     with col2:
-        if st.button("🤏 Pinch", use_container_width=True, type="primary" if st.session_state.selected_exercise == "Pinch" else "secondary", key="modal_pinch"):
-            st.session_state.selected_exercise = "Pinch"
-            st.rerun()
+        st.button("🤏 Pinch", use_container_width=True, type="primary" if st.session_state.selected_exercise == "Pinch" else "secondary", key="modal_pinch", on_click=set_state, args=("selected_exercise", "Pinch"))
     
     with col3:
-        if st.button("💪 Wrist Roller", use_container_width=True, type="primary" if st.session_state.selected_exercise == "Wrist Roller" else "secondary", key="modal_roller"):
-            st.session_state.selected_exercise = "Wrist Roller"
-            st.rerun()
+        st.button("💪 Wrist Roller", use_container_width=True, type="primary" if st.session_state.selected_exercise == "Wrist Roller" else "secondary", key="modal_roller", on_click=set_state, args=("selected_exercise", "Wrist Roller"))
     
     exercise = st.session_state.selected_exercise
     
-    # Get working max
-    current_1rm_L = get_working_max(selected_user, exercise, "L")
-    current_1rm_R = get_working_max(selected_user, exercise, "R")
+    # Working maxes, last sessions and session type - looked up once per exercise while the modal is open
+    context = modal_context(("standard", selected_user, exercise), lambda: {
+        "1rm_L": get_working_max(selected_user, exercise, "L", bundle=bundle),
+        "1rm_R": get_working_max(selected_user, exercise, "R", bundle=bundle),
+        "last_L": get_last_workout(selected_user, exercise, "L", bundle=bundle),
+        "last_R": get_last_workout(selected_user, exercise, "R", bundle=bundle),
+        "is_endurance": is_endurance_workout(selected_user, exercise, bundle=bundle),
+    })
+    current_1rm_L = context["1rm_L"]
+    current_1rm_R = context["1rm_R"]
     
     st.markdown("---")
     
-    # Get last workout data
-    last_workout_L = get_last_workout(selected_user, exercise, "L")
-    last_workout_R = get_last_workout(selected_user, exercise, "R")
-    
-    # Check if endurance workout
-    is_endurance = is_endurance_workout(selected_user, exercise)
+    last_workout_L = context["last_L"]
+    last_workout_R = context["last_R"]
+    is_endurance = context["is_endurance"]
     
     # Generate suggestions
     suggestion_L = generate_workout_suggestion(last_workout_L, is_endurance)
@@ -413,12 +424,7 @@ def show_standard_workout_modal():
     st.markdown("**Quick Tags:**")
     quick_cols = st.columns(len(QUICK_NOTES))
     for idx, (emoji_label, note_text) in enumerate(QUICK_NOTES.items()):
-        if quick_cols[idx].button(emoji_label, key=f"modal_quick_{note_text}"):
-            if st.session_state.modal_quick_note:
-                st.session_state.modal_quick_note += f" {note_text}"
-            else:
-                st.session_state.modal_quick_note = note_text
-            st.rerun()
+        quick_cols[idx].button(emoji_label, key=f"modal_quick_{note_text}", on_click=add_quick_note, args=(note_text,))
     
     final_notes = (notes + " " + st.session_state.modal_quick_note).strip() if st.session_state.modal_quick_note else notes
     
@@ -431,9 +437,7 @@ def show_standard_workout_modal():
     
     if st.session_state.modal_quick_note or is_endurance:
         st.info(f"📌 {final_notes}")
-        if st.button("🗑️ Clear tags", key="modal_clear_tags"):
-            st.session_state.modal_quick_note = ""
-            st.rerun()
+        st.button("🗑️ Clear tags", key="modal_clear_tags", on_click=set_state, args=("modal_quick_note", ""))
     
     st.markdown("---")
     
@@ -478,18 +482,15 @@ def show_standard_workout_modal():
                 "Notes": final_notes
             }
             
-            success_L = save_workout_to_sheets( workout_data_L)
-            success_R = save_workout_to_sheets( workout_data_R)
+            # Both arms plus the endurance cycle counter in one bulk write
+            session_settings = None
+            if get_endurance_training_enabled(selected_user, bundle=bundle):
+                session_settings = {f"workout_count_{exercise}": next_workout_count(selected_user, exercise, bundle=bundle)}
             
-            if success_L and success_R:
-                if get_endurance_training_enabled(selected_user):
-                    increment_workout_count(selected_user, exercise)
-                
+            if save_workout_session(selected_user, workouts=[workout_data_L, workout_data_R], settings=session_settings):
                 st.session_state.modal_quick_note = ""
                 
-                st.success("✅ Workout logged successfully!")
-                st.balloons()
-                time.sleep(1.5)
+                st.toast("✅ Workout logged successfully!")
                 st.session_state.show_standard_modal = False
                 st.rerun()
             else:
@@ -508,7 +509,7 @@ def show_custom_workout_modal():
     )
     
     # Load user's custom workouts
-    user_workouts = get_user_custom_workouts(selected_user)
+    user_workouts = modal_context(("custom", selected_user), lambda: get_user_custom_workouts(selected_user))
     
     if user_workouts.empty:
         st.warning("You haven't created any custom workouts yet!")
@@ -657,9 +658,7 @@ def show_custom_workout_modal():
             )
             
             if success:
-                st.success(f"✅ {selected_workout_name} logged successfully!")
-                st.balloons()
-                time.sleep(1.5)
+                st.toast(f"✅ {selected_workout_name} logged successfully!")
                 st.session_state.show_custom_modal = False
                 st.rerun()
             else:
@@ -685,19 +684,13 @@ def show_activity_modal():
         st.session_state.selected_activity_type = "Climbing"
     
     with col1:
-        if st.button("🧗 Climbing", use_container_width=True, type="primary" if st.session_state.selected_activity_type == "Climbing" else "secondary", key="modal_act_climb"):
-            st.session_state.selected_activity_type = "Climbing"
-            st.rerun()
+        st.button("🧗 Climbing", use_container_width=True, type="primary" if st.session_state.selected_activity_type == "Climbing" else "secondary", key="modal_act_climb", on_click=set_state, args=("selected_activity_type", "Climbing"))
     
     with col2:
-        if st.button("🎯 Board", use_container_width=True, type="primary" if st.session_state.selected_activity_type == "Board" else "secondary", key="modal_act_board"):
-            st.session_state.selected_activity_type = "Board"
-            st.rerun()
+        st.button("🎯 Board", use_container_width=True, type="primary" if st.session_state.selected_activity_type == "Board" else "secondary", key="modal_act_board", on_click=set_state, args=("selected_activity_type", "Board"))
     
     with col3:
-        if st.button("💪 Work Pullups", use_container_width=True, type="primary" if st.session_state.selected_activity_type == "Work" else "secondary", key="modal_act_work"):
-            st.session_state.selected_activity_type = "Work"
-            st.rerun()
+        st.button("💪 Work Pullups", use_container_width=True, type="primary" if st.session_state.selected_activity_type == "Work" else "secondary", key="modal_act_work", on_click=set_state, args=("selected_activity_type", "Work"))
     
     st.markdown("---")
     
@@ -740,9 +733,7 @@ def show_activity_modal():
         if st.button(f"✅ Log {activity_type}", type="primary", use_container_width=True, key="modal_activity_submit"):
             if log_activity_to_sheets(selected_user, activity_type, activity_duration, activity_notes, activity_date):
                 duration_text = f" ({activity_duration} min)" if activity_duration else ""
-                st.success(f"✅ {activity_type} session logged for {activity_date.strftime('%Y-%m-%d')}!{duration_text}")
-                st.balloons()
-                time.sleep(1.5)
+                st.toast(f"✅ {activity_type} session logged for {activity_date.strftime('%Y-%m-%d')}!{duration_text}")
                 st.session_state.show_activity_modal = False
                 st.rerun()
             else:
@@ -750,7 +741,7 @@ def show_activity_modal():
 
 # ==================== MODAL: 1RM UPDATE ====================
 @st.dialog("🏆 Update 1RM", width="large")
-def show_1rm_modal():
+def show_1rm_modal(bundle):
     # Date picker
     workout_date = st.date_input(
         "📅 Test Date:",
@@ -779,8 +770,10 @@ def show_1rm_modal():
         label_visibility="collapsed"
     )
     
-    current_1rm_L_test = get_user_1rm(selected_user, test_exercise, "L")
-    current_1rm_R_test = get_user_1rm(selected_user, test_exercise, "R")
+    current_1rm_L_test, current_1rm_R_test = modal_context(("1rm", selected_user, test_exercise), lambda: (
+        get_user_1rm(selected_user, test_exercise, "L", bundle=bundle),
+        get_user_1rm(selected_user, test_exercise, "R", bundle=bundle),
+    ))
     
     st.markdown("---")
     st.markdown("### 📊 Current 1RMs")
@@ -868,70 +861,53 @@ def show_1rm_modal():
     
     with col_submit:
         if st.button("🏆 Update 1RMs", type="primary", use_container_width=True, key="modal_1rm_submit"):
-            # Update 1RMs in Supabase via set_user_1rm
-            success_L = set_user_1rm(selected_user, test_exercise, "L", new_1rm_L)
-            success_R = set_user_1rm(selected_user, test_exercise, "R", new_1rm_R)
-            
-            if not success_L or not success_R:
-                failed_arms = []
-                if not success_L:
-                    failed_arms.append("Left")
-                if not success_R:
-                    failed_arms.append("Right")
-                st.error(f"❌ Failed to update 1RM for {' and '.join(failed_arms)} arm(s). Check the terminal for details.")
-            elif success_L and success_R:
-                if log_test_as_workout:
-                    workout_data_L = {
-                        "User": selected_user,
-                        "Date": workout_date.strftime("%Y-%m-%d"),
-                        "Exercise": f"1RM Test - {test_exercise}",
-                        "Arm": "L",
-                        "Actual_Load_kg": new_1rm_L,
-                        "Reps_Per_Set": 1,
-                        "Sets_Completed": 1,
-                        "Notes": test_notes if test_notes else ""
-                    }
-                    
-                    workout_data_R = {
+            # Both arms' 1RMs (and optionally the test itself) in one bulk write
+            test_workouts = []
+            if log_test_as_workout:
+                test_workouts = [
+                    {
                         "User": selected_user,
                         "Date": workout_date.strftime("%Y-%m-%d"),
                         "Exercise": f"1RM Test - {test_exercise}",
-                        "Arm": "R",
-                        "Actual_Load_kg": new_1rm_R,
+                        "Arm": arm,
+                        "Actual_Load_kg": new_1rm,
                         "Reps_Per_Set": 1,
                         "Sets_Completed": 1,
                         "Notes": test_notes if test_notes else ""
                     }
-                    
-                    workout_success_L = save_workout_to_sheets(workout_data_L)
-                    workout_success_R = save_workout_to_sheets(workout_data_R)
-                    
-                    if not workout_success_L or not workout_success_R:
-                        st.warning("⚠️ 1RMs updated but failed to log as workout. Check terminal for details.")
-                
-                st.success("✅ 1RMs updated successfully!")
-                st.balloons()
-                time.sleep(1.5)
+                    for arm, new_1rm in (("L", new_1rm_L), ("R", new_1rm_R))
+                ]
+            
+            success = save_workout_session(
+                selected_user,
+                workouts=test_workouts,
+                one_rep_maxes={(test_exercise, "L"): new_1rm_L, (test_exercise, "R"): new_1rm_R},
+            )
+            
+            if not success:
+                st.error("❌ Failed to update 1RMs. Please try again.")
+            else:
+                st.toast("✅ 1RMs updated successfully!")
                 st.session_state.show_1rm_modal = False
                 st.rerun()
 
 # Show appropriate modal (only one at a time)
 if st.session_state.show_standard_modal:
-    show_standard_workout_modal()
+    show_standard_workout_modal(bundle)
 elif st.session_state.show_custom_modal:
     show_custom_workout_modal()
 elif st.session_state.show_activity_modal:
     show_activity_modal()
 elif st.session_state.show_1rm_modal:
-    show_1rm_modal()
+    show_1rm_modal(bundle)
 
 # ==================== WEIGHT RECOMMENDATIONS ====================
 st.markdown("---")
 st.markdown("## 💡 Recommended Weights for Next Session")
 
 # Check if endurance mode is enabled and determine next workout type
-endurance_enabled = get_endurance_training_enabled(selected_user)
-workout_count_edge = get_workout_count(selected_user, "20mm Edge")
+endurance_enabled = get_endurance_training_enabled(selected_user, bundle=bundle)
+workout_count_edge = get_workout_count(selected_user, "20mm Edge", bundle=bundle)
 is_next_endurance = endurance_enabled and (workout_count_edge % 3) == 2
 
 # Display info banner
@@ -941,14 +917,13 @@ elif endurance_enabled:
     st.info(f"💪 **Next Edge session is Strength** - Use 80% of max (session {(workout_count_edge % 3) + 1}/3)")
 
 # Load recent workout data for the user
-df_recent = load_data_from_sheets(None, selected_user)
+df_recent = bundle["workouts"]
 
 # Determine which accessory exercise is next (Pinch or Wrist Roller alternate)
 next_accessory = "Pinch"  # Default
 if not df_recent.empty:
-    df_accessory = df_recent[df_recent['Exercise'].isin(["Pinch", "Wrist Roller"])].copy()
+    df_accessory = df_recent[df_recent['Exercise'].isin(["Pinch", "Wrist Roller"])]
     if len(df_accessory) > 0:
-        df_accessory['Date'] = pd.to_datetime(df_accessory['Date'], errors='coerce')
         last_accessory_row = df_accessory.sort_values('Date').iloc[-1]
         last_accessory = last_accessory_row['Exercise']
         next_accessory = "Wrist Roller" if last_accessory == "Pinch" else "Pinch"
@@ -983,8 +958,6 @@ if not df_recent.empty:
             df_ex = df_recent[df_recent['Exercise'] == exercise].copy()
             
             if not df_ex.empty:
-                df_ex['Date'] = pd.to_datetime(df_ex['Date'], errors='coerce')
-                
                 # Determine if this is the exercise affected by endurance mode
                 is_edge_exercise = exercise == "20mm Edge"
                 show_endurance_weights = is_edge_exercise and is_next_endurance
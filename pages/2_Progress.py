@@ -3,6 +3,13 @@ import sys
 sys.path.append('.')
 from utils.helpers import *
 from utils.helpers import USER_PLACEHOLDER
+from utils.charts import (
+    build_load_figure,
+    build_relative_strength_figure,
+    build_custom_metric_figure,
+    DOWNSAMPLE_POINTS,
+    AGGREGATE_METRICS,
+)
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -49,11 +56,11 @@ if selected_user == USER_PLACEHOLDER:
 # Load data
 # All data comes from Supabase now
 if True:
-    df = load_data_from_sheets(None, user=selected_user)
+    bundle = load_user_data_bundle(selected_user)
+    df = bundle["workouts"]
     
     if len(df) > 0:
-        # Convert date column
-        df['Date'] = pd.to_datetime(df['Date'])
+        # Dates are already parsed by the loader
         df = df.sort_values('Date')
         
         # Filter options in colorful sidebar
@@ -106,8 +113,8 @@ if True:
             """, unsafe_allow_html=True)
         
         with col3:
-            total_reps = (pd.to_numeric(df_filtered['Reps_Per_Set'], errors='coerce') * 
-                         pd.to_numeric(df_filtered['Sets_Completed'], errors='coerce')).sum()
+            # Widen before multiplying so large totals cannot overflow int16; missing counts are skipped
+            total_reps = (df_filtered['Reps_Per_Set'].astype('Int64') * df_filtered['Sets_Completed']).sum()
             st.markdown(f"""
                 <div class='stat-card' style='background: linear-gradient(135deg, #e1306c 0%, #f77737 100%); 
                 padding: 22px; border-radius: 16px; text-align: center; box-shadow: 0 8px 25px rgba(250,112,154,0.5);
@@ -120,11 +127,9 @@ if True:
             # Total volume (excluding 1RM tests)
         with col4:
             # Filter out 1RM tests
-            df_filtered = df[~df['Exercise'].str.contains('1RM Test', na=False)]
+            df_filtered = df_filtered[~df_filtered['Exercise'].str.contains('1RM Test', na=False)]
             
-            total_volume_kg = (pd.to_numeric(df_filtered['Actual_Load_kg'], errors='coerce') *
-                           pd.to_numeric(df_filtered['Reps_Per_Set'], errors='coerce') *
-                           pd.to_numeric(df_filtered['Sets_Completed'], errors='coerce')).sum()
+            total_volume_kg = (df_filtered['Actual_Load_kg'] * df_filtered['Reps_Per_Set'] * df_filtered['Sets_Completed']).sum()
             
             st.markdown(f"""
                 <div class='stat-card' style='background: linear-gradient(135deg, #30cfd0 0%, #330867 100%);
@@ -148,103 +153,43 @@ if True:
             help="Endurance sessions (55% max, repeaters) will be shown with dotted lines and smaller markers to distinguish them from strength sessions (80% max)."
         )
         
-        # Identify endurance sessions
-        endurance_mask = pd.Series(False, index=df_filtered.index)
-        if 'Notes' in df_filtered.columns:
-            df_filtered['_notes_lower'] = df_filtered['Notes'].fillna('').astype(str).str.lower()
-            endurance_mask = df_filtered['_notes_lower'].str.contains('endurance|repeater')
-            df_filtered = df_filtered.drop(columns=['_notes_lower'])
-        
-        # Split data into strength and endurance
-        df_strength = df_filtered[~endurance_mask].copy() if show_endurance_style else df_filtered.copy()
-        df_endurance = df_filtered[endurance_mask].copy() if show_endurance_style else pd.DataFrame()
-        
-        # Group by date and exercise for both datasets
-        df_chart_strength = df_strength.groupby(['Date', 'Exercise', 'Arm'])['Actual_Load_kg'].mean().reset_index()
-        df_chart_endurance = df_endurance.groupby(['Date', 'Exercise', 'Arm'])['Actual_Load_kg'].mean().reset_index() if not df_endurance.empty else pd.DataFrame()
-        
-        # Use kg values directly
-        df_chart_strength['Actual_Load_Display'] = df_chart_strength['Actual_Load_kg']
-        if not df_chart_endurance.empty:
-            df_chart_endurance['Actual_Load_Display'] = df_chart_endurance['Actual_Load_kg']
-        
-        # Create beautiful plotly chart with custom colors
-        fig = go.Figure()
-        
-        # Define vibrant colors for each exercise-arm combination
-        color_map = {
-            '20mm Edge_L': '#4facfe',  # Bright blue
-            '20mm Edge_R': '#00c9ff',  # Cyan
-            'Pinch_L': '#f093fb',      # Pink
-            'Pinch_R': '#f5576c',      # Red-pink
-            'Wrist Roller_L': '#a8e063',  # Light green
-            'Wrist Roller_R': '#56ab2f',  # Dark green
-        }
-        
-        # Add strength sessions (solid lines)
-        for exercise in df_chart_strength['Exercise'].unique():
-            for arm in df_chart_strength['Arm'].unique():
-                df_subset = df_chart_strength[(df_chart_strength['Exercise'] == exercise) & (df_chart_strength['Arm'] == arm)]
-                
-                if len(df_subset) > 0:
-                    color_key = f'{exercise}_{arm}'
-                    color = color_map.get(color_key, '#ffffff')
-                    
-                    fig.add_trace(go.Scatter(
-                        x=df_subset['Date'],
-                        y=df_subset['Actual_Load_Display'],
-                        mode='lines+markers',
-                        name=f'{exercise} - {arm}',
-                        line=dict(color=color, width=3),
-                        marker=dict(size=10, color=color, 
-                                  line=dict(color='white', width=2))
-                    ))
-        
-        # Add endurance sessions (dotted lines, smaller markers)
-        if show_endurance_style and not df_chart_endurance.empty:
-            for exercise in df_chart_endurance['Exercise'].unique():
-                for arm in df_chart_endurance['Arm'].unique():
-                    df_subset = df_chart_endurance[(df_chart_endurance['Exercise'] == exercise) & (df_chart_endurance['Arm'] == arm)]
-                    
-                    if len(df_subset) > 0:
-                        color_key = f'{exercise}_{arm}'
-                        base_color = color_map.get(color_key, '#ffffff')
-                        
-                        fig.add_trace(go.Scatter(
-                            x=df_subset['Date'],
-                            y=df_subset['Actual_Load_Display'],
-                            mode='lines+markers',
-                            name=f'{exercise} - {arm} (Endurance)',
-                            line=dict(color=base_color, width=2, dash='dot'),
-                            marker=dict(size=7, color=base_color, opacity=0.6,
-                                      line=dict(color='white', width=1),
-                                      symbol='square'),
-                            opacity=0.7
-                        ))
+        # Charted from the precomputed daily/weekly/monthly aggregates
+        col_granularity, col_metric = st.columns(2)
+        with col_granularity:
+            granularity = st.radio(
+                "Granularity:",
+                ["Daily", "Weekly", "Monthly"],
+                horizontal=True,
+                key="progress_granularity"
+            )
+        with col_metric:
+            chart_metric = st.selectbox(
+                "Metric:",
+                list(AGGREGATE_METRICS.keys()),
+                format_func=lambda metric: AGGREGATE_METRICS[metric],
+                key="progress_chart_metric"
+            )
         
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='white', size=14),
-            xaxis=dict(
-                showgrid=True,
-                gridcolor='rgba(255,255,255,0.1)',
-                title='Date',
-                title_font=dict(size=16, color='white')
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridcolor='rgba(255,255,255,0.1)',
-                title='Load (kg)',
-                title_font=dict(size=16, color='white')
-            ),
-            height=500,
-            hovermode='x unified',
-            legend=dict(
-                bgcolor='rgba(0,0,0,0.5)',
-                bordercolor='rgba(255,255,255,0.3)',
-                borderwidth=1
+        # Long histories are downsampled (peaks kept) unless raw data is requested
+        show_raw_points = False
+        if len(df_filtered) > DOWNSAMPLE_POINTS:
+            show_raw_points = st.checkbox(
+                "🔬 Show every data point",
+                value=False,
+                help="Long histories are thinned out to keep charts fast. Peaks and PRs are always kept."
             )
+        
+        # Figures are rebuilt only when the user, filters, style or workout data change
+        workouts_version = user_data_version(selected_user, ("workouts",))
+        fig = build_load_figure(
+            selected_user,
+            selected_exercise,
+            selected_arm,
+            show_endurance_style,
+            show_raw_points,
+            chart_metric,
+            (granularity, workouts_version),
+            get_workout_aggregates(selected_user, granularity.lower()),
         )
         
         st.plotly_chart(fig, use_container_width=True)
@@ -256,106 +201,29 @@ if True:
         st.caption("💡 Your strength divided by bodyweight. Higher = better climbing performance!")
         
         # Get bodyweight history
-        bw_history = get_bodyweight_history(selected_user)
+        bw_history = get_bodyweight_history(selected_user, bundle=bundle)
+        
+        relative = build_relative_strength_figure(
+            selected_user,
+            selected_exercise,
+            selected_arm,
+            get_bodyweight(selected_user, bundle=bundle),
+            show_raw_points,
+            # History is append-only: its length and latest entry identify it
+            (workouts_version, len(bw_history), bw_history['Bodyweight_kg'].iloc[-1] if len(bw_history) else None),
+            df,
+            bw_history,
+        )
         
-        if not bw_history.empty and len(df_filtered) > 0:
-            # Create a merged dataframe with workout loads and bodyweight
-            df_strength = df_filtered[['Date', 'Exercise', 'Arm', 'Actual_Load_kg']].copy()
-            
-            # For each workout date, find the most recent bodyweight
-            df_strength['Bodyweight_kg'] = df_strength['Date'].apply(
-                lambda x: bw_history[bw_history['Date'] <= x]['Bodyweight_kg'].iloc[-1] 
-                if len(bw_history[bw_history['Date'] <= x]) > 0 
-                else get_bodyweight(selected_user)
-            )
-            
-            # Calculate relative strength (load / bodyweight)
-            df_strength['Relative_Strength'] = df_strength['Actual_Load_kg'] / df_strength['Bodyweight_kg']
-            
-            # Group by date, exercise, and arm
-            df_rel = df_strength.groupby(['Date', 'Exercise', 'Arm']).agg({
-                'Relative_Strength': 'mean',
-                'Bodyweight_kg': 'first'
-            }).reset_index()
-            
-            # Create figure with two y-axes
-            fig3 = go.Figure()
-            
-            # Add relative strength traces
-            colors = {'L': '#4facfe', 'R': '#f093fb'}
-            
-            for exercise in df_rel['Exercise'].unique():
-                for arm in df_rel['Arm'].unique():
-                    df_subset = df_rel[(df_rel['Exercise'] == exercise) & (df_rel['Arm'] == arm)]
-                    
-                    if len(df_subset) > 0:
-                        fig3.add_trace(go.Scatter(
-                            x=df_subset['Date'],
-                            y=df_subset['Relative_Strength'],
-                            mode='lines+markers',
-                            name=f'{exercise} - {arm} (Relative)',
-                            line=dict(color=colors.get(arm, '#ffffff'), width=3),
-                            marker=dict(size=10, color=colors.get(arm, '#ffffff'),
-                                      line=dict(color='white', width=2)),
-                            yaxis='y'
-                        ))
-            
-            # Add bodyweight trace on secondary y-axis
-            if len(bw_history) > 1:
-                bw_history['Bodyweight_Display'] = bw_history['Bodyweight_kg']
-                
-                fig3.add_trace(go.Scatter(
-                    x=bw_history['Date'],
-                    y=bw_history['Bodyweight_Display'],
-                    mode='lines+markers',
-                    name='Bodyweight',
-                    line=dict(color='#fbbf24', width=2, dash='dash'),
-                    marker=dict(size=8, color='#fbbf24'),
-                    yaxis='y2'
-                ))
-            
-            fig3.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white', size=14),
-                xaxis=dict(
-                    showgrid=True,
-                    gridcolor='rgba(255,255,255,0.1)',
-                    title='Date',
-                    title_font=dict(size=16, color='white')
-                ),
-                yaxis=dict(
-                    showgrid=True,
-                    gridcolor='rgba(255,255,255,0.1)',
-                    title='Relative Strength (Load/BW)',
-                    title_font=dict(size=16, color='white'),
-                    side='left'
-                ),
-                yaxis2=dict(
-                    showgrid=False,
-                    title='Bodyweight (kg)',
-                    title_font=dict(size=16, color='#fbbf24'),
-                    overlaying='y',
-                    side='right',
-                    tickfont=dict(color='#fbbf24')
-                ),
-                height=500,
-                hovermode='x unified',
-                legend=dict(
-                    bgcolor='rgba(0,0,0,0.5)',
-                    bordercolor='rgba(255,255,255,0.3)',
-                    borderwidth=1
-                )
-            )
-            
-            st.plotly_chart(fig3, use_container_width=True)
+        if relative is not None:
+            st.plotly_chart(relative["figure"], use_container_width=True)
             
             # Show relative strength stats
             col_rel1, col_rel2, col_rel3 = st.columns(3)
             
-            current_rel = df_rel['Relative_Strength'].iloc[-1] if len(df_rel) > 0 else 0
-            max_rel = df_rel['Relative_Strength'].max() if len(df_rel) > 0 else 0
-            avg_rel = df_rel['Relative_Strength'].mean() if len(df_rel) > 0 else 0
+            current_rel = relative["current"]
+            max_rel = relative["max"]
+            avg_rel = relative["mean"]
             
             with col_rel1:
                 st.markdown(f"""
@@ -414,7 +282,7 @@ if True:
                 )
                 
                 # Load custom workout logs
-                custom_logs = load_custom_workout_logs(selected_user)
+                custom_logs = bundle["custom_workout_logs"]
                 
                 # Filter by selected workout
                 custom_logs = custom_logs[
@@ -447,63 +315,31 @@ if True:
                     
                     st.write(", ".join(tracked_metrics))
                     
-                    # Convert date and sort
-                    custom_logs['Date'] = pd.to_datetime(custom_logs['Date'])
+                    # Sort by (already parsed) date
                     custom_logs = custom_logs.sort_values('Date')
                     
                     # Create graphs based on tracked metrics
                     st.markdown("### 📈 Progress Charts")
                     
-                    # Weight progression
-                    if workout_template['TracksWeight']:
-                            # Use kg values directly
-                            custom_logs['Weight_Display'] = custom_logs['Weight']
-                            
-                            fig_weight = px.line(
-                                custom_logs, 
-                                x='Date', 
-                                y='Weight_Display',
-                                title=f"Weight Progression - {selected_custom_workout}",
-                                markers=True
-                            )
-                            fig_weight.update_layout(
-                                xaxis_title="Date",
-                                yaxis_title="Weight (kg)",
-                                hovermode='x unified'
-                            )
-                            st.plotly_chart(fig_weight, use_container_width=True)
-                    
-                    # Duration progression
-                    if workout_template['TracksDuration']:
-                            fig_duration = px.line(
-                                custom_logs,
-                                x='Date',
-                                y='Duration_min',
-                                title=f"Duration Progression - {selected_custom_workout}",
-                                markers=True
-                            )
-                            fig_duration.update_layout(
-                                xaxis_title="Date",
-                                yaxis_title="Duration (minutes)",
-                                hovermode='x unified'
-                            )
-                            st.plotly_chart(fig_duration, use_container_width=True)
-                        
-                    # Distance progression
-                    if workout_template['TracksDistance']:
-                            fig_distance = px.line(
+                    # Cached per workout and log data; switching workouts reuses earlier builds
+                    logs_version = user_data_version(selected_user, ("custom_workout_logs",))
+                    metric_charts = [
+                        ('TracksWeight', 'Weight', "Weight Progression", "Weight (kg)"),
+                        ('TracksDuration', 'Duration', "Duration Progression", "Duration (minutes)"),
+                        ('TracksDistance', 'Distance', "Distance Progression", "Distance (km)"),
+                    ]
+                    for track_flag, column, title, y_title in metric_charts:
+                        if workout_template[track_flag]:
+                            fig_metric = build_custom_metric_figure(
+                                selected_user,
+                                selected_custom_workout,
+                                column,
+                                f"{title} - {selected_custom_workout}",
+                                y_title,
+                                logs_version,
                                 custom_logs,
-                                x='Date',
-                                y='Distance_km',
-                                title=f"Distance Progression - {selected_custom_workout}",
-                                markers=True
-                            )
-                            fig_distance.update_layout(
-                                xaxis_title="Date",
-                                yaxis_title="Distance (km)",
-                                hovermode='x unified'
                             )
-                            st.plotly_chart(fig_distance, use_container_width=True)
+                            st.plotly_chart(fig_metric, use_container_width=True)
                     
                     # Display stats cards
                     st.markdown("### 📊 Stats Summary")
@@ -519,20 +355,20 @@ if True:
                     if workout_template['TracksWeight'] and workout_template['TracksSets'] and workout_template['TracksReps']:
                         with stat_cols[col_idx % 4]:
                             max_volume = (custom_logs['Weight'] * custom_logs['Sets'] * custom_logs['Reps']).max()
-                            st.metric("Max Volume", f"{int(max_volume)} kg")
+                            st.metric("Max Volume", f"{int(max_volume)} kg" if pd.notna(max_volume) else "-")
                             col_idx += 1
                     
                     if workout_template['TracksDuration']:
                         with stat_cols[col_idx % 4]:
-                            max_duration = custom_logs['Duration_min'].max()
-                            total_duration = custom_logs['Duration_min'].sum()
+                            max_duration = custom_logs['Duration'].max()
+                            total_duration = custom_logs['Duration'].sum()
                             st.metric("Max Duration", f"{max_duration:.0f} min")
                             col_idx += 1
                     
                     if workout_template['TracksDistance']:
                             with stat_cols[col_idx % 4]:
-                                max_distance = custom_logs['Distance_km'].max()
-                                total_distance = custom_logs['Distance_km'].sum()
+                                max_distance = custom_logs['Distance'].max()
+                                total_distance = custom_logs['Distance'].sum()
                                 st.metric("Max Distance", f"{max_distance:.1f} km")
                                 col_idx += 1
                         
@@ -548,9 +384,9 @@ if True:
                     if workout_template['TracksReps']:
                         display_cols.append('Reps')
                     if workout_template['TracksDuration']:
-                        display_cols.append('Duration_min')
+                        display_cols.append('Duration')
                     if workout_template['TracksDistance']:
-                        display_cols.append('Distance_km')
+                        display_cols.append('Distance')
                     if workout_template['TracksRPE']:
                         display_cols.append('RPE')
                     display_cols.append('Notes')
@@ -14,7 +14,7 @@ inject_global_styles()
 
 # ==================== SETTINGS MODAL ====================
 @st.dialog("⚙️ Weekly Goals Settings", width="large")
-def goals_settings_modal(selected_user):
+def goals_settings_modal(selected_user, bundle):
     """Modal for customizing weekly training goals"""
     st.markdown("Customize your weekly training targets")
     
@@ -28,14 +28,14 @@ def goals_settings_modal(selected_user):
     }
     
     # Load current settings
-    goal1_type = get_user_setting(selected_user, "weekly_goal_1_type", "Gym")
-    goal1_target = get_user_setting(selected_user, "weekly_goal_1_target", 3)
+    goal1_type = get_user_setting(selected_user, "weekly_goal_1_type", "Gym", bundle=bundle)
+    goal1_target = get_user_setting(selected_user, "weekly_goal_1_target", 3, bundle=bundle)
     
-    goal2_type = get_user_setting(selected_user, "weekly_goal_2_type", "Board")
-    goal2_target = get_user_setting(selected_user, "weekly_goal_2_target", 1)
+    goal2_type = get_user_setting(selected_user, "weekly_goal_2_type", "Board", bundle=bundle)
+    goal2_target = get_user_setting(selected_user, "weekly_goal_2_target", 1, bundle=bundle)
     
-    goal3_type = get_user_setting(selected_user, "weekly_goal_3_type", "Climbing")
-    goal3_target = get_user_setting(selected_user, "weekly_goal_3_target", 3)
+    goal3_type = get_user_setting(selected_user, "weekly_goal_3_type", "Climbing", bundle=bundle)
+    goal3_target = get_user_setting(selected_user, "weekly_goal_3_target", 3, bundle=bundle)
     
     st.markdown("#### Goal 1")
     col1, col2 = st.columns([2, 1])
@@ -75,14 +75,17 @@ def goals_settings_modal(selected_user):
     
     if st.button("💾 Save Settings", use_container_width=True, type="primary"):
         with st.spinner("Saving settings..."):
-            set_user_setting(selected_user, "weekly_goal_1_type", new_goal1_type)
-            set_user_setting(selected_user, "weekly_goal_1_target", new_goal1_target)
-            set_user_setting(selected_user, "weekly_goal_2_type", new_goal2_type)
-            set_user_setting(selected_user, "weekly_goal_2_target", new_goal2_target)
-            set_user_setting(selected_user, "weekly_goal_3_type", new_goal3_type)
-            set_user_setting(selected_user, "weekly_goal_3_target", new_goal3_target)
-            st.success("✅ Settings saved!")
-            st.rerun()
+            saved = set_user_settings(selected_user, {
+                "weekly_goal_1_type": new_goal1_type,
+                "weekly_goal_1_target": new_goal1_target,
+                "weekly_goal_2_type": new_goal2_type,
+                "weekly_goal_2_target": new_goal2_target,
+                "weekly_goal_3_type": new_goal3_type,
+                "weekly_goal_3_target": new_goal3_target,
+            }, bundle=bundle)
+            if saved:
+                st.success("✅ Settings saved!")
+                st.rerun()
 
 # ==================== HEADER ====================
 st.markdown("""
@@ -116,17 +119,19 @@ if selected_user == USER_PLACEHOLDER:
     st.info("🔒 Select a profile from the sidebar to view training goals.")
     st.stop()
 
+# Load data - one batched fetch shared by the settings modal and the page
+bundle = load_user_data_bundle(selected_user)
+
 # Settings button in the top right (after user is selected)
 col_left, col_right = st.columns([6, 1])
 with col_right:
     if st.button("⚙️", key="goals_settings_btn", help="Weekly Goals Settings"):
-        goals_settings_modal(selected_user)
+        goals_settings_modal(selected_user, bundle)
 
 # All data comes from Supabase now
 if True:
-    # Load data
-    df = load_data_from_sheets(None, user=selected_user)
-    activity_df = load_activity_log(user=selected_user)
+    df = bundle["workouts"]
+    activity_df = bundle["activity_log"]
     
     # ==================== WEEKLY GOALS - MAIN SECTION ====================
     st.markdown("""
@@ -140,14 +145,14 @@ if True:
     """, unsafe_allow_html=True)
     
     # Load user's goal settings
-    goal1_type = get_user_setting(selected_user, "weekly_goal_1_type", "Gym")
-    goal1_target = int(get_user_setting(selected_user, "weekly_goal_1_target", 3))
+    goal1_type = get_user_setting(selected_user, "weekly_goal_1_type", "Gym", bundle=bundle)
+    goal1_target = int(get_user_setting(selected_user, "weekly_goal_1_target", 3, bundle=bundle))
     
-    goal2_type = get_user_setting(selected_user, "weekly_goal_2_type", "Board")
-    goal2_target = int(get_user_setting(selected_user, "weekly_goal_2_target", 1))
+    goal2_type = get_user_setting(selected_user, "weekly_goal_2_type", "Board", bundle=bundle)
+    goal2_target = int(get_user_setting(selected_user, "weekly_goal_2_target", 1, bundle=bundle))
     
-    goal3_type = get_user_setting(selected_user, "weekly_goal_3_type", "Climbing")
-    goal3_target = int(get_user_setting(selected_user, "weekly_goal_3_target", 3))
+    goal3_type = get_user_setting(selected_user, "weekly_goal_3_type", "Climbing", bundle=bundle)
+    goal3_target = int(get_user_setting(selected_user, "weekly_goal_3_target", 3, bundle=bundle))
     
     # Activity type metadata
     activity_types = {
@@ -165,25 +170,24 @@ if True:
     week_start = today - timedelta(days=today.weekday())  # Monday
     
     # Count sessions for each goal type
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce").dt.date
-    df_week = df[(df["Date"] >= week_start) & (df["Date"] <= today)]
+    df_week = df[(df["Date"].dt.date >= week_start) & (df["Date"].dt.date <= today)] if len(df) > 0 else df
     
-    custom_workout_df = load_custom_workout_logs(selected_user)
+    custom_workout_df = bundle["custom_workout_logs"]
     
     def count_sessions(goal_type):
         """Count sessions for a specific goal type this week"""
         if goal_type == "Gym":
-            return len(df_week["Date"].unique()) if len(df_week) > 0 else 0
+            return len(df_week["Date"].dt.date.unique()) if len(df_week) > 0 else 0
         elif goal_type == "Custom":
             if len(custom_workout_df) > 0:
-                custom_workout_df["Date"] = pd.to_datetime(custom_workout_df["Date"], errors="coerce").dt.date
-                custom_week = custom_workout_df[(custom_workout_df["Date"] >= week_start) & (custom_workout_df["Date"] <= today)]
-                return len(custom_week["Date"].unique()) if len(custom_week) > 0 else 0
+                custom_days = custom_workout_df["Date"].dt.date
+                custom_week = custom_days[(custom_days >= week_start) & (custom_days <= today)]
+                return len(custom_week.unique()) if len(custom_week) > 0 else 0
             return 0
         else:  # Board, Climbing, Work
             if len(activity_df) > 0:
-                activity_df["Date"] = pd.to_datetime(activity_df["Date"], errors="coerce").dt.date
-                activity_week = activity_df[(activity_df["Date"] >= week_start) & (activity_df["Date"] <= today)]
+                activity_days = activity_df["Date"].dt.date
+                activity_week = activity_df[(activity_days >= week_start) & (activity_days <= today)]
                 return len(activity_week[activity_week["ActivityType"] == goal_type])
             return 0
     
@@ -280,9 +284,12 @@ if True:
     # ==================== WEIGHT GOALS ====================
     st.markdown("### 🎯 Your Weight Goals")
     
+    # Stored 1RMs for every exercise × arm in one pass
+    strength = get_strength_matrix(bundle["profile"], bundle["workouts"])
+    
     # Load active goals from Supabase
     try:
-        goals_df = load_goals(selected_user)
+        goals_df = bundle["goals"]
         
         # Filter active goals
         if len(goals_df) > 0 and 'Completed' in goals_df.columns:
@@ -299,7 +306,10 @@ if True:
                 target_kg = float(goal['Target_Weight'])
                 
                 # Get current 1RM (in kg)
-                current_kg = get_user_1rm(selected_user, exercise, arm)
+                current_kg = (
+                    strength.at[(exercise, arm), 'Stored_1RM'] if (exercise, arm) in strength.index
+                    else get_user_1rm(selected_user, exercise, arm, bundle=bundle)
+                )
                 
                 # Calculate progress
                 if current_kg >= target_kg:
@@ -424,8 +434,8 @@ if True:
     
     for idx, (col, exercise, color) in enumerate(zip([col1, col2, col3], exercises_display, colors)):
         with col:
-            edge_L_kg = get_user_1rm(selected_user, exercise, "L")
-            edge_R_kg = get_user_1rm(selected_user, exercise, "R")
+            edge_L_kg = strength.at[(exercise, "L"), 'Stored_1RM']
+            edge_R_kg = strength.at[(exercise, "R"), 'Stored_1RM']
             
             st.markdown(f"""
                 <div style='background: {color}; 
@@ -449,7 +459,7 @@ if True:
     # ==================== COMPLETED GOALS HISTORY ====================
     try:
         # Load all goals and filter completed ones
-        all_goals = load_goals(selected_user)
+        all_goals = bundle["goals"]
         if len(all_goals) > 0 and 'Completed' in all_goals.columns:
             completed_goals = all_goals[all_goals['Completed'] == True]
             
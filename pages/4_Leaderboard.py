@@ -28,24 +28,12 @@ current_user = st.session_state.get('current_user', None)
 
 # All data comes from Supabase now
 if True:
-    df = load_data_from_sheets(None)
+    # Per-user max load and volume, aggregated on the backend and shared by all sessions
+    df = load_leaderboard()
     
     if len(df) > 0:
-        # Get bodyweights for all users using Supabase
-        user_bodyweights = {}
-        try:
-            supabase = get_supabase_client()
-            if supabase:
-                response = supabase.table("bodyweights").select("username, bodyweight_kg").execute()
-                for row in response.data:
-                    username = row.get("username")
-                    bodyweight = row.get("bodyweight_kg")
-                    if username and bodyweight:
-                        user_bodyweights[username] = float(bodyweight)
-        except Exception as e:
-            # Default bodyweights if fetch fails
-            for user in df['User'].unique():
-                user_bodyweights[user] = 78.0
+        # Current bodyweights for all users (default 78kg when unknown)
+        user_bodyweights = load_all_bodyweights()
         
         # Helper function to create podium display
         def create_podium(leaderboard_data, title, emoji):
@@ -268,15 +256,14 @@ if True:
                     
                     # Left arm
                     with col1:
-                        df_left = df_ex[df_ex['Arm'] == 'L'].copy()
-                        df_left['Actual_Load_kg'] = pd.to_numeric(df_left['Actual_Load_kg'], errors='coerce')
+                        df_left = df_ex[df_ex['Arm'] == 'L']
                         
                         if len(df_left) > 0:
-                            leaderboard_left = df_left.groupby('User')['Actual_Load_kg'].max().reset_index()
+                            leaderboard_left = df_left.groupby('User')['Max_Load_kg'].max().reset_index()
                             leaderboard_left.columns = ['User', 'Max Load (kg)']
                             
                             # Add bodyweight percentage
-                            leaderboard_left['Bodyweight'] = leaderboard_left['User'].map(user_bodyweights)
+                            leaderboard_left['Bodyweight'] = leaderboard_left['User'].map(user_bodyweights).fillna(78.0)
                             leaderboard_left['% of BW'] = (leaderboard_left['Max Load (kg)'] / leaderboard_left['Bodyweight']) * 100
                             
                             # Sort by percentage
@@ -293,15 +280,14 @@ if True:
                     
                     # Right arm
                     with col2:
-                        df_right = df_ex[df_ex['Arm'] == 'R'].copy()
-                        df_right['Actual_Load_kg'] = pd.to_numeric(df_right['Actual_Load_kg'], errors='coerce')
+                        df_right = df_ex[df_ex['Arm'] == 'R']
                         
                         if len(df_right) > 0:
-                            leaderboard_right = df_right.groupby('User')['Actual_Load_kg'].max().reset_index()
+                            leaderboard_right = df_right.groupby('User')['Max_Load_kg'].max().reset_index()
                             leaderboard_right.columns = ['User', 'Max Load (kg)']
                             
                             # Add bodyweight percentage
-                            leaderboard_right['Bodyweight'] = leaderboard_right['User'].map(user_bodyweights)
+                            leaderboard_right['Bodyweight'] = leaderboard_right['User'].map(user_bodyweights).fillna(78.0)
                             leaderboard_right['% of BW'] = (leaderboard_right['Max Load (kg)'] / leaderboard_right['Bodyweight']) * 100
                             
                             # Sort by percentage
@@ -315,11 +301,7 @@ if True:
         st.markdown("## 📊 Total Training Volume")
         st.caption("All-time cumulative volume across all exercises")
         
-        df['Volume'] = (pd.to_numeric(df['Actual_Load_kg'], errors='coerce') *
-                       pd.to_numeric(df['Reps_Per_Set'], errors='coerce') *
-                       pd.to_numeric(df['Sets_Completed'], errors='coerce'))
-
-        volume_leaderboard = df.groupby('User')['Volume'].sum().sort_values(ascending=False).reset_index()
+        volume_leaderboard = df.groupby('User')['Volume_kg'].sum().sort_values(ascending=False).reset_index()
         volume_leaderboard.columns = ['User', 'Total Volume']
         volume_leaderboard['Total Volume'] = volume_leaderboard['Total Volume'].round(0).astype(int)
         
@@ -349,6 +331,32 @@ if True:
                     </div>
                 """, unsafe_allow_html=True)
         
+        # Badge standings across the group
+        st.markdown("---")
+        st.markdown("## 🏅 Badge Standings")
+        st.caption("Badge level reached by everyone, and when each level was earned")
+        
+        badge_standings, badge_timeline = load_badge_standings()
+        if len(badge_standings) > 0:
+            badge_standings['Badge Label'] = badge_standings['Emoji'] + " " + badge_standings['Name']
+            badge_standings['Progress'] = (
+                badge_standings['Level'].astype(str) + "/" + badge_standings['Total_Levels'].astype(str)
+            )
+            badge_table = badge_standings.pivot(index='User', columns='Badge Label', values='Progress')
+            badge_table['Total Levels'] = badge_standings.groupby('User')['Level'].sum()
+            st.dataframe(badge_table.sort_values('Total Levels', ascending=False), use_container_width=True)
+            
+            if len(badge_timeline) > 0:
+                st.markdown("#### 🕒 Recently Earned")
+                recent = badge_timeline.sort_values('Earned_Date', ascending=False).head(10)
+                for _, row in recent.iterrows():
+                    st.markdown(
+                        f"{row['Emoji']} **{row['User']}** reached **{row['Name']}** level {row['Level']} "
+                        f"({row['Threshold']:,.0f}) on {row['Earned_Date']:%b %d, %Y}"
+                    )
+        else:
+            st.info("No badges earned yet!")
+        
     else:
         st.info("📝 No workout data available yet. Start logging workouts to see the leaderboard!")
 else:
@@ -1,24 +1,132 @@
 import streamlit as st
+import sys
+sys.path.append('.')
+import json
 import time
+from utils.helpers import (
+    USER_PLACEHOLDER,
+    get_timer_protocols,
+    save_timer_protocol,
+    delete_timer_protocol,
+)
+from utils.protocols import DEFAULT_PROTOCOLS, compile_protocol, normalize_protocol, phase_at
 
 st.set_page_config(page_title="Rest Timer", page_icon="⏱️")
 
+REST_TIMER_SECONDS = 180
+CLOCK_HEIGHT = 420
+
+
+def rest_timer():
+    """The rest timer as a one-segment compiled protocol"""
+    segment = {'phase': 'rest', 'duration': REST_TIMER_SECONDS, 'label': '', 'color': 'white', 'header': '', 'banner': False}
+    return {'segments': [segment], 'ends': [REST_TIMER_SECONDS], 'total': REST_TIMER_SECONDS}
+
+
+def elapsed_seconds():
+    """Seconds the current timer has run, counting time before any pause"""
+    elapsed = st.session_state.timer_elapsed
+    if st.session_state.timer_state == 'running':
+        elapsed += time.time() - st.session_state.start_time
+    return elapsed
+
+
+def reset_timer():
+    st.session_state.timer_state = 'idle'
+    st.session_state.timer_elapsed = 0.0
+    st.session_state.start_time = None
+
+
+def render_clock(compiled, clock_format, done_title, done_subtitle, done_color):
+    """
+    Countdown rendered and ticked in the browser. The server only sends the
+    protocol and the elapsed time when the page renders (start/pause/reset);
+    the client advances phases and flashes on completion without any reruns.
+    """
+    payload = json.dumps({
+        'segments': compiled['segments'],
+        'ends': compiled['ends'],
+        'elapsed': elapsed_seconds(),
+        'running': st.session_state.timer_state == 'running',
+        'format': clock_format,
+        'doneTitle': done_title,
+        'doneSubtitle': done_subtitle,
+        'doneColor': done_color,
+    })
+    st.iframe(
+        f"""
+        <div id="clock" style="text-align: center; font-family: 'Source Sans Pro', sans-serif; color: white;">
+            <div id="banner" style="display: none; background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
+                padding: 12px; border-radius: 8px; margin: 0 auto 15px; max-width: 520px;
+                box-shadow: 0 4px 12px rgba(240,147,251,0.5); font-size: 18px; font-weight: 700;">
+                🔥 LAST REP OF THIS HAND! 🔥
+            </div>
+            <h2 id="header" style="color: #888; font-size: 24px; margin: 0 0 10px;"></h2>
+            <h3 id="label" style="font-size: 40px; font-weight: bold; margin: 10px 0;"></h3>
+            <h1 id="time" style="font-size: 120px; font-weight: bold; margin: 0;"></h1>
+            <p id="subtitle" style="font-size: 24px; margin: 0;"></p>
+        </div>
+        <script>
+        const cfg = {payload};
+        const ends = cfg.ends;
+        const total = ends.length ? ends[ends.length - 1] : 0;
+        const loadedAt = performance.now();
+        const el = (id) => document.getElementById(id);
+
+        function fmt(seconds) {{
+            if (cfg.format === 'seconds') return String(seconds);
+            const m = Math.floor(seconds / 60), s = seconds % 60;
+            return String(m).padStart(2, '0') + ':' + String(s).padStart(2, '0');
+        }}
+
+        function tick() {{
+            const elapsed = cfg.elapsed + (cfg.running ? (performance.now() - loadedAt) / 1000 : 0);
+            if (elapsed >= total) {{
+                const color = Math.floor(Date.now() / 500) % 2 === 0 ? cfg.doneColor : 'white';
+                el('banner').style.display = 'none';
+                el('header').textContent = '';
+                el('label').textContent = '';
+                el('time').textContent = cfg.doneTitle;
+                el('time').style.color = color;
+                el('time').style.fontSize = cfg.format === 'seconds' ? '90px' : '120px';
+                el('subtitle').textContent = cfg.doneSubtitle;
+                el('subtitle').style.color = color;
+                return;
+            }}
+            // Bisect the cumulative end times for the current segment
+            let lo = 0, hi = ends.length;
+            while (lo < hi) {{
+                const mid = (lo + hi) >> 1;
+                if (ends[mid] <= elapsed) lo = mid + 1; else hi = mid;
+            }}
+            const idx = lo;
+            const seg = cfg.segments[idx];
+            el('banner').style.display = seg.banner ? 'block' : 'none';
+            el('header').textContent = seg.header;
+            el('label').textContent = seg.label;
+            el('label').style.color = seg.color;
+            el('time').textContent = fmt(Math.ceil(ends[idx] - elapsed));
+            el('time').style.color = 'white';
+            el('subtitle').textContent = '';
+        }}
+
+        tick();
+        setInterval(tick, 100);
+        </script>
+        """,
+        height=CLOCK_HEIGHT,
+    )
+
+
 # Initialize session state
 if 'timer_mode' not in st.session_state:
     st.session_state.timer_mode = 'Rest Timer'
 if 'timer_state' not in st.session_state:
-    st.session_state.timer_state = 'idle'
-if 'time_remaining' not in st.session_state:
-    st.session_state.time_remaining = 180
+    st.session_state.timer_state = 'idle'  # idle, running, paused, finished
+if 'timer_elapsed' not in st.session_state:
+    st.session_state.timer_elapsed = 0.0
 if 'start_time' not in st.session_state:
     st.session_state.start_time = None
-# Repeater-specific state
-if 'repeater_phase' not in st.session_state:
-    st.session_state.repeater_phase = 'ready'  # ready, right_on, right_off, switch, left_on, left_off, complete
-if 'repeater_round' not in st.session_state:
-    st.session_state.repeater_round = 0
-if 'repeater_hand' not in st.session_state:
-    st.session_state.repeater_hand = 'right'
 
 st.title("⏱️ Workout Timer")
 
@@ -32,215 +140,134 @@ timer_mode = st.selectbox(
 # Reset state if mode changes
 if timer_mode != st.session_state.timer_mode:
     st.session_state.timer_mode = timer_mode
-    st.session_state.timer_state = 'idle'
-    st.session_state.time_remaining = 180 if timer_mode == 'Rest Timer' else 10
-    st.session_state.start_time = None
-    st.session_state.repeater_phase = 'ready'
-    st.session_state.repeater_round = 0
-    st.session_state.repeater_hand = 'right'
-    st.rerun()
+    reset_timer()
 
 st.markdown("---")
 
-# ==================== REST TIMER ====================
 if timer_mode == 'Rest Timer':
-    minutes = st.session_state.time_remaining // 60
-    seconds = st.session_state.time_remaining % 60
-    
-    if st.session_state.timer_state == 'flashing':
-        flash_color = "red" if int(time.time() * 2) % 2 == 0 else "white"
-        st.markdown(f"""
-            <div style='text-align: center; padding: 50px;'>
-                <h1 style='font-size: 120px; color: {flash_color}; font-weight: bold;'>
-                    {minutes:02d}:{seconds:02d}
-                </h1>
-                <p style='font-size: 24px; color: {flash_color};'>TIME'S UP! Click to reset</p>
-            </div>
-        """, unsafe_allow_html=True)
-        
-        if st.button("Reset Timer", key="reset_flash", use_container_width=True):
-            st.session_state.timer_state = 'idle'
-            st.session_state.time_remaining = 180
-            st.session_state.start_time = None
-            st.rerun()
-        
-        time.sleep(0.5)
-        st.rerun()
-    else:
-        st.markdown(f"""
-            <div style='text-align: center; padding: 50px;'>
-                <h1 style='font-size: 120px; color: white; font-weight: bold;'>
-                    {minutes:02d}:{seconds:02d}
-                </h1>
-            </div>
-        """, unsafe_allow_html=True)
-    
-    col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:
-        if st.session_state.timer_state == 'idle':
-            if st.button("▶️ Start Timer", key="start", use_container_width=True, type="primary"):
-                st.session_state.timer_state = 'running'
-                st.session_state.start_time = time.time()
-                st.rerun()
-        elif st.session_state.timer_state == 'running':
-            if st.button("⏸️ Pause", key="pause", use_container_width=True):
-                st.session_state.timer_state = 'idle'
-                st.session_state.start_time = None
-                st.rerun()
-            if st.button("🔄 Reset", key="reset", use_container_width=True):
-                st.session_state.timer_state = 'idle'
-                st.session_state.time_remaining = 180
-                st.session_state.start_time = None
-                st.rerun()
-    
-    if st.session_state.timer_state == 'running':
-        elapsed = time.time() - st.session_state.start_time
-        st.session_state.time_remaining = max(0, 180 - int(elapsed))
-        
-        if st.session_state.time_remaining == 0:
-            st.session_state.timer_state = 'flashing'
-            st.session_state.start_time = None
-        
-        time.sleep(0.1)
-        st.rerun()
-
-# ==================== REPEATERS TIMER ====================
+    compiled = rest_timer()
+    render_clock(compiled, 'mmss', '00:00', "TIME'S UP! Click to reset", 'red')
 else:
-    phase = st.session_state.repeater_phase
-    round_num = st.session_state.repeater_round
-    hand = st.session_state.repeater_hand
+    # Built-in protocols plus the active profile's saved ones
+    current_user = st.session_state.get('current_user')
+    can_save = bool(current_user) and current_user != USER_PLACEHOLDER
+    protocols = dict(DEFAULT_PROTOCOLS)
+    if can_save:
+        protocols.update(get_timer_protocols(current_user))
     
-    # Determine current phase details
-    phase_config = {
-        'ready': {'duration': 10, 'label': '🟡 GET READY', 'color': 'yellow'},
-        'right_on': {'duration': 7, 'label': '🟢 LIFT - RIGHT HAND', 'color': '#00ff00'},
-        'right_off': {'duration': 3, 'label': '🔴 REST', 'color': 'red'},
-        'switch': {'duration': 10, 'label': '🔄 SWITCH HANDS', 'color': 'orange'},
-        'left_on': {'duration': 7, 'label': '🟢 LIFT - LEFT HAND', 'color': '#00ff00'},
-        'left_off': {'duration': 3, 'label': '🔴 REST', 'color': 'red'},
-        'complete': {'duration': 0, 'label': '✅ COMPLETE!', 'color': 'green'}
-    }
+    # Widget state can only be set before the selectbox is drawn
+    if 'timer_protocol_pending' in st.session_state:
+        st.session_state.timer_protocol_selector = st.session_state.pop('timer_protocol_pending')
+    if st.session_state.get('timer_protocol_selector') not in protocols:
+        st.session_state.timer_protocol_selector = next(iter(DEFAULT_PROTOCOLS))
+    protocol_name = st.selectbox("Protocol:", list(protocols.keys()), key="timer_protocol_selector")
+    compiled = compile_protocol(protocols[protocol_name])
+    protocol = compiled['protocol']
     
-    current_config = phase_config.get(phase, phase_config['ready'])
+    # Switching protocol starts over
+    if st.session_state.get('timer_protocol') != protocol:
+        st.session_state.timer_protocol = protocol
+        reset_timer()
     
-    if phase == 'complete':
-        flash_color = "green" if int(time.time() * 2) % 2 == 0 else "white"
-        st.markdown(f"""
-            <div style='text-align: center; padding: 50px;'>
-                <h1 style='font-size: 100px; color: {flash_color}; font-weight: bold;'>
-                    ✅ COMPLETE!
-                </h1>
-                <p style='font-size: 24px; color: {flash_color};'>Great work! Click to reset</p>
-            </div>
-        """, unsafe_allow_html=True)
-        
-        if st.button("Reset Timer", key="reset_complete", use_container_width=True):
-            st.session_state.timer_state = 'idle'
-            st.session_state.repeater_phase = 'ready'
-            st.session_state.repeater_round = 0
-            st.session_state.repeater_hand = 'right'
-            st.session_state.time_remaining = 10
-            st.session_state.start_time = None
-            st.rerun()
-        
-        time.sleep(0.5)
-        st.rerun()
-    else:
-        # Display current round info
-        if phase in ['right_on', 'right_off']:
-            hand_display = 'RIGHT HAND'
-            round_display = round_num + 1
-        elif phase in ['left_on', 'left_off']:
-            hand_display = 'LEFT HAND'
-            round_display = round_num + 1
-        else:
-            hand_display = ''
-            round_display = ''
-        
-        if hand_display:
-            # Check if this is the last rep
-            is_last_rep = round_display == 6
-            last_rep_banner = ""
-            if is_last_rep and phase in ['right_on', 'left_on']:
-                last_rep_banner = """
-                    <div style='background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); 
-                    padding: 12px; border-radius: 8px; margin-bottom: 15px; 
-                    box-shadow: 0 4px 12px rgba(240,147,251,0.5);'>
-                        <div style='color: white; font-size: 18px; font-weight: 700; text-align: center;'>
-                            🔥 LAST REP OF THIS HAND! 🔥
-                        </div>
-                    </div>
-                """
+    total_min, total_sec = divmod(compiled['total'], 60)
+    hands_text = "each hand" if protocol['switch_hands'] else "one hand"
+    st.caption(
+        f"{protocol['reps']} reps × {protocol['sets']} set(s), {hands_text} • "
+        f"{protocol['on_seconds']}s on / {protocol['off_seconds']}s off • total {total_min}:{total_sec:02d}"
+    )
+    
+    with st.expander("🛠️ Create your own protocol"):
+        if not can_save:
+            st.info("🔒 Select a profile on another page to save protocols.")
+        with st.form("protocol_form"):
+            new_name = st.text_input("Name", value="My Repeaters")
+            col_a, col_b, col_c = st.columns(3)
+            with col_a:
+                on_seconds = st.number_input("Hang (s)", min_value=1, max_value=120, value=protocol['on_seconds'])
+                reps = st.number_input("Reps per set", min_value=1, max_value=50, value=protocol['reps'])
+                prep_seconds = st.number_input("Get ready (s)", min_value=0, max_value=120, value=protocol['prep_seconds'])
+            with col_b:
+                off_seconds = st.number_input("Rest between reps (s)", min_value=0, max_value=300, value=protocol['off_seconds'])
+                sets = st.number_input("Sets", min_value=1, max_value=20, value=protocol['sets'])
+                set_rest_seconds = st.number_input("Rest between sets (s)", min_value=0, max_value=900, value=protocol['set_rest_seconds'])
+            with col_c:
+                switch_hands = st.checkbox("Alternate hands", value=protocol['switch_hands'])
+                switch_seconds = st.number_input("Hand switch (s)", min_value=0, max_value=120, value=protocol['switch_seconds'])
             
-            st.markdown(f"""
-                <div style='text-align: center; margin-bottom: 20px;'>
-                    {last_rep_banner}
-                    <h2 style='color: #888; font-size: 24px;'>{hand_display} - Round {round_display}/6</h2>
-                </div>
-            """, unsafe_allow_html=True)
+            if st.form_submit_button("💾 Save Protocol", disabled=not can_save, use_container_width=True):
+                new_protocol = normalize_protocol({
+                    "name": new_name,
+                    "prep_seconds": prep_seconds,
+                    "on_seconds": on_seconds,
+                    "off_seconds": off_seconds,
+                    "reps": reps,
+                    "sets": sets,
+                    "set_rest_seconds": set_rest_seconds,
+                    "switch_hands": switch_hands,
+                    "switch_seconds": switch_seconds,
+                })
+                if new_protocol['name'] in DEFAULT_PROTOCOLS:
+                    st.error("Pick a name that isn't one of the built-in protocols.")
+                elif save_timer_protocol(current_user, new_protocol):
+                    st.session_state.timer_protocol_pending = new_protocol['name']
+                    st.rerun()
         
-        # Display timer
-        st.markdown(f"""
-            <div style='text-align: center; padding: 30px;'>
-                <h3 style='font-size: 40px; color: {current_config['color']}; font-weight: bold; margin-bottom: 20px;'>
-                    {current_config['label']}
-                </h3>
-                <h1 style='font-size: 150px; color: white; font-weight: bold;'>
-                    {st.session_state.time_remaining}
-                </h1>
-            </div>
-        """, unsafe_allow_html=True)
+        if can_save and protocol_name not in DEFAULT_PROTOCOLS:
+            if st.button(f"🗑️ Delete '{protocol_name}'", use_container_width=True):
+                if delete_timer_protocol(current_user, protocol_name):
+                    st.session_state.timer_protocol_pending = next(iter(DEFAULT_PROTOCOLS))
+                    st.rerun()
     
+    render_clock(compiled, 'seconds', '✅ COMPLETE!', 'Great work! Click to reset', 'green')
+
+
+def timer_controls(total_seconds):
+    """
+    Start/pause/reset buttons. While a timer runs this fragment re-checks once,
+    when the countdown is due to finish, so the server learns about completion
+    without polling the whole page.
+    """
+    state = st.session_state.timer_state
+    if state == 'running' and elapsed_seconds() >= total_seconds:
+        st.session_state.timer_state = 'finished'
+        st.session_state.timer_elapsed = total_seconds
+        st.session_state.start_time = None
+        st.rerun()
+
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        if st.session_state.timer_state == 'idle' and phase != 'complete':
-            if st.button("▶️ Start Repeaters", key="start_rep", use_container_width=True, type="primary"):
+        if state == 'finished':
+            if st.button("Reset Timer", key="reset_done", use_container_width=True):
+                reset_timer()
+                st.rerun()
+        elif state in ('idle', 'paused'):
+            start_label = "▶️ Start Timer" if timer_mode == 'Rest Timer' else "▶️ Start Repeaters"
+            if state == 'paused':
+                start_label = "▶️ Resume"
+            if st.button(start_label, key="start", use_container_width=True, type="primary"):
                 st.session_state.timer_state = 'running'
                 st.session_state.start_time = time.time()
-                st.session_state.time_remaining = current_config['duration']
                 st.rerun()
-        elif st.session_state.timer_state == 'running':
-            if st.button("🔄 Reset", key="reset_rep", use_container_width=True):
-                st.session_state.timer_state = 'idle'
-                st.session_state.repeater_phase = 'ready'
-                st.session_state.repeater_round = 0
-                st.session_state.repeater_hand = 'right'
-                st.session_state.time_remaining = 10
+            if state == 'paused' and st.button("🔄 Reset", key="reset_paused", use_container_width=True):
+                reset_timer()
+                st.rerun()
+        else:
+            if st.button("⏸️ Pause", key="pause", use_container_width=True):
+                st.session_state.timer_elapsed = elapsed_seconds()
+                st.session_state.timer_state = 'paused'
                 st.session_state.start_time = None
                 st.rerun()
-    
-    # Update repeater timer logic
-    if st.session_state.timer_state == 'running' and phase != 'complete':
-        elapsed = time.time() - st.session_state.start_time
-        st.session_state.time_remaining = max(0, current_config['duration'] - int(elapsed))
-        
-        # Phase transitions
-        if st.session_state.time_remaining == 0:
-            if phase == 'ready':
-                st.session_state.repeater_phase = 'right_on'
-                st.session_state.repeater_round = 0
-            elif phase == 'right_on':
-                st.session_state.repeater_phase = 'right_off'
-            elif phase == 'right_off':
-                st.session_state.repeater_round += 1
-                if st.session_state.repeater_round < 6:
-                    st.session_state.repeater_phase = 'right_on'
-                else:
-                    st.session_state.repeater_phase = 'switch'
-                    st.session_state.repeater_round = 0
-            elif phase == 'switch':
-                st.session_state.repeater_phase = 'left_on'
-            elif phase == 'left_on':
-                st.session_state.repeater_phase = 'left_off'
-            elif phase == 'left_off':
-                st.session_state.repeater_round += 1
-                if st.session_state.repeater_round < 6:
-                    st.session_state.repeater_phase = 'left_on'
-                else:
-                    st.session_state.repeater_phase = 'complete'
-                    st.session_state.timer_state = 'idle'
-            
-            st.session_state.start_time = time.time()
-        
-        time.sleep(0.1)
-        st.rerun()
+            if st.button("🔄 Reset", key="reset", use_container_width=True):
+                reset_timer()
+                st.rerun()
+
+
+total_seconds = compiled['total']
+if st.session_state.timer_state == 'paused':
+    segment, seconds_left = phase_at(compiled, elapsed_seconds())
+    if segment is not None:
+        st.caption(f"⏸️ Paused - {segment['label'] or 'rest'}, {seconds_left:.0f}s left")
+check_after = None
+if st.session_state.timer_state == 'running':
+    check_after = max(1.0, total_seconds - elapsed_seconds())
+st.fragment(timer_controls, run_every=check_after)(total_seconds)
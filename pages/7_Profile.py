@@ -5,11 +5,12 @@ from utils.helpers import (
     init_session_state, load_users_from_sheets,
     load_user_pins_from_sheets,
     user_selectbox_with_pin,
-    load_data_from_sheets,
+    load_user_data_bundle,
     get_bodyweight,
+    get_bodyweight_history,
     set_bodyweight,
-    get_user_1rm,
-    get_working_max,
+    get_strength_matrix,
+    training_streaks,
     USER_LIST,
     PIN_LENGTH,
     USER_PLACEHOLDER,
@@ -22,10 +23,9 @@ from utils.helpers import (
     delete_user,
     delete_workout_entry,
     delete_custom_workout_log,
-    delete_activity_log,
-    load_custom_workout_logs,
-    load_activity_log
+    delete_activity_log
 )
+from utils.charts import large_history_trace, DOWNSAMPLE_POINTS, WEBGL_POINT_THRESHOLD
 
 import pandas as pd
 import plotly.graph_objects as go
@@ -55,7 +55,7 @@ st.session_state.current_user = selected_user
 
 # ==================== SETTINGS DIALOG ====================
 @st.dialog("⚙️ Training Settings", width="large")
-def show_settings_dialog(selected_user):
+def show_settings_dialog(selected_user, bundle):
     """Modal dialog for training settings"""
     
     # Tabs for different setting categories
@@ -65,8 +65,8 @@ def show_settings_dialog(selected_user):
     with tab1:
         st.markdown("### 🏃 Endurance Training")
         
-        current_endurance_enabled = get_endurance_training_enabled(selected_user)
-        workout_count_edge = get_workout_count(selected_user, "20mm Edge")
+        current_endurance_enabled = get_endurance_training_enabled(selected_user, bundle=bundle)
+        workout_count_edge = get_workout_count(selected_user, "20mm Edge", bundle=bundle)
         
         col1, col2 = st.columns([2, 1])
         
@@ -100,7 +100,7 @@ def show_settings_dialog(selected_user):
             )
             
             if endurance_enabled != current_endurance_enabled:
-                set_endurance_training_enabled(selected_user, endurance_enabled)
+                set_endurance_training_enabled(selected_user, endurance_enabled, bundle=bundle)
                 st.success(f"✅ Endurance training {'enabled' if endurance_enabled else 'disabled'}!")
         
         with col2:
@@ -144,14 +144,14 @@ def show_settings_dialog(selected_user):
         st.markdown("Delete any workout entries that were logged incorrectly.")
         
         # Load all workouts for the user
-        df_all = load_data_from_sheets(None, selected_user)
+        df_all = bundle["workouts"]
         df_user = df_all.copy()
         
         # Load custom workouts
-        custom_logs = load_custom_workout_logs(selected_user)
+        custom_logs = bundle["custom_workout_logs"]
         
         # Load activity logs
-        activity_logs = load_activity_log(selected_user)
+        activity_logs = bundle["activity_log"]
         
         # Ensure date columns exist with proper names
         if not custom_logs.empty and 'Date' in custom_logs.columns:
@@ -168,7 +168,6 @@ def show_settings_dialog(selected_user):
             # Standard workouts tab
             with workout_tab1:
                 if not df_user.empty:
-                    df_user['Date'] = pd.to_datetime(df_user['Date'], errors='coerce')
                     df_sorted = df_user.sort_values('Date', ascending=False)
                     
                     # Search box
@@ -247,7 +246,6 @@ def show_settings_dialog(selected_user):
             # Custom workouts tab
             with workout_tab2:
                 if not custom_logs.empty:
-                    custom_logs['date'] = pd.to_datetime(custom_logs['date'], errors='coerce')
                     custom_sorted = custom_logs.sort_values('date', ascending=False)
                     
                     # Search box
@@ -331,7 +329,6 @@ def show_settings_dialog(selected_user):
             # Activities tab
             with workout_tab3:
                 if not activity_logs.empty:
-                    activity_logs['date'] = pd.to_datetime(activity_logs['date'], errors='coerce')
                     activity_sorted = activity_logs.sort_values('date', ascending=False)
                     
                     # Search box
@@ -462,6 +459,9 @@ def show_settings_dialog(selected_user):
         
         st.warning("⚠️ Remember your PIN! You'll need it to access your profile.")
 
+# One batched fetch shared by the settings dialog and the profile sections
+bundle = load_user_data_bundle(selected_user) if selected_user != USER_PLACEHOLDER else None
+
 # ==================== HEADER WITH SETTINGS BUTTON ====================
 header_col1, header_col2 = st.columns([6, 1])
 
@@ -485,7 +485,7 @@ with header_col2:
             pass
     else:
         if st.button("⚙️", use_container_width=True, help="Training Settings", key="settings_btn"):
-            show_settings_dialog(selected_user)
+            show_settings_dialog(selected_user, bundle)
 
 st.markdown("<div style='margin-bottom: 24px;'></div>", unsafe_allow_html=True)
 
@@ -543,7 +543,7 @@ if selected_user == USER_PLACEHOLDER:
 # All data comes from Supabase now
 if True:
     # Load data
-    df = load_data_from_sheets(None, user=selected_user)
+    df = bundle["workouts"]
     
     # ==================== PERSONAL STATS OVERVIEW ====================
     st.markdown(f"## 💪 {selected_user}'s Training Profile")
@@ -551,29 +551,21 @@ if True:
     if len(df) > 0:
         # Filter out 1RM tests
         df = df[~df['Exercise'].str.contains('1RM Test', na=False)]
-        
-        df['Date'] = pd.to_datetime(df['Date'])
 
         
-        # Calculate stats
-        total_sessions = len(df['Date'].dt.date.unique())
-        total_reps = (pd.to_numeric(df['Reps_Per_Set'], errors='coerce') * 
-                     pd.to_numeric(df['Sets_Completed'], errors='coerce')).sum()
-        total_volume = (pd.to_numeric(df['Actual_Load_kg'], errors='coerce') * 
-                       pd.to_numeric(df['Reps_Per_Set'], errors='coerce') * 
-                       pd.to_numeric(df['Sets_Completed'], errors='coerce')).sum()
+        # Calculate stats (snapshot maintained as workouts sync, 1RM tests excluded)
+        stats = bundle["stats"]
+        total_sessions = stats["training_sessions"]
+        total_reps = stats["total_reps"]
+        total_volume = stats["total_volume"]
         
         # Training streak
-        dates = sorted(df['Date'].dt.date.unique())
-        current_streak = 1
-        for i in range(len(dates)-1, 0, -1):
-            if (dates[i] - dates[i-1]).days <= 7:  # 1 week tolerance
-                current_streak += 1
-            else:
-                break
+        streaks = training_streaks(stats["training_days"])
+        current_streak = streaks["current"]
         
         # Days since start
-        days_training = (datetime.now() - df['Date'].min()).days
+        first_day = stats["training_first_date"]
+        days_training = (datetime.now().date() - first_day).days if first_day else 0
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -593,7 +585,7 @@ if True:
                 padding: 20px; border-radius: 12px; text-align: center; box-shadow: 0 4px 15px rgba(240,147,251,0.4);'>
                     <div style='font-size: 14px; color: rgba(255,255,255,0.95); margin-bottom: 5px; text-shadow: 0 1px 2px rgba(0,0,0,0.3);'>Training Streak 🔥</div>
                     <div style='font-size: 36px; font-weight: bold; color: white; text-shadow: 0 2px 4px rgba(0,0,0,0.3);'>{current_streak}</div>
-                    <div style='font-size: 12px; color: rgba(255,255,255,0.8); margin-top: 5px; text-shadow: 0 1px 2px rgba(0,0,0,0.3);'>1 workout/week to keep alive</div>
+                    <div style='font-size: 12px; color: rgba(255,255,255,0.8); margin-top: 5px; text-shadow: 0 1px 2px rgba(0,0,0,0.3);'>1 workout/week to keep alive • best {streaks['longest']}</div>
                 </div>
             """, unsafe_allow_html=True)
         
@@ -622,7 +614,7 @@ if True:
     # ==================== BODYWEIGHT ====================
     st.markdown("### ⚖️ Bodyweight")
     
-    current_bw = get_bodyweight(selected_user)
+    current_bw = get_bodyweight(selected_user, bundle=bundle)
     
     # Display current bodyweight
     st.markdown(f"""
@@ -655,17 +647,22 @@ if True:
                 st.rerun()
     
     # Bodyweight history chart
-    from utils.helpers import get_bodyweight_history
-    bw_history = get_bodyweight_history(selected_user)
+    bw_history = get_bodyweight_history(selected_user, bundle=bundle)
     
     if not bw_history.empty and len(bw_history) > 1:
         st.markdown("#### 📊 Bodyweight History")
         
+        show_raw_bw = False
+        if len(bw_history) > DOWNSAMPLE_POINTS:
+            show_raw_bw = st.checkbox("🔬 Show every entry", value=False, key="bw_history_raw")
+        
         fig_bw = go.Figure()
         
-        fig_bw.add_trace(go.Scatter(
-            x=bw_history['Date'],
-            y=bw_history['Bodyweight_kg'],
+        fig_bw.add_trace(large_history_trace(
+            bw_history['Date'],
+            bw_history['Bodyweight_kg'],
+            raw=show_raw_bw,
+            webgl=len(bw_history) > WEBGL_POINT_THRESHOLD,
             mode='lines+markers',
             name='Bodyweight',
             line=dict(color='#fbbf24', width=3),
@@ -732,15 +729,18 @@ if True:
     left_vals = []
     right_vals = []
     
+    # Stored 1RM and working max for every exercise × arm in one pass
+    strength = get_strength_matrix(bundle["profile"], bundle["workouts"], exercises=exercises_display)
+    
     for idx, (col, exercise, color) in enumerate(zip([col1, col2, col3], exercises_display, colors)):
         with col:
             # Get stored 1RM (last recorded)
-            recorded_L = get_user_1rm(selected_user, exercise, "L")
-            recorded_R = get_user_1rm(selected_user, exercise, "R")
+            recorded_L = strength.at[(exercise, "L"), 'Stored_1RM']
+            recorded_R = strength.at[(exercise, "R"), 'Stored_1RM']
             
             # Get working max (predicted from recent performance)
-            predicted_L = get_working_max(selected_user, exercise, "L")
-            predicted_R = get_working_max(selected_user, exercise, "R")
+            predicted_L = strength.at[(exercise, "L"), 'Working_Max']
+            predicted_R = strength.at[(exercise, "R"), 'Working_Max']
             
             left_vals.append(predicted_L)
             right_vals.append(predicted_R)
@@ -0,0 +1,32 @@
+-- Badge standings aggregation for the Supabase (Postgres) backend.
+-- Returns one row per (username, day) with that day's training volume
+-- (1RM tests excluded), so the Leaderboard's badge standings download a
+-- row per training day instead of every logged set.
+-- Run once in the Supabase SQL editor; the app falls back to aggregating
+-- workouts client-side until it exists.
+
+create index if not exists workouts_username_date_idx
+    on workouts (username, date);
+
+create or replace function badge_daily_stats()
+returns table (
+    username text,
+    day date,
+    volume double precision
+)
+language sql
+stable
+as $$
+    select
+        w.username::text,
+        w.date::date as day,
+        coalesce(sum(
+            case when w.exercise like '%1RM Test%' then 0
+                 else w.weight * w.reps * w.sets end
+        ), 0)::double precision as volume
+    from workouts w
+    where w.username is not null and w.date is not null
+    group by w.username, w.date::date;
+$$;
+
+grant execute on function badge_daily_stats() to anon, authenticated;
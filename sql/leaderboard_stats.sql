@@ -0,0 +1,31 @@
+-- Leaderboard aggregation for the Supabase (Postgres) backend.
+-- Returns one row per (username, exercise, arm) so the Leaderboard page
+-- downloads a handful of rows per user instead of every logged set.
+-- Run once in the Supabase SQL editor; the app falls back to aggregating
+-- workouts client-side until it exists.
+
+create index if not exists workouts_username_exercise_arm_date_idx
+    on workouts (username, exercise, arm, date);
+
+create or replace function leaderboard_stats()
+returns table (
+    username text,
+    exercise text,
+    arm text,
+    max_load double precision,
+    total_volume double precision
+)
+language sql
+stable
+as $$
+    select
+        w.username::text,
+        w.exercise::text,
+        w.arm::text,
+        max(w.weight)::double precision as max_load,
+        coalesce(sum(w.weight * w.reps * w.sets), 0)::double precision as total_volume
+    from workouts w
+    group by w.username, w.exercise, w.arm;
+$$;
+
+grant execute on function leaderboard_stats() to anon, authenticated;
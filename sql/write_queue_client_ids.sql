@@ -0,0 +1,17 @@
+-- Idempotency keys for the write-behind queue on the Supabase (Postgres) backend.
+-- Queued workout, activity and custom-workout rows carry a client-generated
+-- id and are applied as upserts on it, so a batch that is retried after it
+-- already reached the backend updates its rows instead of inserting them twice.
+-- Run once in the Supabase SQL editor; until then the app detects the
+-- missing column/index and writes those tables with plain inserts.
+
+alter table workouts add column if not exists client_id text;
+alter table activity_log add column if not exists client_id text;
+
+-- Existing rows keep a null id; nulls never conflict with each other
+create unique index if not exists workouts_client_id_key
+    on workouts (client_id);
+create unique index if not exists activity_log_client_id_key
+    on activity_log (client_id);
+create unique index if not exists custom_workout_logs_log_id_key
+    on custom_workout_logs (log_id);
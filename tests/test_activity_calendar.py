@@ -0,0 +1,116 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import helpers
+
+END = date(2026, 10, 17)
+NOW = datetime(2026, 10, 17, 18, 30)
+
+
+class FixedDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return NOW
+
+
+def random_rows(rng, count, **extra):
+    offsets = rng.integers(-30, 400, size=count)
+    stamps = [
+        (END - timedelta(days=int(offset))).isoformat() + (" 07:15:00" if offset % 3 == 0 else "")
+        for offset in offsets
+    ]
+    return [{"date": stamp, **{k: rng.choice(v) for k, v in extra.items()}} for stamp in stamps]
+
+
+def baseline_calendar(tables, start, days):
+    """The original dict-building loops: gym days, then custom days, then each day's first activity"""
+    calendar = {}
+    for row in tables["workouts"]:
+        calendar[str(pd.to_datetime(row["date"]).date())] = "Gym"
+    for row in tables["custom_workout_logs"]:
+        calendar.setdefault(str(pd.to_datetime(row["date"]).date()), "Custom")
+    for row in tables["activity_log"]:
+        calendar.setdefault(str(pd.to_datetime(row["date"]).date()), row["activity_type"])
+    result = []
+    for i in range(days):
+        kind = calendar.get(str(start + timedelta(days=i)), "Rest")
+        result.append(kind if kind in helpers.CALENDAR_CATEGORIES else "Other")
+    return result
+
+
+@pytest.fixture
+def tables(monkeypatch):
+    data = {"workouts": [], "custom_workout_logs": [], "activity_log": []}
+    monkeypatch.setattr(helpers, "_load_user_table_rows", lambda table, user: data[table])
+    helpers._activity_calendar.clear()
+    yield data
+    helpers._activity_calendar.clear()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_calendar_matches_the_baseline_loops(tables, seed):
+    rng = np.random.default_rng(seed)
+    tables["workouts"].extend(random_rows(rng, 120))
+    tables["custom_workout_logs"].extend(random_rows(rng, 40))
+    tables["activity_log"].extend(random_rows(rng, 150, activity_type=["Board", "Climbing", "Work", "Gym", "Yoga"]))
+    start = END - timedelta(days=364)
+
+    calendar, counts = helpers._activity_calendar("a", start, END, seed)
+
+    assert len(calendar) == 365
+    assert calendar.index[0] == pd.Timestamp(start)
+    assert calendar.index[-1] == pd.Timestamp(END)
+    expected = baseline_calendar(tables, start, 365)
+    assert calendar.astype(str).tolist() == expected
+    assert counts == {kind: expected.count(kind) for kind in helpers.CALENDAR_CATEGORIES}
+
+
+def test_first_activity_of_a_day_wins(tables):
+    tables["activity_log"].extend([
+        {"date": "2026-10-16", "activity_type": "Climbing"},
+        {"date": "2026-10-16 19:00:00", "activity_type": "Board"},
+        {"date": "2026-10-17", "activity_type": "Board"},
+    ])
+    tables["custom_workout_logs"].append({"date": "2026-10-17"})
+    calendar, counts = helpers._activity_calendar("a", date(2026, 10, 15), END, 0)
+    assert calendar.astype(str).tolist() == ["Rest", "Climbing", "Custom"]
+    assert counts["Rest"] == 1 and counts["Board"] == 0
+
+
+def test_empty_history_is_all_rest(tables):
+    calendar, counts = helpers._activity_calendar("a", END - timedelta(days=6), END, 0)
+    assert (calendar == "Rest").all()
+    assert counts["Rest"] == 7
+
+
+def baseline_heatmap(df):
+    end_date = NOW
+    start_date = end_date - timedelta(weeks=12)
+    heatmap = np.zeros((7, 12))
+    for day in df["Date"][(df["Date"] >= start_date) & (df["Date"] <= end_date)]:
+        week = min((end_date - day).days // 7, 11)
+        heatmap[day.weekday(), 11 - week] += 1
+    return heatmap
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_heatmap_matches_the_baseline_loop(monkeypatch, seed):
+    monkeypatch.setattr(helpers, "datetime", FixedDatetime)
+    rng = np.random.default_rng(seed)
+    minutes = rng.integers(-60 * 24 * 5, 60 * 24 * 100, size=300)
+    df = pd.DataFrame({"Date": [NOW - timedelta(minutes=int(m)) for m in minutes]})
+
+    heatmap, (start, end) = helpers.create_heatmap(df)
+
+    assert end == NOW
+    assert start == NOW - timedelta(weeks=12)
+    np.testing.assert_array_equal(heatmap, baseline_heatmap(df))
+
+
+def test_heatmap_without_recent_workouts(monkeypatch):
+    monkeypatch.setattr(helpers, "datetime", FixedDatetime)
+    assert helpers.create_heatmap(pd.DataFrame({"Date": []})) is None
+    assert helpers.create_heatmap(pd.DataFrame({"Date": [pd.Timestamp("2020-01-01")]})) is None
@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+
+from utils.helpers import _merge_pyramid, _pyramid_partials, summarize_aggregates
+
+
+def workout(date, weight, reps=5, sets=3, rpe=None, notes="", arm="L"):
+    return {"date": date, "exercise": "20mm Edge", "arm": arm, "weight": weight,
+            "reps": reps, "sets": sets, "rpe": rpe, "notes": notes}
+
+
+ROWS = [
+    workout("2026-09-28", 20, rpe=7),                # Monday, week of 09-28
+    workout("2026-09-28", 24, rpe=9),
+    workout("2026-09-30", 22, reps=1, sets=1),       # same week, single rep
+    workout("2026-10-05", 26, rpe=8),                # next week, next month
+    workout("2026-10-05", 10, notes="Endurance repeaters"),
+]
+
+
+def summary(rows, level, by=("Exercise", "Arm", "Endurance", "Period")):
+    aggregates = _pyramid_partials(rows)[level].reset_index()
+    return summarize_aggregates(aggregates, by=by).set_index("Period")
+
+
+def test_daily_rollup():
+    daily = summary(ROWS, "daily", by=("Exercise", "Arm", "Period"))
+    day = daily.loc[pd.Timestamp("2026-09-28")]
+    assert day["Count"] == 2
+    assert day["Mean_Load_kg"] == pytest.approx(22)
+    assert day["Max_Load_kg"] == 24
+    assert day["E1RM_kg"] == pytest.approx(24 * (1 + 5 / 30))
+    assert day["Volume_kg"] == pytest.approx((20 + 24) * 5 * 3)
+    assert day["Avg_RPE"] == pytest.approx(8)
+    # A single-rep set is its own 1RM estimate; a day without RPE has no average
+    single = daily.loc[pd.Timestamp("2026-09-30")]
+    assert single["E1RM_kg"] == 22
+    assert pd.isna(single["Avg_RPE"])
+
+
+def test_weekly_rollup_starts_on_monday():
+    weekly = summary(ROWS, "weekly", by=("Exercise", "Arm", "Period"))
+    assert list(weekly.index) == [pd.Timestamp("2026-09-28"), pd.Timestamp("2026-10-05")]
+    week = weekly.loc[pd.Timestamp("2026-09-28")]
+    assert week["Count"] == 3
+    assert week["Mean_Load_kg"] == pytest.approx(22)
+    assert week["Volume_kg"] == pytest.approx((20 + 24) * 15 + 22)
+    assert week["Avg_RPE"] == pytest.approx(8)
+
+
+def test_monthly_rollup():
+    monthly = summary(ROWS, "monthly", by=("Exercise", "Arm", "Period"))
+    assert list(monthly.index) == [pd.Timestamp("2026-09-01"), pd.Timestamp("2026-10-01")]
+    assert list(monthly["Count"]) == [3, 2]
+    assert monthly.loc[pd.Timestamp("2026-10-01"), "Max_Load_kg"] == 26
+
+
+def test_endurance_sessions_are_kept_apart():
+    weekly = summary(ROWS, "weekly")
+    october = weekly.loc[pd.Timestamp("2026-10-05")]
+    assert sorted(october["Endurance"]) == [False, True]
+    assert october.set_index("Endurance").loc[True, "Max_Load_kg"] == 10
+
+
+def test_merged_partials_match_a_full_rebuild():
+    merged = _merge_pyramid(_pyramid_partials(ROWS[:1]), _pyramid_partials(ROWS[1:]))
+    full = _pyramid_partials(ROWS)
+    for level in ("daily", "weekly", "monthly"):
+        pd.testing.assert_frame_equal(
+            summarize_aggregates(merged[level].reset_index()),
+            summarize_aggregates(full[level].reset_index()),
+            check_dtype=False,
+        )
@@ -0,0 +1,121 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from utils import helpers
+from utils.helpers import BADGE_RULES, evaluate_badges
+
+TODAY = date(2026, 10, 17)
+
+
+@pytest.fixture
+def badge_days(monkeypatch):
+    """Feed _evaluate_group_badges a fixed per-(user, day) aggregate"""
+    rows = []
+    monkeypatch.setattr(helpers, "_load_badge_day_rows", lambda: rows)
+    helpers._evaluate_group_badges.clear()
+    yield rows
+    helpers._evaluate_group_badges.clear()
+
+
+def random_history(seed, sessions=150):
+    rng = np.random.default_rng(seed)
+    offsets = np.unique(rng.integers(0, 600, size=sessions))
+    days = [TODAY - timedelta(days=600) + timedelta(days=int(offset)) for offset in offsets]
+    volumes = rng.choice([0.0, 900.0, 2400.0, 6000.0], size=len(days)).tolist()
+    return days, volumes
+
+
+def prefix_metrics(days, volumes):
+    """Each cumulative badge metric recomputed from scratch on every prefix of the history"""
+    metrics = {rule["metric"]: [] for rule in BADGE_RULES}
+    best_streak = best_week = 0
+    for i in range(len(days)):
+        prefix = days[:i + 1]
+        streak = 1
+        for j in range(i, 0, -1):
+            if (prefix[j] - prefix[j - 1]).days > helpers.STREAK_TOLERANCE_DAYS:
+                break
+            streak += 1
+        monday = prefix[-1] - timedelta(days=prefix[-1].weekday())
+        best_streak = max(best_streak, streak)
+        best_week = max(best_week, sum(monday <= day for day in prefix))
+        metrics["total_sessions"].append(i + 1)
+        metrics["active_weeks"].append(len({day - timedelta(days=day.weekday()) for day in prefix}))
+        metrics["total_volume"].append(sum(volumes[:i + 1]))
+        metrics["current_streak"].append(best_streak)
+        metrics["sessions_this_week"].append(best_week)
+    return metrics
+
+
+def current_stats(days, volumes):
+    monday = TODAY - timedelta(days=TODAY.weekday())
+    streak = 1
+    for j in range(len(days) - 1, 0, -1):
+        if (days[j] - days[j - 1]).days > helpers.STREAK_TOLERANCE_DAYS:
+            break
+        streak += 1
+    return {
+        "total_sessions": len(days),
+        "active_weeks": len({day - timedelta(days=day.weekday()) for day in days}),
+        "total_volume": sum(volumes),
+        "current_streak": streak,
+        "sessions_this_week": sum(monday <= day <= TODAY for day in days),
+        "days_since_last": (TODAY - days[-1]).days,
+    }
+
+
+def test_no_workouts(badge_days):
+    standings, timeline = helpers._evaluate_group_badges(TODAY)
+    assert standings.empty
+    assert timeline.empty
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_levels_match_per_user_evaluation(badge_days, seed):
+    days, volumes = random_history(seed)
+    recent = [TODAY - timedelta(days=offset) for offset in (3, 1)]
+    for user, (user_days, user_volumes) in {"a": (days, volumes), "b": (recent, [500.0, 700.0])}.items():
+        badge_days.extend(
+            {"username": user, "day": day.isoformat(), "volume": volume}
+            for day, volume in zip(user_days, user_volumes)
+        )
+    standings, _ = helpers._evaluate_group_badges(TODAY)
+
+    for user, user_days, user_volumes in (("a", days, volumes), ("b", recent, [500.0, 700.0])):
+        expected = {badge["id"]: badge["current_level"] for badge in evaluate_badges(current_stats(user_days, user_volumes))}
+        rows = standings[standings["User"] == user]
+        assert dict(zip(rows["Badge"], rows["Level"])) == expected
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_earned_dates_are_the_first_day_each_level_was_reached(badge_days, seed):
+    days, volumes = random_history(seed)
+    badge_days.extend({"username": "a", "day": day.isoformat(), "volume": volume} for day, volume in zip(days, volumes))
+    _, timeline = helpers._evaluate_group_badges(TODAY)
+    earned = {(row.Badge, row.Level): row.Earned_Date for row in timeline.itertuples()}
+
+    metrics = prefix_metrics(days, volumes)
+    expected = {}
+    for rule in BADGE_RULES:
+        if rule["comparison"] != ">=":
+            continue
+        for level, threshold in enumerate(sorted(rule["levels"]), start=1):
+            reached = [i for i, value in enumerate(metrics[rule["metric"]]) if value >= threshold]
+            if reached:
+                expected[(rule["id"], level)] = days[reached[0]]
+    assert earned == expected
+    assert expected  # the history is long enough to earn something
+
+
+def test_timestamped_days_and_recency(badge_days):
+    badge_days.extend([
+        {"username": "a", "day": "2026-10-12", "volume": 100.0},
+        {"username": "a", "day": "2026-10-13T00:00:00", "volume": 200.0},
+    ])
+    standings, _ = helpers._evaluate_group_badges(TODAY)
+    values = dict(zip(standings["Badge"], standings["Value"]))
+    assert values["ten_sessions"] == 2
+    assert values["fresh_session"] == 4
+    assert values["volume_beast"] == 300
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.helpers import _bodyweight_history_frame, bodyweight_asof
+
+
+def baseline_asof(dates, bw_history, fallback):
+    """The original per-date lookup: last history entry on or before the date"""
+    return [
+        bw_history[bw_history['Date'] <= day]['Bodyweight_kg'].iloc[-1]
+        if len(bw_history[bw_history['Date'] <= day]) > 0
+        else fallback
+        for day in dates
+    ]
+
+
+def history(*entries):
+    return _bodyweight_history_frame([{"date": day, "bodyweight_kg": kg} for day, kg in entries])
+
+
+def test_lookup_takes_the_latest_entry_on_or_before_each_date():
+    bw = history(("2026-10-01", 70), ("2026-10-05", 71), ("2026-10-05", 72), ("2026-10-10", 69))
+    dates = pd.to_datetime(["2026-09-30", "2026-10-01", "2026-10-04", "2026-10-05", "2026-10-20"])
+    np.testing.assert_allclose(bodyweight_asof(dates, bw, 78.0), [78, 70, 70, 72, 69])
+
+
+def test_unsorted_input_history_is_sorted_by_the_loader():
+    bw = history(("2026-10-10", 69), ("2026-10-01", 70))
+    np.testing.assert_allclose(bodyweight_asof(pd.to_datetime(["2026-10-05"]), bw, 78.0), [70])
+
+
+def test_missing_dates_and_history_use_the_fallback():
+    bw = history(("2026-10-01", 70), (None, 90))
+    np.testing.assert_allclose(bodyweight_asof(pd.Series([pd.NaT, pd.Timestamp("2026-10-02")]), bw, 78.0), [78, 70])
+    np.testing.assert_allclose(bodyweight_asof(pd.to_datetime(["2026-10-02"]), pd.DataFrame(), 78.0), [78])
+    np.testing.assert_allclose(bodyweight_asof(pd.to_datetime(["2026-10-02"]), None, 78.0), [78])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_the_baseline_lookup(seed):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2026-01-01")
+    bw = history(*[
+        ((start + pd.Timedelta(days=int(day))).strftime("%Y-%m-%d"), float(kg))
+        for day, kg in zip(rng.integers(0, 300, size=40), rng.uniform(60, 80, size=40).round(1))
+    ])
+    dates = pd.Series(start + pd.to_timedelta(rng.integers(-20, 320, size=200), unit="D")).sort_values()
+    np.testing.assert_allclose(bodyweight_asof(dates, bw, 78.0), baseline_asof(dates, bw, 78.0))
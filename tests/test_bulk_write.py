@@ -0,0 +1,95 @@
+import pytest
+
+from utils import helpers
+from utils.storage import SQLiteClient
+from utils.write_queue import WriteQueue
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    """SQLite backend behind a write queue that the test flushes itself; returns (client, queue, batches)"""
+    client = SQLiteClient(str(tmp_path / "app.db"))
+    batches = []
+
+    def apply(op, table_name, rows, on_conflict):
+        batches.append((op, table_name, len(rows)))
+        helpers._apply_queued_write(op, table_name, rows, on_conflict)
+
+    monkeypatch.setattr(WriteQueue, "_run", lambda self: None)
+    queue = WriteQueue(str(tmp_path / "queue.db"), apply)
+    monkeypatch.setattr(helpers, "get_supabase_client", lambda: client)
+    monkeypatch.setattr(helpers, "get_write_queue", lambda: queue)
+    helpers._delta_sync_store.clear()
+    yield client, queue, batches
+    helpers._delta_sync_store.clear()
+
+
+def legacy_row(arm, load):
+    return {"User": "a", "Date": "2026-10-17", "Exercise": "20mm Edge", "Arm": arm,
+            "Sets_Completed": 3, "Reps_Per_Set": 5, "Actual_Load_kg": load, "RPE": 8, "Notes": "Max Hangs"}
+
+
+def select(client, table_name, columns):
+    return client.table(table_name).select(columns).order(columns.split(",")[0].strip()).execute().data
+
+
+def test_session_is_one_batch_per_table(storage):
+    client, queue, batches = storage
+    saved = helpers.save_workout_session(
+        "a",
+        workouts=[legacy_row("L", 20), legacy_row("R", 22)],
+        one_rep_maxes={("20mm Edge", "L"): 30, ("20mm Edge", "R"): 31.5},
+        settings={"workout_count_20mm Edge": 1},
+        activities=[{"date": "2026-10-17", "activity_type": "Gym"}],
+    )
+    assert saved
+    assert queue.flush() is None
+    assert sorted(table_name for _, table_name, _ in batches) == [
+        "activity_log", "user_profile", "user_settings", "workouts",
+    ]
+    assert dict((table_name, count) for _, table_name, count in batches)["workouts"] == 2
+
+    assert select(client, "workouts", "arm, weight, sets, reps, rpe, notes, username") == [
+        {"arm": "L", "weight": 20, "sets": 3, "reps": 5, "rpe": 8, "notes": "Max Hangs", "username": "a"},
+        {"arm": "R", "weight": 22, "sets": 3, "reps": 5, "rpe": 8, "notes": "Max Hangs", "username": "a"},
+    ]
+    assert select(client, "user_profile", "username, left_20mm_current, right_20mm_current") == [
+        {"username": "a", "left_20mm_current": 30.0, "right_20mm_current": 31.5},
+    ]
+    assert select(client, "user_settings", "setting_key, setting_value") == [
+        {"setting_key": "workout_count_20mm Edge", "setting_value": "1"},
+    ]
+    assert select(client, "activity_log", "activity_type, username") == [{"activity_type": "Gym", "username": "a"}]
+
+
+def test_flushed_session_is_visible_to_loaders(storage):
+    client, queue, _ = storage
+    assert helpers._load_user_table_rows("workouts", "a") == []
+    helpers.save_workout_session("a", workouts=[legacy_row("L", 20)])
+    queue.flush()
+    assert [row["weight"] for row in helpers._load_user_table_rows("workouts", "a")] == [20]
+
+
+def test_repeated_profile_saves_update_one_row(storage):
+    client, queue, _ = storage
+    helpers.save_workout_session("a", one_rep_maxes={("Pinch", "L"): 40})
+    helpers.save_workout_session("a", one_rep_maxes={("Pinch", "L"): 42, ("Pinch", "R"): 41})
+    queue.flush()
+    assert select(client, "user_profile", "username, l_pinch_current, r_pinch_current") == [
+        {"username": "a", "l_pinch_current": 42.0, "r_pinch_current": 41.0},
+    ]
+
+
+def test_untracked_1rm_exercise_rejects_the_whole_session(storage):
+    _, queue, _ = storage
+    saved = helpers.save_workout_session("a", workouts=[legacy_row("L", 20)], one_rep_maxes={("Campus", "L"): 10})
+    assert not saved
+    assert queue.status("a")["pending"] == 0
+
+
+def test_empty_writes_queue_nothing(storage):
+    _, queue, _ = storage
+    assert helpers.bulk_write()
+    assert helpers.bulk_write(inserts={"workouts": []}, upserts={"user_settings": ([], "username,setting_key")})
+    assert helpers.save_workout_session("a")
+    assert queue.status()["pending"] == 0
@@ -0,0 +1,29 @@
+import numpy as np
+
+from utils.charts import lttb_indices
+
+
+def test_lttb_keeps_first_last_and_peak():
+    x = np.arange(5000)
+    y = np.sin(x / 50.0)
+    y[3217] = 25.0  # a PR far above the rest of the series
+    indices = lttb_indices(x, y, 200)
+    assert len(indices) == 200
+    assert indices[0] == 0
+    assert indices[-1] == len(y) - 1
+    assert 3217 in indices
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_keeps_a_trough():
+    x = np.arange(1000)
+    y = np.full(1000, 50.0)
+    y[640] = -10.0
+    assert 640 in lttb_indices(x, y, 50)
+
+
+def test_lttb_returns_everything_when_not_downsampling():
+    x = np.arange(10)
+    assert list(lttb_indices(x, x, 10)) == list(range(10))
+    assert list(lttb_indices(x, x, 50)) == list(range(10))
+    assert list(lttb_indices(x, x, 2)) == list(range(10))
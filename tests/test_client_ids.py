@@ -0,0 +1,95 @@
+import pytest
+
+from utils import helpers
+
+
+class ApiError(Exception):
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+
+class LegacyBackend:
+    """A backend without the client_id column: upserts on it fail, inserts are recorded"""
+
+    def __init__(self, code="PGRST204"):
+        self.code = code
+        self.upserts = 0
+        self.inserted = []
+
+    def table(self, table_name):
+        return LegacyQuery(self, table_name)
+
+
+class LegacyQuery:
+    def __init__(self, backend, table_name):
+        self.backend = backend
+        self.table_name = table_name
+        self.action = None
+
+    def upsert(self, rows, on_conflict=""):
+        self.action = ("upsert", rows)
+        return self
+
+    def insert(self, rows):
+        self.action = ("insert", rows)
+        return self
+
+    def execute(self):
+        op, rows = self.action
+        if op == "upsert":
+            self.backend.upserts += 1
+            raise ApiError("Could not find the 'client_id' column", self.backend.code)
+        self.backend.inserted.append((self.table_name, rows))
+
+
+@pytest.fixture(autouse=True)
+def reset_fallbacks():
+    helpers._client_id_fallbacks.clear()
+    yield
+    helpers._client_id_fallbacks.clear()
+
+
+def use_backend(monkeypatch, backend):
+    monkeypatch.setattr(helpers, "get_supabase_client", lambda: backend)
+    monkeypatch.setattr(helpers, "invalidate_user_cache", lambda username, table_name: None)
+
+
+@pytest.mark.parametrize("code", ["PGRST204", "42703", "42P10"])
+def test_missing_client_id_schema_falls_back_to_insert(monkeypatch, code):
+    backend = LegacyBackend(code)
+    use_backend(monkeypatch, backend)
+    rows = [{"username": "a", "weight": 20, "client_id": "abc"}]
+
+    helpers._apply_queued_write("upsert", "workouts", rows, "client_id")
+    helpers._apply_queued_write("upsert", "workouts", rows, "client_id")
+
+    # Only the first write probes the upsert; both land as plain inserts without the column
+    assert backend.upserts == 1
+    assert backend.inserted == [("workouts", [{"username": "a", "weight": 20}])] * 2
+
+
+def test_log_id_is_kept_on_fallback(monkeypatch):
+    backend = LegacyBackend("42P10")
+    use_backend(monkeypatch, backend)
+    rows = [{"username": "a", "log_id": "a_1"}]
+    helpers._apply_queued_write("upsert", "custom_workout_logs", rows, "log_id")
+    assert backend.inserted == [("custom_workout_logs", rows)]
+
+
+def test_other_upsert_errors_are_raised(monkeypatch):
+    backend = LegacyBackend("23505")
+    use_backend(monkeypatch, backend)
+    with pytest.raises(ApiError):
+        helpers._apply_queued_write("upsert", "workouts", [{"username": "a", "client_id": "abc"}], "client_id")
+    assert backend.inserted == []
+    assert not helpers._client_id_fallbacks
+
+
+def test_settings_upserts_never_fall_back(monkeypatch):
+    backend = LegacyBackend("42P10")
+    use_backend(monkeypatch, backend)
+    with pytest.raises(ApiError):
+        helpers._apply_queued_write(
+            "upsert", "user_settings", [{"username": "a", "setting_key": "k"}], "username,setting_key"
+        )
@@ -0,0 +1,86 @@
+import pytest
+
+from utils import helpers
+from utils.storage import SQLiteClient
+
+
+@pytest.fixture
+def client(tmp_path):
+    helpers._delta_sync_store.clear()
+    yield SQLiteClient(str(tmp_path / "app.db"))
+    helpers._delta_sync_store.clear()
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    """after_id of every paginated fetch (None for a full refetch)"""
+    calls = []
+    paged_rows = helpers._paged_rows
+
+    def recording_paged_rows(supabase, table_name, username, after_id=None, **kwargs):
+        calls.append(after_id)
+        return paged_rows(supabase, table_name, username, after_id=after_id, **kwargs)
+
+    monkeypatch.setattr(helpers, "_paged_rows", recording_paged_rows)
+    return calls
+
+
+def log(client, username, *weights):
+    rows = [
+        {"username": username, "date": "2026-10-01", "exercise": "20mm Edge", "arm": "L",
+         "sets": 3, "reps": 5, "weight": weight}
+        for weight in weights
+    ]
+    return client.table("workouts").insert(rows).execute().data
+
+
+def synced_weights(client, username):
+    return [row["weight"] for row in helpers._sync_table_rows(client, "workouts", username)]
+
+
+def test_appended_rows_are_fetched_incrementally(client, fetches):
+    log(client, "a", 20, 22)
+    assert synced_weights(client, "a") == [20, 22]
+    log(client, "a", 24)
+    log(client, "b", 30)
+    assert synced_weights(client, "a") == [20, 22, 24]
+    assert fetches[0] is None
+    assert fetches[1] is not None
+
+
+def test_unchanged_table_is_not_refetched(client, fetches):
+    log(client, "a", 20)
+    synced_weights(client, "a")
+    synced_weights(client, "a")
+    assert fetches == [None]
+
+
+def test_delete_elsewhere_triggers_full_refetch(client, fetches):
+    first, _ = log(client, "a", 20, 22)
+    synced_weights(client, "a")
+    client.table("workouts").delete().eq("id", first["id"]).execute()
+    assert synced_weights(client, "a") == [22]
+    assert fetches == [None, None]
+
+
+def test_delete_plus_append_with_same_count_is_reconciled(client, fetches):
+    first, _ = log(client, "a", 20, 22)
+    synced_weights(client, "a")
+    client.table("workouts").delete().eq("id", first["id"]).execute()
+    log(client, "a", 24)
+    # Count is unchanged and max id moved; the appended slice does not add up, so refetch
+    assert synced_weights(client, "a") == [22, 24]
+    assert fetches[-1] is None
+
+
+def test_forgotten_rows_keep_the_local_copy_in_step(client, fetches):
+    first, _ = log(client, "a", 20, 22)
+    synced_weights(client, "a")
+    helpers._sync_table_rows(client, "workouts", None)
+    deleted = client.table("workouts").delete().eq("id", first["id"]).execute().data
+    helpers._forget_synced_rows("workouts", deleted)
+
+    fetches.clear()
+    assert synced_weights(client, "a") == [22]
+    assert [row["weight"] for row in helpers._sync_table_rows(client, "workouts", None)] == [22]
+    assert fetches == []
@@ -0,0 +1,33 @@
+import pandas as pd
+
+from utils.helpers import _custom_logs_frame, _workouts_frame
+
+
+def test_workout_counts_keep_missing_values():
+    df = _workouts_frame([
+        {"id": 1, "username": "a", "date": "2026-10-01", "exercise": "20mm Edge", "arm": "L",
+         "sets": 3, "reps": "5", "weight": "20", "rpe": None, "notes": None},
+        {"id": 2, "username": "a", "date": "2026-10-02", "exercise": "20mm Edge", "arm": "R",
+         "sets": None, "reps": "x", "weight": 22, "rpe": 8, "notes": "repeaters"},
+    ])
+    assert str(df["Sets_Completed"].dtype) == "Int16"
+    assert str(df["Reps_Per_Set"].dtype) == "Int16"
+    assert df["Sets_Completed"].tolist()[0] == 3
+    assert df["Sets_Completed"].isna().tolist() == [False, True]
+    assert df["Reps_Per_Set"].isna().tolist() == [False, True]
+    # Missing counts are skipped, not averaged in as zeros
+    assert df["Sets_Completed"].mean() == 3
+    assert df["Actual_Load_kg"].dtype == "float32"
+    assert pd.api.types.is_datetime64_any_dtype(df["Date"])
+    assert df["Notes"].tolist() == ["", "repeaters"]
+
+
+def test_custom_log_sets_and_reps_are_typed():
+    df = _custom_logs_frame([
+        {"username": "a", "date": "2026-10-01", "workout_id": 1, "workout_name": "Run",
+         "weight_kg": 10, "sets": "3", "reps": None, "notes": None},
+    ])
+    assert str(df["Sets"].dtype) == "Int16"
+    assert str(df["Reps"].dtype) == "Int16"
+    assert df["Sets"].iloc[0] == 3
+    assert pd.isna(df["Reps"].iloc[0])
@@ -0,0 +1,59 @@
+from utils.protocols import DEFAULT_PROTOCOLS, compile_protocol, phase_at
+
+REPEATERS = DEFAULT_PROTOCOLS["Repeaters 7/3 × 6"]
+
+
+def test_compile_protocol_total_and_segment_order():
+    compiled = compile_protocol(REPEATERS)
+    # 10s prep, 6 × (7 + 3) per hand, 10s switch
+    assert compiled["total"] == 10 + 60 + 10 + 60
+    phases = [segment["phase"] for segment in compiled["segments"]]
+    assert phases[0] == "ready"
+    assert phases[1:3] == ["on", "off"]
+    assert phases.count("switch") == 1
+    assert compiled["ends"][-1] == compiled["total"]
+
+
+def test_zero_length_phases_are_skipped():
+    compiled = compile_protocol({**REPEATERS, "prep_seconds": 0, "off_seconds": 0, "switch_hands": False})
+    assert [segment["phase"] for segment in compiled["segments"]] == ["on"] * 6
+    assert compiled["total"] == 42
+
+
+def test_phase_at_start():
+    segment, remaining = phase_at(compile_protocol(REPEATERS), 0)
+    assert segment["phase"] == "ready"
+    assert remaining == 10
+
+
+def test_phase_at_segment_boundary_moves_to_next_segment():
+    compiled = compile_protocol(REPEATERS)
+    segment, remaining = phase_at(compiled, 9.5)
+    assert segment["phase"] == "ready"
+    assert remaining == 0.5
+
+    segment, remaining = phase_at(compiled, 10)
+    assert segment["phase"] == "on"
+    assert segment["header"] == "RIGHT HAND - Round 1/6"
+    assert remaining == 7
+
+    segment, remaining = phase_at(compiled, 17)
+    assert segment["phase"] == "off"
+    assert remaining == 3
+
+
+def test_phase_at_last_lift_has_banner():
+    compiled = compile_protocol(REPEATERS)
+    # Left hand's last lift starts 10s before the end (7s on + 3s off)
+    segment, _ = phase_at(compiled, compiled["total"] - 10)
+    assert segment["phase"] == "on"
+    assert segment["banner"]
+    assert segment["header"] == "LEFT HAND - Round 6/6"
+
+
+def test_phase_at_end_is_complete():
+    compiled = compile_protocol(REPEATERS)
+    segment, remaining = phase_at(compiled, compiled["total"] - 0.1)
+    assert segment["phase"] == "off"
+    assert phase_at(compiled, compiled["total"]) == (None, 0)
+    assert phase_at(compiled, compiled["total"] + 60) == (None, 0)
@@ -0,0 +1,43 @@
+import pytest
+
+from utils import helpers
+from utils.write_queue import WriteQueue
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    """Offline backend: every settings write stays on a test-driven queue; returns the applied upserts"""
+    monkeypatch.setattr(WriteQueue, "_run", lambda self: None)
+    applied = []
+    queue = WriteQueue(str(tmp_path / "queue.db"), lambda op, table_name, rows, on_conflict: applied.append(rows))
+    stored = [{"username": "a", "setting_key": "weight_units", "setting_value": "kg"}]
+    monkeypatch.setattr(helpers, "get_write_queue", lambda: queue)
+    monkeypatch.setattr(helpers, "_fetch_user_rows", lambda table_name, user: stored if user == "a" else [])
+    return queue, applied
+
+
+def test_workout_count_advances_across_unflushed_sessions(backend):
+    counts = []
+    for _ in range(4):
+        count = helpers.next_workout_count("a", "20mm Edge", bundle={"settings": helpers.load_user_settings("a")})
+        counts.append(count)
+        helpers.save_workout_session("a", settings={"workout_count_20mm Edge": count})
+    assert counts == [1, 2, 0, 1]
+
+
+def test_queued_settings_overlay_loaded_ones(backend):
+    assert helpers.load_user_settings("a") == {"weight_units": "kg"}
+    helpers.set_user_setting("a", "weight_units", "lbs")
+    helpers.set_user_setting("a", "endurance_training_enabled", True)
+    assert helpers.load_user_settings("a") == {"weight_units": "lbs", "endurance_training_enabled": True}
+    assert helpers.load_user_settings("b") == {}
+
+
+def test_settings_writes_share_one_ordered_path(backend):
+    queue, applied = backend
+    bundle = {"settings": {}}
+    helpers.save_workout_session("a", settings={"weight_units": "kg"})
+    helpers.set_user_setting("a", "weight_units", "lbs", bundle=bundle)
+    assert bundle["settings"] == {"weight_units": "lbs"}
+    queue.flush()
+    assert [rows[0]["setting_value"] for rows in applied] == ["kg", "lbs"]
@@ -0,0 +1,147 @@
+import pytest
+
+from utils.storage import UNDEFINED_COLUMN, SQLiteClient, StorageError
+
+
+@pytest.fixture
+def client(tmp_path):
+    return SQLiteClient(str(tmp_path / "app.db"))
+
+
+def workout(username, date, exercise="20mm Edge", arm="L", weight=20, reps=5, sets=3):
+    return {"username": username, "date": date, "exercise": exercise, "arm": arm,
+            "weight": weight, "reps": reps, "sets": sets}
+
+
+@pytest.fixture
+def workouts(client):
+    client.table("workouts").insert([
+        workout("a", "2026-10-01", weight=20),
+        workout("a", "2026-10-02", weight=24, arm="R"),
+        workout("b", "2026-10-03", weight=30),
+        workout("a", "2026-10-04", weight=22, exercise="1RM Test"),
+    ]).execute()
+    return client
+
+
+def test_insert_returns_rows_with_ids_and_timestamp(client):
+    data = client.table("workouts").insert(workout("a", "2026-10-01")).execute().data
+    assert len(data) == 1
+    assert data[0]["id"] == 1
+    assert data[0]["weight"] == 20
+    assert data[0]["timestamp"]
+
+
+def test_filters_order_and_projection(workouts):
+    table = workouts.table
+    rows = table("workouts").select("date, weight").eq("username", "a").order("date", desc=True).execute().data
+    assert rows == [
+        {"date": "2026-10-04", "weight": 22},
+        {"date": "2026-10-02", "weight": 24},
+        {"date": "2026-10-01", "weight": 20},
+    ]
+    assert [r["weight"] for r in table("workouts").select("weight").gt("weight", 22).order("weight").execute().data] == [24, 30]
+    assert len(table("workouts").select("*").gte("weight", 22).lte("weight", 24).execute().data) == 2
+    assert len(table("workouts").select("*").neq("username", "a").execute().data) == 1
+    assert len(table("workouts").select("*").in_("arm", ["R"]).execute().data) == 1
+    assert table("workouts").select("*").in_("arm", []).execute().data == []
+
+
+def test_range_pages_and_exact_count(workouts):
+    query = lambda: workouts.table("workouts").select("id", count="exact").order("id")
+    first = query().range(0, 1).execute()
+    second = query().range(2, 3).execute()
+    assert [r["id"] for r in first.data] == [1, 2]
+    assert [r["id"] for r in second.data] == [3, 4]
+    assert first.count == 4
+    assert [r["id"] for r in query().order("id").limit(1).execute().data] == [1]
+
+
+def test_upsert_updates_on_conflict_and_returns_rows(client):
+    settings = client.table("user_settings")
+    settings.upsert({"username": "a", "setting_key": "units", "setting_value": "kg"},
+                    on_conflict="username,setting_key").execute()
+    data = client.table("user_settings").upsert(
+        [{"username": "a", "setting_key": "units", "setting_value": "lbs"},
+         {"username": "a", "setting_key": "theme", "setting_value": "dark"}],
+        on_conflict="username,setting_key",
+    ).execute().data
+    assert [(r["setting_key"], r["setting_value"]) for r in data] == [("units", "lbs"), ("theme", "dark")]
+    rows = client.table("user_settings").select("*").order("id").execute().data
+    # The conflicting row is updated in place, keeping its id
+    assert [(r["setting_key"], r["setting_value"]) for r in rows] == [("units", "lbs"), ("theme", "dark")]
+    assert rows[0]["id"] == 1
+
+
+def test_upsert_defaults_to_the_declared_unique_key(client):
+    client.table("bodyweights").upsert({"username": "a", "bodyweight_kg": 70}).execute()
+    client.table("bodyweights").upsert({"username": "a", "bodyweight_kg": 72}).execute()
+    assert client.table("bodyweights").select("bodyweight_kg").execute().data == [{"bodyweight_kg": 72}]
+
+
+def test_failed_batch_is_rolled_back(client):
+    client.table("users").insert({"username": "a", "pin": "1"}).execute()
+    with pytest.raises(Exception):
+        client.table("users").insert([{"username": "b", "pin": "2"}, {"username": "a", "pin": "3"}]).execute()
+    assert [r["username"] for r in client.table("users").select("username").execute().data] == ["a"]
+
+
+def test_update_and_delete_return_affected_rows(workouts):
+    updated = workouts.table("workouts").update({"weight": 25}).eq("username", "a").eq("arm", "R").execute().data
+    assert [(r["id"], r["weight"]) for r in updated] == [(2, 25)]
+    deleted = workouts.table("workouts").delete().eq("username", "b").execute().data
+    assert [r["id"] for r in deleted] == [3]
+    assert len(workouts.table("workouts").select("id").execute().data) == 3
+
+
+def test_booleans_round_trip(client):
+    client.table("goals").insert({"username": "a", "exercise": "Pinch", "completed": True}).execute()
+    assert client.table("goals").select("completed").execute().data == [{"completed": True}]
+
+
+@pytest.mark.parametrize("build", [
+    lambda t: t.select("nope"),
+    lambda t: t.select("*").eq("nope", 1),
+    lambda t: t.select("*").order("nope"),
+    lambda t: t.delete().eq("nope", 1),
+])
+def test_unknown_columns_on_reads_raise_undefined_column(client, build):
+    with pytest.raises(StorageError) as error:
+        build(client.table("workouts")).execute()
+    assert error.value.code == UNDEFINED_COLUMN
+
+
+def test_writes_add_new_columns(client):
+    client.table("workouts").insert({"username": "a", "tempo": "3-1-1"}).execute()
+    assert client.table("workouts").select("tempo").execute().data == [{"tempo": "3-1-1"}]
+
+
+def test_invalid_identifiers_are_rejected(client):
+    with pytest.raises(ValueError):
+        client.table("workouts").insert({'weight" FROM users; --': 1}).execute()
+
+
+def test_leaderboard_stats_rpc(workouts):
+    stats = {
+        (r["username"], r["exercise"], r["arm"]): (r["max_load"], r["total_volume"])
+        for r in workouts.rpc("leaderboard_stats").execute().data
+    }
+    assert stats[("a", "20mm Edge", "L")] == (20, 300)
+    assert stats[("a", "20mm Edge", "R")] == (24, 360)
+    assert stats[("b", "20mm Edge", "L")] == (30, 450)
+
+
+def test_badge_daily_stats_rpc_excludes_1rm_tests(workouts):
+    workouts.table("workouts").insert(workout("a", "2026-10-01T18:30:00", weight=10)).execute()
+    days = {(r["username"], r["day"]): r["volume"] for r in workouts.rpc("badge_daily_stats").execute().data}
+    assert days == {
+        ("a", "2026-10-01"): 300 + 150,
+        ("a", "2026-10-02"): 360,
+        ("b", "2026-10-03"): 450,
+        ("a", "2026-10-04"): 0,
+    }
+
+
+def test_unknown_rpc_is_rejected(client):
+    with pytest.raises(ValueError):
+        client.rpc("drop_everything")
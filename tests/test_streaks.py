@@ -0,0 +1,71 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.helpers import calculate_training_streak, training_streaks
+
+
+def baseline_streak(unique_dates):
+    """The original loop: count back from the last session while gaps are <= 7 days"""
+    if not unique_dates:
+        return 0
+    streak = 1
+    for idx in range(len(unique_dates) - 1, 0, -1):
+        if (unique_dates[idx] - unique_dates[idx - 1]).days <= 7:
+            streak += 1
+        else:
+            break
+    return streak
+
+
+def days(*offsets, start=date(2026, 1, 1)):
+    return [start + timedelta(days=offset) for offset in offsets]
+
+
+def test_empty_history():
+    streaks = training_streaks([])
+    assert streaks["current"] == 0
+    assert streaks["longest"] == 0
+    assert streaks["current_start"] is None
+    assert streaks["gaps"] == {}
+
+
+def test_current_and_longest_runs():
+    sessions = days(0, 3, 10, 17, 30, 32)
+    streaks = training_streaks(sessions)
+    # 0-3-10-17 is one run (gaps <= 7); 30 breaks it (13 days)
+    assert streaks["longest"] == 4
+    assert (streaks["longest_start"], streaks["longest_end"]) == (sessions[0], sessions[3])
+    assert streaks["current"] == 2
+    assert (streaks["current_start"], streaks["current_end"]) == (sessions[4], sessions[5])
+    assert streaks["gaps"] == {2: 1, 3: 1, 7: 2, 13: 1}
+
+
+def test_gap_of_exactly_the_tolerance_continues_a_streak():
+    assert training_streaks(days(0, 7, 14))["current"] == 3
+    assert training_streaks(days(0, 8, 16))["current"] == 1
+    assert training_streaks(days(0, 8, 16), tolerance_days=8)["current"] == 3
+
+
+def test_latest_run_wins_a_tie_for_longest():
+    sessions = days(0, 1, 20, 21)
+    streaks = training_streaks(sessions)
+    assert streaks["longest"] == 2
+    assert streaks["longest_start"] == sessions[2]
+
+
+def test_duplicates_unsorted_and_missing_values_are_ignored():
+    sessions = days(5, 0, 5, 3)
+    assert training_streaks(sessions + [None])["current"] == 3
+    series = pd.Series(pd.to_datetime(sessions + [None]))
+    assert training_streaks(series) == training_streaks(sessions)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_the_baseline_streak(seed):
+    rng = np.random.default_rng(seed)
+    offsets = np.unique(rng.integers(0, 400, size=rng.integers(1, 80)))
+    sessions = days(*offsets.tolist())
+    assert calculate_training_streak(sessions) == baseline_streak(sessions)
@@ -0,0 +1,163 @@
+import sqlite3
+
+import pytest
+
+from utils import write_queue
+from utils.write_queue import MAX_ATTEMPTS, WriteQueue, is_permanent_error
+
+
+class ApiError(Exception):
+    """Stand-in for a PostgREST error carrying a SQLSTATE/PGRST code"""
+
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+
+class Backend:
+    """Records applied writes; raises the queued errors first"""
+
+    def __init__(self):
+        self.applied = []
+        self.errors = []
+
+    def apply(self, op, table_name, rows, on_conflict):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.applied.append((op, table_name, [row["n"] for row in rows], on_conflict))
+
+
+@pytest.fixture
+def backend():
+    return Backend()
+
+
+@pytest.fixture
+def queue(tmp_path, backend, monkeypatch):
+    # Drive flush() from the test instead of the background worker
+    monkeypatch.setattr(WriteQueue, "_run", lambda self: None)
+    return WriteQueue(str(tmp_path / "queue.db"), backend.apply)
+
+
+def enqueue(queue, username, n, table_name="workouts"):
+    queue.enqueue("upsert", table_name, [{"username": username, "n": n}], "client_id")
+
+
+def test_flush_applies_in_order_and_empties_queue(queue, backend):
+    for n in range(3):
+        enqueue(queue, "a", n)
+    assert queue.flush() is None
+    assert [applied[2] for applied in backend.applied] == [[0], [1], [2]]
+    assert queue.status("a")["pending"] == 0
+    assert queue.status("a")["flushed"] == 3
+
+
+def test_transient_failure_backs_off_and_holds_later_writes(queue, backend):
+    enqueue(queue, "a", 0)
+    enqueue(queue, "a", 1)
+    backend.errors.append(ConnectionError("offline"))
+
+    wait = queue.flush()
+    assert backend.applied == []
+    assert 0 < wait <= write_queue.RETRY_BASE_SECONDS
+    status = queue.status("a")
+    assert status["pending"] == 2
+    assert status["attempts"] == 1
+    assert status["last_error"] == "offline"
+
+    # Still backing off - nothing is retried early
+    queue.flush()
+    assert backend.applied == []
+
+    queue.retry_now("a")
+    assert queue.flush() is None
+    assert [applied[2] for applied in backend.applied] == [[0], [1]]
+
+
+def test_one_users_backoff_does_not_hold_other_users(queue, backend):
+    enqueue(queue, "a", 0)
+    enqueue(queue, "b", 1)
+    enqueue(queue, "a", 2)
+    backend.errors.append(ConnectionError("offline"))
+
+    queue.flush()
+    assert [applied[2] for applied in backend.applied] == [[1]]
+    assert queue.status("a")["pending"] == 2
+    assert queue.status("b")["pending"] == 0
+
+
+def test_permanent_failure_is_parked_and_queue_keeps_draining(queue, backend):
+    enqueue(queue, "a", 0)
+    enqueue(queue, "a", 1)
+    backend.errors.append(ApiError("null value in column", "23502"))
+
+    assert queue.flush() is None
+    assert [applied[2] for applied in backend.applied] == [[1]]
+    status = queue.status("a")
+    assert status["pending"] == 0
+    assert status["failed"] == 1
+    [failed] = queue.failed_writes("a")
+    assert failed["table_name"] == "workouts"
+    assert failed["row_count"] == 1
+    assert failed["attempts"] == 1
+    assert queue.failed_writes("b") == []
+
+
+def test_write_is_parked_after_max_attempts(queue, backend):
+    enqueue(queue, "a", 0)
+    backend.errors.extend(ConnectionError("offline") for _ in range(MAX_ATTEMPTS))
+    for _ in range(MAX_ATTEMPTS):
+        queue.retry_now()
+        queue.flush()
+    assert queue.status("a")["pending"] == 0
+    assert queue.failed_writes("a")[0]["attempts"] == MAX_ATTEMPTS
+
+
+def test_retry_and_discard_failed_writes(queue, backend):
+    enqueue(queue, "a", 0)
+    enqueue(queue, "a", 1)
+    backend.errors.extend([sqlite3.IntegrityError("UNIQUE"), sqlite3.IntegrityError("UNIQUE")])
+    queue.flush()
+    first, second = queue.failed_writes("a")
+
+    queue.retry_failed(first["id"])
+    assert queue.status("a")["pending"] == 1
+    assert queue.flush() is None
+    assert [applied[2] for applied in backend.applied] == [[0]]
+
+    queue.discard_failed(second["id"])
+    assert queue.status("a")["failed"] == 0
+
+
+def test_pending_rows_lists_a_users_unflushed_rows(queue, backend):
+    enqueue(queue, "a", 0, table_name="user_settings")
+    enqueue(queue, "b", 1, table_name="user_settings")
+    enqueue(queue, "a", 2, table_name="user_settings")
+    assert [row["n"] for row in queue.pending_rows("user_settings", "a")] == [0, 2]
+    queue.flush()
+    assert queue.pending_rows("user_settings", "a") == []
+
+
+def test_pending_writes_survive_a_restart(tmp_path, backend, monkeypatch):
+    monkeypatch.setattr(WriteQueue, "_run", lambda self: None)
+    path = str(tmp_path / "queue.db")
+    enqueue(WriteQueue(path, backend.apply), "a", 0)
+    reopened = WriteQueue(path, backend.apply)
+    assert reopened.status("a")["pending"] == 1
+    reopened.flush()
+    assert [applied[2] for applied in backend.applied] == [[0]]
+
+
+@pytest.mark.parametrize("error, permanent", [
+    (ApiError("undefined column", "42703"), True),
+    (ApiError("duplicate key", "23505"), True),
+    (ApiError("invalid input syntax", "22P02"), True),
+    (ApiError("schema cache", "PGRST204"), True),
+    (ApiError("connection failure", "08006"), False),
+    (ApiError("gateway timeout", "PGRST000"), False),
+    (ConnectionError("offline"), False),
+    (TimeoutError(), False),
+    (sqlite3.IntegrityError("UNIQUE"), True),
+])
+def test_is_permanent_error(error, permanent):
+    assert is_permanent_error(error) is permanent
@@ -0,0 +1,252 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from utils.helpers import CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES, bodyweight_asof, summarize_aggregates
+
+# Vibrant colors for each exercise-arm combination
+LOAD_COLOR_MAP = {
+    '20mm Edge_L': '#4facfe',  # Bright blue
+    '20mm Edge_R': '#00c9ff',  # Cyan
+    'Pinch_L': '#f093fb',      # Pink
+    'Pinch_R': '#f5576c',      # Red-pink
+    'Wrist Roller_L': '#a8e063',  # Light green
+    'Wrist Roller_R': '#56ab2f',  # Dark green
+}
+RELATIVE_ARM_COLORS = {'L': '#4facfe', 'R': '#f093fb'}
+# Plottable aggregate columns (see summarize_aggregates) and their axis titles
+AGGREGATE_METRICS = {
+    'Mean_Load_kg': 'Load (kg)',
+    'Max_Load_kg': 'Max Load (kg)',
+    'E1RM_kg': 'Estimated 1RM (kg)',
+    'Volume_kg': 'Volume (kg)',
+    'Avg_RPE': 'RPE',
+}
+
+AXIS_STYLE = dict(showgrid=True, gridcolor='rgba(255,255,255,0.1)', title_font=dict(size=16, color='white'))
+LEGEND_STYLE = dict(bgcolor='rgba(0,0,0,0.5)', bordercolor='rgba(255,255,255,0.3)', borderwidth=1)
+
+# Large-history mode: traces longer than this are downsampled (unless raw data is requested)
+DOWNSAMPLE_POINTS = 400
+# Figures with more points than this switch to WebGL (Scattergl) traces
+WEBGL_POINT_THRESHOLD = 1000
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: indices of `n_out` points that keep the visual
+    shape of the series (peaks such as PRs survive). First and last points are kept.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # Bucket edges over the interior points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    prev = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start, next_end = end, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        # Average of the next bucket is the third triangle vertex
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        areas = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        prev = start + int(np.argmax(areas))
+        selected[bucket + 1] = prev
+    return selected
+
+
+def large_history_trace(x, y, raw=False, webgl=False, **kwargs):
+    """
+    Scatter trace for one series: downsampled with LTTB above DOWNSAMPLE_POINTS
+    unless `raw`, and rendered as Scattergl when `webgl` (large figures).
+    """
+    x = pd.Series(x).reset_index(drop=True)
+    y = pd.Series(y).reset_index(drop=True)
+    if not raw and len(y) > DOWNSAMPLE_POINTS:
+        # Datetimes are compared on their integer timeline
+        numeric_x = x.astype('int64') if pd.api.types.is_datetime64_any_dtype(x) else x
+        keep = lttb_indices(numeric_x.to_numpy(), y.to_numpy(dtype=float), DOWNSAMPLE_POINTS)
+        x, y = x.iloc[keep], y.iloc[keep]
+    trace_type = go.Scattergl if webgl else go.Scatter
+    return trace_type(x=x, y=y, **kwargs)
+
+
+def _training_rows(workouts, exercise, arm):
+    """Workouts matching the sidebar filters ("All"/"Both" = no filter), 1RM tests excluded"""
+    df = workouts
+    if exercise != "All":
+        df = df[df['Exercise'] == exercise]
+    if arm != "Both":
+        df = df[df['Arm'] == arm]
+    return df[~df['Exercise'].str.contains('1RM Test', na=False)]
+
+
+def _series_traces(df):
+    """(exercise, arm, subset) per combination present, in the order the old nested loops produced"""
+    exercises = df['Exercise'].unique()
+    arms = df['Arm'].unique()
+    groups = dict(tuple(df.groupby(['Exercise', 'Arm'], sort=False, observed=True)))
+    for exercise in exercises:
+        for arm in arms:
+            subset = groups.get((exercise, arm))
+            if subset is not None and len(subset) > 0:
+                yield exercise, arm, subset
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def build_load_figure(user, exercise, arm, show_endurance_style, raw, metric, data_version, _aggregates):
+    """
+    Figure spec of one aggregate metric over time for a user/filter/style combination.
+    `_aggregates` is one level of the workout aggregate pyramid (see get_workout_aggregates);
+    it is not hashed - the cache is keyed on `data_version` and the granularity is part of it.
+    `raw` disables large-history downsampling.
+    """
+    df = _training_rows(_aggregates, exercise, arm)
+    # Without the endurance styling both kinds of session share one line
+    by = ["Exercise", "Arm", "Endurance", "Period"] if show_endurance_style else ["Exercise", "Arm", "Period"]
+    chart = summarize_aggregates(df, by=by).rename(columns={"Period": "Date", metric: "Value"})
+    chart = chart.dropna(subset=["Value"])
+    if show_endurance_style:
+        chart_strength = chart[~chart["Endurance"]]
+        chart_endurance = chart[chart["Endurance"]]
+    else:
+        chart_strength, chart_endurance = chart, chart.iloc[0:0]
+    webgl = len(chart_strength) + len(chart_endurance) > WEBGL_POINT_THRESHOLD
+
+    fig = go.Figure()
+
+    # Strength sessions (solid lines)
+    for ex, side, subset in _series_traces(chart_strength):
+        color = LOAD_COLOR_MAP.get(f'{ex}_{side}', '#ffffff')
+        fig.add_trace(large_history_trace(
+            subset['Date'],
+            subset['Value'],
+            raw=raw,
+            webgl=webgl,
+            mode='lines+markers',
+            name=f'{ex} - {side}',
+            line=dict(color=color, width=3),
+            marker=dict(size=10, color=color, line=dict(color='white', width=2))
+        ))
+
+    # Endurance sessions (dotted lines, smaller markers)
+    for ex, side, subset in _series_traces(chart_endurance):
+        color = LOAD_COLOR_MAP.get(f'{ex}_{side}', '#ffffff')
+        fig.add_trace(large_history_trace(
+            subset['Date'],
+            subset['Value'],
+            raw=raw,
+            webgl=webgl,
+            mode='lines+markers',
+            name=f'{ex} - {side} (Endurance)',
+            line=dict(color=color, width=2, dash='dot'),
+            marker=dict(size=7, color=color, opacity=0.6, line=dict(color='white', width=1), symbol='square'),
+            opacity=0.7
+        ))
+
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white', size=14),
+        xaxis=dict(AXIS_STYLE, title='Date'),
+        yaxis=dict(AXIS_STYLE, title=AGGREGATE_METRICS.get(metric, metric)),
+        height=500,
+        hovermode='x unified',
+        legend=LEGEND_STYLE
+    )
+    return fig.to_dict()
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def build_relative_strength_figure(user, exercise, arm, fallback_bw, raw, data_version, _workouts, _bw_history):
+    """
+    Relative strength (load/bodyweight) figure spec plus its current/peak/average values.
+    Returns None when there is nothing to plot.
+    """
+    df = _training_rows(_workouts, exercise, arm)
+    if _bw_history.empty or len(df) == 0:
+        return None
+
+    df_strength = df[['Date', 'Exercise', 'Arm', 'Actual_Load_kg']].copy()
+    # Most recent bodyweight on each workout date (current weight before the first entry)
+    df_strength['Bodyweight_kg'] = bodyweight_asof(df_strength['Date'], _bw_history, fallback_bw)
+    df_strength['Relative_Strength'] = df_strength['Actual_Load_kg'] / df_strength['Bodyweight_kg']
+    df_rel = df_strength.groupby(['Date', 'Exercise', 'Arm'], observed=True).agg({
+        'Relative_Strength': 'mean',
+        'Bodyweight_kg': 'first'
+    }).reset_index()
+
+    webgl = len(df_rel) + len(_bw_history) > WEBGL_POINT_THRESHOLD
+    fig = go.Figure()
+    for ex, side, subset in _series_traces(df_rel):
+        color = RELATIVE_ARM_COLORS.get(side, '#ffffff')
+        fig.add_trace(large_history_trace(
+            subset['Date'],
+            subset['Relative_Strength'],
+            raw=raw,
+            webgl=webgl,
+            mode='lines+markers',
+            name=f'{ex} - {side} (Relative)',
+            line=dict(color=color, width=3),
+            marker=dict(size=10, color=color, line=dict(color='white', width=2)),
+            yaxis='y'
+        ))
+
+    # Bodyweight on the secondary y-axis
+    if len(_bw_history) > 1:
+        fig.add_trace(large_history_trace(
+            _bw_history['Date'],
+            _bw_history['Bodyweight_kg'],
+            raw=raw,
+            webgl=webgl,
+            mode='lines+markers',
+            name='Bodyweight',
+            line=dict(color='#fbbf24', width=2, dash='dash'),
+            marker=dict(size=8, color='#fbbf24'),
+            yaxis='y2'
+        ))
+
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white', size=14),
+        xaxis=dict(AXIS_STYLE, title='Date'),
+        yaxis=dict(AXIS_STYLE, title='Relative Strength (Load/BW)', side='left'),
+        yaxis2=dict(
+            showgrid=False,
+            title='Bodyweight (kg)',
+            title_font=dict(size=16, color='#fbbf24'),
+            overlaying='y',
+            side='right',
+            tickfont=dict(color='#fbbf24')
+        ),
+        height=500,
+        hovermode='x unified',
+        legend=LEGEND_STYLE
+    )
+
+    relative = df_rel['Relative_Strength']
+    return {
+        "figure": fig.to_dict(),
+        "current": float(relative.iloc[-1]),
+        "max": float(relative.max()),
+        "mean": float(relative.mean()),
+    }
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def build_custom_metric_figure(user, workout_name, column, title, y_title, data_version, _logs):
+    """Line chart spec of one tracked metric of a custom workout's logs (sorted by date)"""
+    fig = px.line(_logs, x='Date', y=column, title=title, markers=True)
+    fig.update_layout(xaxis_title="Date", yaxis_title=y_title, hovermode='x unified')
+    return fig.to_dict()
@@ -2,14 +2,25 @@ import streamlit as st
 import pandas as pd
 import json
 from supabase import create_client
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import matplotlib.pyplot as plt
 import numpy as np
 import io
+import os
+import hashlib
+import uuid
+import logging
+from pathlib import Path
+import threading
+from collections import Counter
 from PIL import Image, ImageDraw, ImageFont
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from utils.storage import SQLiteClient
+from utils.write_queue import WriteQueue
 
 PLATE_SIZES = [20, 15, 10, 5, 2.5, 2, 1.5, 1, 0.75, 0.5, 0.25]
 
@@ -18,438 +29,66 @@ USER_LIST = ["Oscar", "Ian"]
 PIN_LENGTH = 4
 USER_PLACEHOLDER = "🔒 Select a profile"
 INACTIVITY_THRESHOLD_DAYS = 5
-STYLE_VERSION = "2024-12-11-v2"
+STRENGTH_EXERCISES = ["20mm Edge", "Pinch", "Wrist Roller"]
+# Served by Streamlit at app/static/... (server.enableStaticServing in .streamlit/config.toml)
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+GLOBAL_STYLESHEET = "styles.css"
+# Space Grotesk faces (the font is not vendored under static/)
+GOOGLE_FONTS_URL = "https://fonts.googleapis.com/css2?family=Space+Grotesk:wght@400;500;600;700&display=swap"
+CACHE_TTL_SECONDS = 120
+CACHE_MAX_ENTRIES = 256
+DEFAULT_STORAGE_BACKEND = "supabase"
+DEFAULT_SQLITE_PATH = "yves_tracker.db"
+DEFAULT_WRITE_QUEUE_PATH = "write_queue.db"
+DELTA_SYNC_TABLES = ("workouts", "activity_log", "custom_workout_logs")
+# Tables with a serial id, which gives paginated reads a stable order
+ID_TABLES = DELTA_SYNC_TABLES + ("goals", "custom_workout_templates")
+# Columns each table's loaders and pages actually read (select projections)
+TABLE_COLUMNS = {
+    "workouts": "id, username, date, exercise, arm, sets, reps, weight, rpe, notes",
+    "activity_log": "id, username, date, activity_type, duration_min, notes",
+    "custom_workout_logs": "id, username, date, workout_id, workout_name, weight_kg, sets, reps, duration_min, distance_km, rpe, notes",
+    "goals": "id, username, exercise, arm, target_weight, completed, date_set, date_completed",
+    "custom_workout_templates": (
+        "id, username, workout_name, workout_type, description, tracks_weight, tracks_sets, "
+        "tracks_reps, tracks_duration, tracks_distance, tracks_rpe, created_at"
+    ),
+    "user_settings": "username, setting_key, setting_value",
+    "user_profile": (
+        "username, left_20mm_current, right_20mm_current, left_14mm_current, right_14mm_current, "
+        "l_pinch_current, r_pinch_current, l_wrist_roller_current, r_wrist_roller_current"
+    ),
+    "bodyweights": "username, bodyweight_kg",
+    "bodyweight_history": "username, date, bodyweight_kg",
+    "users": "username, pin",
+}
+# Rows per request; matches PostgREST's default max-rows so pages are never truncated
+FETCH_PAGE_SIZE = 1000
+BUNDLE_TABLES = (
+    "workouts", "activity_log", "custom_workout_logs", "goals",
+    "user_settings", "user_profile", "bodyweights", "bodyweight_history",
+)
+BUNDLE_FETCH_WORKERS = 4
 
-def inject_global_styles():
-    """Apply shared typography, layout, and glass styles once per session."""
-    if st.session_state.get("_global_style_token") == STYLE_VERSION:
-        return
-    st.markdown(
-        """
-        <style>
-        @import url('https://fonts.googleapis.com/css2?family=Space+Grotesk:wght@400;500;600;700&display=swap');
-        
-        /* CSS Variables */
-        :root {
-            --bg-primary: #050B1C;
-            --glass: rgba(12, 18, 35, 0.78);
-            --border-subtle: rgba(255, 255, 255, 0.08);
-            --glow-primary: rgba(107, 140, 255, 0.6);
-            --glow-secondary: rgba(168, 85, 247, 0.6);
-        }
-        
-        /* Keyframe Animations */
-        @keyframes fadeInUp {
-            from {
-                opacity: 0;
-                transform: translateY(30px);
-            }
-            to {
-                opacity: 1;
-                transform: translateY(0);
-            }
-        }
-        
-        @keyframes fadeIn {
-            from { opacity: 0; }
-            to { opacity: 1; }
-        }
-        
-        @keyframes slideInRight {
-            from {
-                opacity: 0;
-                transform: translateX(-30px);
-            }
-            to {
-                opacity: 1;
-                transform: translateX(0);
-            }
-        }
-        
-        @keyframes pulse {
-            0%, 100% {
-                opacity: 1;
-            }
-            50% {
-                opacity: 0.7;
-            }
-        }
-        
-        @keyframes glow {
-            0%, 100% {
-                box-shadow: 0 0 20px var(--glow-primary), 0 0 40px var(--glow-primary);
-            }
-            50% {
-                box-shadow: 0 0 30px var(--glow-secondary), 0 0 60px var(--glow-secondary);
-            }
-        }
-        
-        @keyframes gradientShift {
-            0% {
-                background-position: 0% 50%;
-            }
-            50% {
-                background-position: 100% 50%;
-            }
-            100% {
-                background-position: 0% 50%;
-            }
-        }
-        
-        @keyframes float {
-            0%, 100% {
-                transform: translateY(0px);
-            }
-            50% {
-                transform: translateY(-10px);
-            }
-        }
-        
-        @keyframes shimmer {
-            0% {
-                background-position: -1000px 0;
-            }
-            100% {
-                background-position: 1000px 0;
-            }
-        }
-        
-        /* Base Styles */
-        html, body, [class*="css"]  {
-            font-family: 'Space Grotesk', sans-serif !important;
-            color: #F5F7FF;
-        }
-        
-        body {
-            background: var(--bg-primary);
-            animation: fadeIn 0.6s ease-in;
-        }
-        
-        .main .block-container {
-            padding: 2.5rem 4rem 4rem;
-            max-width: 1200px;
-            animation: fadeInUp 0.8s ease-out;
-        }
-        
-        /* Sidebar Styles */
-        [data-testid="stSidebar"] > div:first-child {
-            background: rgba(8, 12, 28, 0.95);
-            backdrop-filter: blur(20px);
-            border-right: 1px solid rgba(255,255,255,0.05);
-            animation: slideInRight 0.6s ease-out;
-        }
-        
-        /* Section Headings */
-        .section-heading {
-            display: flex;
-            align-items: center;
-            gap: 14px;
-            margin: 40px 0 18px;
-            animation: fadeInUp 0.6s ease-out;
-        }
-        
-        .section-heading:first-child {
-            margin-top: 10px;
-        }
-        
-        .section-heading .section-dot {
-            width: 12px;
-            height: 12px;
-            border-radius: 10px;
-            background: linear-gradient(135deg, #6b8cff, #a855f7);
-            box-shadow: 0 0 18px rgba(130, 155, 255, 0.8);
-            animation: pulse 2s ease-in-out infinite;
-        }
-        
-        .section-heading h3 {
-            margin: 0;
-            font-size: 24px;
-            font-weight: 700;
-        }
-        
-        .section-heading p {
-            margin: 2px 0 0;
-            color: rgba(255,255,255,0.65);
-            font-size: 15px;
-        }
-        
-        /* Hero Card */
-        .hero-card {
-            background: linear-gradient(120deg, rgba(103,118,255,0.25), rgba(209,118,255,0.1));
-            border-radius: 28px;
-            padding: 28px 36px;
-            display: flex;
-            justify-content: space-between;
-            gap: 20px;
-            border: 1px solid rgba(255,255,255,0.08);
-            box-shadow: 0 25px 60px rgba(3,9,30,0.5);
-            margin: 16px 0 28px;
-            animation: fadeInUp 0.8s ease-out;
-            transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-        }
-        
-        .hero-card:hover {
-            transform: translateY(-5px);
-            box-shadow: 0 30px 80px rgba(103, 118, 255, 0.4);
-            border-color: rgba(107, 140, 255, 0.3);
-        }
-        
-        .hero-card .hero-left .eyebrow {
-            text-transform: uppercase;
-            letter-spacing: 1px;
-            font-size: 12px;
-            color: rgba(255,255,255,0.65);
-            margin: 0;
-        }
-        
-        .hero-card .hero-left h2 {
-            margin: 6px 0 8px;
-            font-size: 36px;
-        }
-        
-        .hero-card .hero-left p {
-            margin: 0;
-            color: rgba(255,255,255,0.8);
-        }
-        
-        .hero-card .hero-right {
-            display: flex;
-            flex-direction: column;
-            justify-content: center;
-            align-items: flex-end;
-            text-align: right;
-        }
-        
-        .hero-card .hero-right span {
-            font-size: 12px;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-            color: rgba(255,255,255,0.7);
-        }
-        
-        .hero-card .hero-right strong {
-            font-size: 30px;
-            margin: 6px 0;
-        }
-        
-        .hero-card .hero-right small {
-            color: rgba(255,255,255,0.6);
-        }
-        
-        /* Glass Panel */
-        .glass-panel {
-            background: var(--glass);
-            border: 1px solid var(--border-subtle);
-            border-radius: 22px;
-            padding: 24px 28px;
-            box-shadow: 0 30px 60px rgba(2, 3, 15, 0.5);
-            backdrop-filter: blur(18px);
-            animation: fadeInUp 0.7s ease-out;
-            transition: all 0.3s ease;
-        }
-        
-        .glass-panel:hover {
-            transform: translateY(-3px);
-            box-shadow: 0 35px 70px rgba(2, 3, 15, 0.7);
-        }
-        
-        /* Stat Grid & Cards */
-        .stat-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(160px, 1fr));
-            gap: 16px;
-        }
-        
-        .stat-card {
-            border-radius: 16px;
-            padding: 18px;
-            background: linear-gradient(135deg, rgba(255,255,255,0.08), rgba(255,255,255,0.02));
-            border: 1px solid rgba(255,255,255,0.08);
-            min-height: 120px;
-            animation: fadeInUp 0.6s ease-out backwards;
-            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        }
-        
-        .stat-card:nth-child(1) { animation-delay: 0.1s; }
-        .stat-card:nth-child(2) { animation-delay: 0.2s; }
-        .stat-card:nth-child(3) { animation-delay: 0.3s; }
-        .stat-card:nth-child(4) { animation-delay: 0.4s; }
-        .stat-card:nth-child(5) { animation-delay: 0.5s; }
-        
-        .stat-card:hover {
-            transform: translateY(-5px) scale(1.02);
-            background: linear-gradient(135deg, rgba(107, 140, 255, 0.15), rgba(168, 85, 247, 0.1));
-            border-color: rgba(107, 140, 255, 0.3);
-            box-shadow: 0 10px 30px rgba(107, 140, 255, 0.3);
-        }
-        
-        .stat-card strong {
-            display: block;
-            font-size: 32px;
-            margin-bottom: 6px;
-            transition: color 0.3s ease;
-        }
-        
-        .stat-card:hover strong {
-            color: #6b8cff;
-        }
-        
-        .stat-card small {
-            font-size: 12px;
-            color: rgba(255,255,255,0.65);
-            letter-spacing: 0.3px;
-        }
-        
-        .stat-card span {
-            font-size: 13px;
-            color: rgba(255,255,255,0.7);
-            letter-spacing: 0.5px;
-            text-transform: uppercase;
-        }
-        
-        /* Quick Grid & Cards */
-        .quick-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(220px, 1fr));
-            gap: 18px;
-        }
-        
-        .quick-card {
-            display: block;
-            padding: 22px;
-            border-radius: 18px;
-            background: rgba(17,25,50,0.85);
-            text-decoration: none;
-            border: 1px solid rgba(255,255,255,0.08);
-            color: #F5F7FF;
-            transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-            animation: fadeInUp 0.6s ease-out backwards;
-            position: relative;
-            overflow: hidden;
-        }
-        
-        .quick-card::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(255,255,255,0.1), transparent);
-            transition: left 0.5s ease;
-        }
-        
-        .quick-card:hover::before {
-            left: 100%;
-        }
-        
-        .quick-card:hover {
-            transform: translateY(-8px) scale(1.02);
-            border-color: #7F9FFF;
-            box-shadow: 0 15px 40px rgba(127, 159, 255, 0.4);
-            background: rgba(25,35,70,0.95);
-        }
-        
-        .quick-card .icon {
-            font-size: 36px;
-            margin-bottom: 8px;
-            animation: float 3s ease-in-out infinite;
-        }
-        
-        .quick-card .title {
-            font-size: 18px;
-            font-weight: 600;
-            margin-bottom: 6px;
-        }
-        
-        .quick-card p {
-            margin: 0;
-            font-size: 14px;
-            color: rgba(255,255,255,0.75);
-        }
-        
-        /* Page Headers */
-        .page-header {
-            animation: fadeInUp 0.6s ease-out;
-            transition: all 0.3s ease;
-        }
-        
-        .page-header:hover {
-            transform: scale(1.02);
-        }
-        
-        /* Buttons */
-        .stButton > button {
-            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-            border-radius: 12px;
-            font-weight: 500;
-        }
-        
-        .stButton > button:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 10px 25px rgba(107, 140, 255, 0.4);
-        }
-        
-        /* Section Divider */
-        .section-divider {
-            height: 1px;
-            width: 100%;
-            margin: 40px 0;
-            background: linear-gradient(90deg, rgba(255,255,255,0), rgba(255,255,255,0.25), rgba(255,255,255,0));
-            animation: fadeIn 1s ease-in;
-        }
-        
-        /* Streamlit specific animations */
-        [data-testid="stMetricValue"] {
-            animation: fadeInUp 0.5s ease-out;
-        }
-        
-        [data-testid="stMarkdownContainer"] {
-            animation: fadeIn 0.6s ease-out;
-        }
-        
-        /* Tab animations */
-        .stTabs [data-baseweb="tab-list"] {
-            gap: 8px;
-        }
-        
-        .stTabs [data-baseweb="tab"] {
-            transition: all 0.3s ease;
-            border-radius: 10px;
-        }
-        
-        .stTabs [data-baseweb="tab"]:hover {
-            transform: translateY(-2px);
-        }
-        
-        /* Input focus effects */
-        input:focus, select:focus, textarea:focus {
-            border-color: #6b8cff !important;
-            box-shadow: 0 0 0 2px rgba(107, 140, 255, 0.2) !important;
-            transition: all 0.3s ease;
-        }
-        
-        /* Animated gradient backgrounds */
-        .gradient-animate {
-            background: linear-gradient(270deg, #667eea, #764ba2, #f093fb, #4facfe);
-            background-size: 800% 800%;
-            animation: gradientShift 8s ease infinite;
-        }
-        
-        /* Loading skeleton */
-        .skeleton {
-            background: linear-gradient(90deg, 
-                rgba(255,255,255,0.05) 25%, 
-                rgba(255,255,255,0.1) 50%, 
-                rgba(255,255,255,0.05) 75%);
-            background-size: 200% 100%;
-            animation: shimmer 2s infinite;
-        }
-        </style>
-        """,
-        unsafe_allow_html=True,
+@st.cache_resource
+def _global_style_links():
+    """
+    <link> tags for the Google Fonts faces and the shared stylesheet, the latter
+    versioned by a hash of its content so browsers re-fetch it only when it changes.
+    """
+    digest = hashlib.sha256((STATIC_DIR / GLOBAL_STYLESHEET).read_bytes()).hexdigest()[:12]
+    return "".join(
+        f'<link rel="stylesheet" href="{href}">'
+        for href in (GOOGLE_FONTS_URL, f"app/static/{GLOBAL_STYLESHEET}?v={digest}")
     )
-    st.session_state["_global_style_token"] = STYLE_VERSION
+
+def inject_global_styles():
+    """
+    Link the shared typography, layout, and glass styles (static/styles.css).
+    Only the small <link> tags go over the websocket on each run - the CSS is
+    fetched once through Streamlit's static file serving and cached.
+    """
+    st.markdown(_global_style_links(), unsafe_allow_html=True)
 
 BADGE_RULES = [
     {
@@ -577,125 +216,880 @@ def init_session_state():
     if "goals" not in st.session_state:
         st.session_state.goals = {}
 
-# ==================== GOOGLE SHEETS ====================
+# ==================== STORAGE BACKEND ====================
+def _storage_config(key, default=None):
+    """Read a storage setting from the environment first, then Streamlit secrets"""
+    if os.environ.get(key):
+        return os.environ[key]
+    try:
+        return st.secrets.get(key, default)
+    except Exception:
+        return default
+
 @st.cache_resource
-def get_supabase_client():
-    """Connect to Supabase - returns the client object"""
+def get_storage_client():
+    """
+    Connect to the configured storage backend - returns the client object.
+    STORAGE_BACKEND selects "supabase" (default, hosted) or "sqlite" (local file
+    at SQLITE_PATH); both expose the same table(...).select/insert/upsert/... API.
+    """
+    backend = str(_storage_config("STORAGE_BACKEND", DEFAULT_STORAGE_BACKEND)).lower()
     try:
+        if backend == "sqlite":
+            return SQLiteClient(_storage_config("SQLITE_PATH", DEFAULT_SQLITE_PATH))
         return create_client(
             st.secrets["SUPABASE_URL"],
             st.secrets["SUPABASE_KEY"]
         )
     except Exception as e:
-        st.error(f"Error connecting to Supabase: {e}")
+        st.error(f"Error connecting to {backend} storage: {e}")
         return None
 
+# Legacy name - every helper still asks for "the Supabase client"
+get_supabase_client = get_storage_client
+
 # Legacy alias for compatibility
 # Google Sheets has been fully replaced by Supabase
 # All data operations now go directly to Supabase
 
-@st.cache_data(ttl=120)  # Cache for 2 minutes
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _load_user_table_rows(table_name, username=None):
+    """
+    Cached rows of one table, keyed by (table, username).
+    username=None caches the all-users view of the table. Errors are raised
+    (and therefore not cached) so callers decide what to fall back to.
+    """
+    supabase = get_supabase_client()
+    if not supabase:
+        raise ConnectionError("Supabase client unavailable")
+    
+    if table_name in DELTA_SYNC_TABLES:
+        return _sync_table_rows(supabase, table_name, username)
+    
+    return [row for page in _paged_rows(supabase, table_name, username) for row in page]
+
+# ==================== PAGINATED FETCH ====================
+def _fetch_page_size():
+    """Rows per paginated request (FETCH_PAGE_SIZE, overridable through storage config)"""
+    try:
+        return max(1, int(_storage_config("FETCH_PAGE_SIZE", FETCH_PAGE_SIZE)))
+    except (TypeError, ValueError):
+        return FETCH_PAGE_SIZE
+
+def _table_columns(table_name):
+    """Projection for a table - its declared TABLE_COLUMNS, or everything if it has none or the backend rejected them"""
+    if table_name in _projection_fallbacks:
+        return "*"
+    return TABLE_COLUMNS.get(table_name, "*")
+
+# Tables whose declared projection failed against the backend schema
+_projection_fallbacks = set()
+
+logger = logging.getLogger(__name__)
+# Fallback warnings already logged by this process
+_warned_fallbacks = set()
+
+def _warn_once(key, message):
+    """Log a fallback warning the first time it happens in this process, not on every cache miss"""
+    if key not in _warned_fallbacks:
+        _warned_fallbacks.add(key)
+        logger.warning(message)
+
+def _paged_rows(supabase, table_name, username=None, columns=None, page_size=None, after_id=None):
+    """
+    Yield a table's rows page by page using range(), so results past the
+    server's row cap are never silently dropped. Tables with an id are read in
+    id order (optionally only ids above `after_id`) to keep pages stable.
+    `columns` defaults to the table's declared projection.
+    """
+    page_size = page_size or _fetch_page_size()
+    ordered = table_name in ID_TABLES
+    if columns is None:
+        columns = _table_columns(table_name)
+    start = 0
+    while True:
+        query = _user_query(supabase, table_name, username, columns)
+        if after_id is not None:
+            query = query.gt("id", after_id)
+        if ordered:
+            query = query.order("id")
+        try:
+            page = query.range(start, start + page_size - 1).execute().data or []
+        except Exception as e:
+            # 42703 = undefined_column; anything else (e.g. a network error) is a real failure
+            if start or columns != TABLE_COLUMNS.get(table_name) or getattr(e, "code", None) != "42703":
+                raise
+            # A declared column is missing from this deployment - fall back to select("*")
+            _warn_once(("projection", table_name), f"Projection for {table_name} rejected ({e}), selecting all columns")
+            _projection_fallbacks.add(table_name)
+            columns = "*"
+            continue
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        start += page_size
+
+def iter_table_frames(table_name, username=None, columns=None, page_size=None):
+    """
+    Stream a table (or one user's slice of it) as DataFrame chunks of at most
+    `page_size` rows, for aggregating or exporting large tables with bounded memory.
+    Reads bypass the cache.
+    """
+    supabase = get_supabase_client()
+    if not supabase:
+        raise ConnectionError("Storage client unavailable")
+    
+    for page in _paged_rows(supabase, table_name, username, columns, page_size):
+        yield pd.DataFrame(page)
+
+# ==================== DELTA SYNC ====================
+@st.cache_resource
+def _delta_sync_store():
+    """Process-wide local copies of the append-only tables, keyed by (table, username)"""
+    return {"lock": threading.Lock(), "key_locks": {}, "entries": {}}
+
+def _entry_lock(key):
+    """
+    Lock of one (table, username) entry of the delta-sync store. Every read or
+    write of that entry takes it, so merges, delete reconciliation and snapshot
+    reads never see each other half-applied. The store lock only guards this lookup.
+    """
+    store = _delta_sync_store()
+    with store["lock"]:
+        return store["key_locks"].setdefault(key, threading.Lock())
+
+def _user_query(supabase, table_name, username, columns="*", **kwargs):
+    """Start a select on a table, scoped to one user when a username is given"""
+    query = supabase.table(table_name).select(columns, **kwargs)
+    if username:
+        query = query.eq("username", username)
+    return query
+
+def _table_fingerprint(supabase, table_name, username):
+    """Row count and highest id of a table (or one user's slice of it) - a single id is transferred"""
+    response = (
+        _user_query(supabase, table_name, username, "id", count="exact")
+        .order("id", desc=True)
+        .limit(1)
+        .execute()
+    )
+    max_id = response.data[0]["id"] if response.data else 0
+    return response.count or 0, max_id
+
+def _sync_table_rows(supabase, table_name, username):
+    """
+    Rows of an append-only table, fetched incrementally.
+    The local copy is only extended with rows above its high-water mark (max id).
+    If the count/max-id fingerprint disagrees with what an append would
+    produce (rows deleted elsewhere), the slice is refetched in full.
+    """
+    store = _delta_sync_store()
+    key = (table_name, username)
+    with _entry_lock(key):
+        entry = store["entries"].get(key)
+        count, max_id = _table_fingerprint(supabase, table_name, username)
+        
+        if entry and entry["count"] == count and entry["max_id"] == max_id:
+            return entry["rows"]
+        
+        rows = None
+        stats = None
+        pyramid = None
+        if entry and max_id > entry["max_id"]:
+            new_rows = [
+                row
+                for page in _paged_rows(supabase, table_name, username, after_id=entry["max_id"])
+                for row in page
+            ]
+            if entry["count"] + len(new_rows) == count:
+                rows = entry["rows"] + new_rows
+                stats = entry.get("stats")
+                if stats is not None:
+                    _apply_workout_stats(stats, new_rows)
+                if entry.get("pyramid") is not None:
+                    pyramid = _merge_pyramid(entry["pyramid"], _pyramid_partials(new_rows))
+        
+        if rows is None:
+            rows = [row for page in _paged_rows(supabase, table_name, username) for row in page]
+        
+        store["entries"][key] = {
+            "rows": rows,
+            "count": len(rows),
+            "max_id": max((row["id"] for row in rows), default=0),
+            "stats": stats if stats is not None else _initial_workout_stats(table_name, username, rows),
+            # Built lazily on first read, then merged with each appended batch
+            "pyramid": pyramid,
+        }
+        return rows
+
+def _forget_synced_rows(table_name, rows):
+    """Drop deleted rows from the local copies so the next fingerprint check still matches"""
+    if table_name not in DELTA_SYNC_TABLES or not rows:
+        return
+    
+    store = _delta_sync_store()
+    deleted_ids = {row.get("id") for row in rows}
+    for username in {row.get("username") for row in rows} | {None}:
+        key = (table_name, username)
+        with _entry_lock(key):
+            entry = store["entries"].get(key)
+            if not entry:
+                continue
+            remaining = [row for row in entry["rows"] if row.get("id") not in deleted_ids]
+            if entry.get("stats") is not None:
+                _apply_workout_stats(
+                    entry["stats"], [row for row in entry["rows"] if row.get("id") in deleted_ids], sign=-1
+                )
+            # Maxima cannot be un-merged, so the aggregate pyramid is rebuilt on next read
+            entry.update(rows=remaining, count=len(remaining), pyramid=None)
+
+# ==================== WORKOUT STATS SNAPSHOT ====================
+def _new_workout_stats():
+    """Empty per-user stats snapshot, maintained incrementally as workout rows come and go"""
+    return {
+        "days": Counter(),            # date -> rows logged that day (all workouts)
+        "weeks": Counter(),           # (iso year, iso week) -> rows logged that week
+        "training_days": Counter(),   # date -> rows, excluding 1RM tests
+        "bounds": {},                 # counter name -> (first day, last day)
+        "volume": 0.0,
+        "reps": 0,
+        "rpe_sum": 0.0,
+        "rpe_count": 0,
+    }
+
+def _initial_workout_stats(table_name, username, rows):
+    """Full snapshot for a freshly (re)fetched per-user workouts slice; other tables carry none"""
+    if table_name != "workouts" or not username:
+        return None
+    stats = _new_workout_stats()
+    _apply_workout_stats(stats, rows)
+    return stats
+
+def _row_day(value):
+    """Calendar day of a raw workouts `date` value (ISO date or timestamp), or None"""
+    try:
+        return datetime.fromisoformat(str(value)[:10]).date()
+    except (TypeError, ValueError):
+        return None
+
+def _row_number(value):
+    """Numeric value of a raw column, 0 when missing or unparseable"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if np.isnan(number) else number
+
+def _bump_day(stats, name, day, sign):
+    """Add/remove one row on a day counter, keeping its first/last day current"""
+    counter = stats[name]
+    first, last = stats["bounds"].get(name, (None, None))
+    counter[day] += sign
+    if counter[day] > 0:
+        if sign > 0:
+            first = day if first is None or day < first else first
+            last = day if last is None or day > last else last
+    else:
+        del counter[day]
+        if day == first or day == last:
+            # Only a day dropping out at either end needs a rescan
+            first, last = (min(counter), max(counter)) if counter else (None, None)
+    stats["bounds"][name] = (first, last)
+
+def _apply_workout_stats(stats, rows, sign=1):
+    """Fold raw workout rows into (sign=1) or out of (sign=-1) a stats snapshot"""
+    for row in rows:
+        day = _row_day(row.get("date"))
+        if day is None:
+            continue
+        _bump_day(stats, "days", day, sign)
+        week = day.isocalendar()[:2]
+        stats["weeks"][week] += sign
+        if stats["weeks"][week] <= 0:
+            del stats["weeks"][week]
+        
+        if "1RM Test" in str(row.get("exercise") or ""):
+            continue
+        _bump_day(stats, "training_days", day, sign)
+        weight, reps, sets = (_row_number(row.get(col)) for col in ("weight", "reps", "sets"))
+        stats["volume"] += sign * weight * reps * sets
+        stats["reps"] += sign * int(reps * sets)
+        if row.get("rpe") is not None:
+            stats["rpe_sum"] += sign * _row_number(row["rpe"])
+            stats["rpe_count"] += sign
+
+def summarize_workout_stats(stats, today=None):
+    """Dashboard numbers from a stats snapshot - constant work apart from the sorted day lists"""
+    today = today or datetime.now().date()
+    first_day, last_day = stats["bounds"].get("days", (None, None))
+    training_first, training_last = stats["bounds"].get("training_days", (None, None))
+    week_start = today - timedelta(days=today.weekday())
+    return {
+        "total_sessions": len(stats["days"]),
+        "training_sessions": len(stats["training_days"]),
+        "active_weeks": len(stats["weeks"]),
+        "first_date": first_day,
+        "last_date": last_day,
+        "training_first_date": training_first,
+        "training_last_date": training_last,
+        "days_since_last": (today - last_day).days if last_day else None,
+        "sessions_this_week": sum(
+            1 for offset in range((today - week_start).days + 1)
+            if week_start + timedelta(days=offset) in stats["days"]
+        ),
+        "total_volume": stats["volume"],
+        "total_reps": stats["reps"],
+        "avg_rpe": stats["rpe_sum"] / stats["rpe_count"] if stats["rpe_count"] else 0.0,
+        "session_days": sorted(stats["days"]),
+        "training_days": sorted(stats["training_days"]),
+    }
+
+def get_workout_stats(user, rows=None):
+    """
+    Summary of a user's workout stats from the incrementally maintained snapshot.
+    Falls back to building one from `rows` (raw workout rows) if the user's
+    workouts have not been synced in this process yet.
+    """
+    store = _delta_sync_store()
+    with _entry_lock(("workouts", user)):
+        entry = store["entries"].get(("workouts", user))
+        if entry and entry.get("stats") is not None:
+            return summarize_workout_stats(entry["stats"])
+    
+    stats = _new_workout_stats()
+    _apply_workout_stats(stats, rows if rows is not None else _fetch_user_rows("workouts", user))
+    return summarize_workout_stats(stats)
+
+# ==================== WORKOUT AGGREGATE PYRAMID ====================
+PYRAMID_LEVELS = ("daily", "weekly", "monthly")
+PYRAMID_KEYS = ["Exercise", "Arm", "Endurance", "Period"]
+# How each stored column combines across batches / groups
+PYRAMID_COLUMNS = {
+    "Count": "sum",
+    "Load_sum": "sum",
+    "Load_max": "max",
+    "E1RM_max": "max",
+    "Volume_sum": "sum",
+    "RPE_sum": "sum",
+    "RPE_count": "sum",
+}
+
+def _pyramid_partials(rows):
+    """Daily/weekly/monthly aggregates of raw workout rows per (exercise, arm, endurance, period)"""
+    df = pd.DataFrame(rows, columns=["date", "exercise", "arm", "weight", "reps", "sets", "rpe", "notes"])
+    day = pd.to_datetime(df["date"], format='ISO8601', errors='coerce').dt.normalize()
+    weight = pd.to_numeric(df["weight"], errors='coerce')
+    reps = pd.to_numeric(df["reps"], errors='coerce')
+    sets = pd.to_numeric(df["sets"], errors='coerce')
+    rpe = pd.to_numeric(df["rpe"], errors='coerce')
+    base = pd.DataFrame({
+        "Exercise": df["exercise"],
+        "Arm": df["arm"],
+        "Endurance": df["notes"].fillna('').astype(str).str.lower().str.contains('endurance|repeater'),
+        "Load": weight,
+        # Epley, as in estimate_1rm_epley
+        "E1RM": np.where(reps == 1, weight, weight * (1 + reps / 30)),
+        "Volume": weight * reps * sets,
+        "RPE": rpe,
+    })[day.notna().to_numpy()]
+    day = day.dropna()
+    periods = {
+        "daily": day,
+        "weekly": day - pd.to_timedelta(day.dt.weekday, unit='D'),
+        "monthly": day.dt.to_period('M').dt.start_time,
+    }
+    return {
+        level: base.assign(Period=periods[level]).groupby(PYRAMID_KEYS, observed=True).agg(
+            Count=("Load", "count"),
+            Load_sum=("Load", "sum"),
+            Load_max=("Load", "max"),
+            E1RM_max=("E1RM", "max"),
+            Volume_sum=("Volume", "sum"),
+            RPE_sum=("RPE", "sum"),
+            RPE_count=("RPE", "count"),
+        )
+        for level in PYRAMID_LEVELS
+    }
+
+def _merge_pyramid(pyramid, partials):
+    """Fold freshly aggregated rows into an existing pyramid (returns new frames)"""
+    return {
+        level: pd.concat([pyramid[level], partials[level]]).groupby(level=PYRAMID_KEYS).agg(PYRAMID_COLUMNS)
+        for level in PYRAMID_LEVELS
+    }
+
+def summarize_aggregates(aggregates, by=("Exercise", "Arm", "Endurance", "Period")):
+    """
+    Combine stored aggregates over `by` and derive the chartable metrics:
+    Mean_Load_kg, Max_Load_kg, E1RM_kg, Volume_kg and Avg_RPE (plus Count).
+    """
+    combined = aggregates.groupby(list(by), observed=True).agg(PYRAMID_COLUMNS)
+    return pd.DataFrame({
+        "Count": combined["Count"],
+        "Mean_Load_kg": combined["Load_sum"] / combined["Count"].where(combined["Count"] > 0),
+        "Max_Load_kg": combined["Load_max"],
+        "E1RM_kg": combined["E1RM_max"],
+        "Volume_kg": combined["Volume_sum"],
+        "Avg_RPE": combined["RPE_sum"] / combined["RPE_count"].where(combined["RPE_count"] > 0),
+    }).reset_index()
+
+def get_workout_aggregates(user, level="daily"):
+    """
+    Stored aggregates of a user's workouts at one resolution ("daily", "weekly" or
+    "monthly"), one row per (Exercise, Arm, Endurance, Period). Kept next to the
+    delta-synced rows and extended as new workouts sync, so reads are instant.
+    """
+    rows = _load_user_table_rows("workouts", user)
+    store = _delta_sync_store()
+    with _entry_lock(("workouts", user)):
+        entry = store["entries"].get(("workouts", user))
+        if entry is None:
+            return _pyramid_partials(rows)[level].reset_index()
+        if entry.get("pyramid") is None:
+            entry["pyramid"] = _pyramid_partials(entry["rows"])
+        return entry["pyramid"][level].reset_index()
+
+# ==================== WRITE-BEHIND QUEUE ====================
+# Client-generated id column per append-only table; queued inserts upsert on it
+# (see sql/write_queue_client_ids.sql for the matching unique indexes)
+CLIENT_ID_COLUMNS = {
+    "workouts": "client_id",
+    "activity_log": "client_id",
+    "custom_workout_logs": "log_id",
+}
+# Undefined column (42703), no unique index for ON CONFLICT (42P10), column missing from the schema cache (PGRST204)
+CLIENT_ID_SCHEMA_ERRORS = ("42703", "42P10", "PGRST204")
+# Tables whose backend rejected the client-id upsert; their queued rows are plain inserts
+_client_id_fallbacks = set()
+
+def _apply_queued_write(op, table_name, rows, on_conflict=None):
+    """Send one queued batch to the storage backend, then invalidate the affected users' cache"""
+    supabase = get_supabase_client()
+    if not supabase:
+        raise ConnectionError("Storage client unavailable")
+    
+    client_id = CLIENT_ID_COLUMNS.get(table_name)
+    keyed = op == "upsert" and client_id is not None and on_conflict == client_id
+    if keyed and table_name in _client_id_fallbacks:
+        op, rows = "insert", _without_client_id(table_name, rows)
+    
+    query = supabase.table(table_name)
+    try:
+        if op == "upsert":
+            query.upsert(rows, on_conflict=on_conflict or "").execute()
+        else:
+            query.insert(rows).execute()
+    except Exception as e:
+        # The backend has no client-id column or unique index yet
+        # (sql/write_queue_client_ids.sql not run) - write plain inserts as before
+        if not keyed or op != "upsert" or getattr(e, "code", None) not in CLIENT_ID_SCHEMA_ERRORS:
+            raise
+        _warn_once(
+            ("client_id", table_name),
+            f"Client-id upsert into {table_name} rejected ({e}), falling back to plain inserts",
+        )
+        _client_id_fallbacks.add(table_name)
+        supabase.table(table_name).insert(_without_client_id(table_name, rows)).execute()
+    
+    for username in {row.get("username") for row in rows}:
+        invalidate_user_cache(username, table_name)
+
+def _without_client_id(table_name, rows):
+    """Rows as a plain insert expects them - minus the added client_id column, if the table uses one"""
+    if CLIENT_ID_COLUMNS.get(table_name) != "client_id":
+        return rows
+    return [{k: v for k, v in row.items() if k != "client_id"} for row in rows]
+
+@st.cache_resource
+def get_write_queue():
+    """Process-wide write-behind queue, persisted at WRITE_QUEUE_PATH"""
+    return WriteQueue(_storage_config("WRITE_QUEUE_PATH", DEFAULT_WRITE_QUEUE_PATH), _apply_queued_write)
+
+def render_write_queue_status(username):
+    """
+    Sidebar indicator for one user's queued writes: polls while any are pending,
+    reruns once they are flushed, and lists writes that could not be saved
+    with buttons to retry or discard them.
+    """
+    if not username or username == USER_PLACEHOLDER:
+        return
+    try:
+        queue = get_write_queue()
+    except Exception:
+        return
+    
+    pending = queue.status(username)["pending"]
+    
+    @st.fragment(run_every=2 if pending else None)
+    def write_queue_status():
+        status = queue.status(username)
+        seen_pending = st.session_state.get("_write_queue_pending", 0)
+        st.session_state._write_queue_pending = status["pending"]
+        
+        if status["failed"]:
+            st.error(f"❌ {status['failed']} write(s) could not be saved")
+            for failed in queue.failed_writes(username):
+                st.caption(f"{failed['table_name']} ({failed['row_count']} row(s)): {failed['last_error']}")
+                col_retry, col_discard = st.columns(2)
+                if col_retry.button("🔁 Retry", key=f"write_queue_retry_{failed['id']}", use_container_width=True):
+                    queue.retry_failed(failed["id"])
+                    # Full rerun so the indicator starts polling again
+                    st.rerun()
+                if col_discard.button("🗑️ Discard", key=f"write_queue_discard_{failed['id']}", use_container_width=True):
+                    queue.discard_failed(failed["id"])
+                    st.rerun()
+        
+        if status["pending"] == 0:
+            if seen_pending:
+                # Everything reached the backend - rerun so pages show the new rows
+                st.rerun()
+            if status["flushed"] and not status["failed"]:
+                st.caption("✅ All changes saved")
+            return
+        
+        if status["last_error"]:
+            st.warning(
+                f"⏳ {status['pending']} write(s) waiting for connection - "
+                f"retry {status['attempts']} in {status['retry_in']:.0f}s"
+            )
+            if st.button("🔄 Retry now", key="write_queue_retry", use_container_width=True):
+                queue.retry_now(username)
+        else:
+            st.caption(f"⏳ Saving {status['pending']} write(s)…")
+    
+    with st.sidebar:
+        write_queue_status()
+
+def invalidate_user_cache(username, *table_names):
+    """Drop the cached rows of the given tables for one user, plus each table's all-users view (and the leaderboard and badge standings on workout changes)"""
+    for table_name in table_names:
+        _load_user_table_rows.clear(table_name, username)
+        _load_user_table_rows.clear(table_name, None)
+    if "workouts" in table_names:
+        _load_leaderboard_rows.clear()
+        _evaluate_group_badges.clear()
+
+def _invalidate_returned_rows(table_name, rows):
+    """Invalidate the cache for every user owning one of the rows a delete/update returned"""
+    _forget_synced_rows(table_name, rows)
+    for username in {row.get("username") for row in rows or []}:
+        invalidate_user_cache(username, table_name)
+
 def _load_table_data(table_name):
     """Internal cached function to load data from a specific table"""
     try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return []
-        response = supabase.table(table_name).select("*").execute()
-        return response.data
+        return _load_user_table_rows(table_name, None)
     except Exception as e:
         return []
 
 # Alias for backwards compatibility
 _load_sheet_data = _load_table_data
 
+# ==================== USER DATA BUNDLE ====================
+def _fetch_user_rows(table_name, user):
+    """Fetch one user's (cached) rows from a table, returning an empty list on failure"""
+    try:
+        return _load_user_table_rows(table_name, user)
+    except Exception:
+        return []
+
+def _fetch_user_tables(user, table_names):
+    """
+    Fetch several of one user's tables concurrently on a bounded thread pool.
+    The reads are independent, so a cold load costs the slowest query rather
+    than the sum of all of them. Returns {table_name: rows}.
+    """
+    ctx = get_script_run_ctx()
+    
+    def fetch(table_name):
+        # Attach the script context so cache/session lookups behave as on the main thread
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return _fetch_user_rows(table_name, user)
+    
+    with ThreadPoolExecutor(max_workers=min(BUNDLE_FETCH_WORKERS, len(table_names))) as pool:
+        return dict(zip(table_names, pool.map(fetch, table_names)))
+
+def load_user_data_bundle(user):
+    """
+    Fetch everything the pages need for one user in a single pass.
+    Call once per rerun and hand the bundle to helpers through their `bundle`
+    argument instead of letting each helper query Supabase on its own.
+    """
+    rows = _fetch_user_tables(user, BUNDLE_TABLES)
+    
+    bundle = {
+        "user": user,
+        "workouts": _workouts_frame(rows["workouts"]),
+        "activity_log": _activity_frame(rows["activity_log"]),
+        "custom_workout_logs": _custom_logs_frame(rows["custom_workout_logs"]),
+        "goals": _goals_frame(rows["goals"]),
+        "stats": get_workout_stats(user, rows["workouts"]),
+        "settings": _user_settings(user, rows["user_settings"]),
+        "profile": rows["user_profile"][0] if rows["user_profile"] else {},
+        "bodyweight": 78.0,
+        "bodyweight_history": _bodyweight_history_frame(
+            [{"date": row.get("date"), "bodyweight_kg": row.get("bodyweight_kg")} for row in rows["bodyweight_history"]]
+        ),
+    }
+    
+    bodyweight_rows = rows["bodyweights"]
+    if bodyweight_rows and bodyweight_rows[0].get("bodyweight_kg") is not None:
+        bundle["bodyweight"] = float(bodyweight_rows[0]["bodyweight_kg"])
+    
+    return bundle
+
+
+def _workouts_frame(rows):
+    """Build the workouts DataFrame with the legacy column names the pages expect"""
+    if not rows:
+        return pd.DataFrame()
+    
+    df = pd.DataFrame(rows)
+    # Rename columns to match old Google Sheets format expected by pages
+    column_map = {
+        'id': 'ID',
+        'username': 'User',
+        'date': 'Date',
+        'exercise': 'Exercise',
+        'arm': 'Arm',
+        'sets': 'Sets_Completed',
+        'reps': 'Reps_Per_Set',
+        'weight': 'Actual_Load_kg',
+        'rpe': 'RPE',
+        'notes': 'Notes',
+        'timestamp': 'Timestamp'
+    }
+    df = df.rename(columns=column_map)
+    return _typed_frame(
+        df,
+        dates=['Date'],
+        categories=['User', 'Exercise', 'Arm'],
+        floats=['Actual_Load_kg', 'RPE'],
+        counts=['Sets_Completed', 'Reps_Per_Set'],
+        texts=['Notes'],
+    )
+
+def _typed_frame(df, dates=(), categories=(), floats=(), counts=(), texts=()):
+    """
+    Coerce loader columns once so pages get ready-to-use frames: ISO dates as
+    datetime64, repeated labels as categoricals, measurements as float32,
+    set/rep counts as nullable Int16 (missing stays NA, not 0) and free text
+    with '' for missing.
+    Columns not present in `df` are skipped.
+    """
+    present = lambda columns: [c for c in columns if c in df.columns]
+    for column in present(dates):
+        df[column] = pd.to_datetime(df[column], format='ISO8601', errors='coerce')
+    for column in present(categories):
+        df[column] = df[column].astype('category')
+    for column in present(floats):
+        df[column] = pd.to_numeric(df[column], errors='coerce').astype('float32')
+    for column in present(counts):
+        df[column] = pd.to_numeric(df[column], errors='coerce').astype('Int16')
+    for column in present(texts):
+        df[column] = df[column].fillna('').astype(str)
+    return df
+
 def load_data_from_sheets(worksheet, user=None):
     """Load all data from workouts table, optionally filtered by user"""
     try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return pd.DataFrame()
-        
-        query = supabase.table("workouts").select("*")
-        if user:
-            query = query.eq("username", user)
-        
-        response = query.execute()
-        if response.data:
-            df = pd.DataFrame(response.data)
-            # Rename columns to match old Google Sheets format expected by pages
-            column_map = {
-                'id': 'ID',
-                'username': 'User',
-                'date': 'Date',
-                'exercise': 'Exercise',
-                'arm': 'Arm',
-                'sets': 'Sets_Completed',
-                'reps': 'Reps_Per_Set',
-                'weight': 'Actual_Load_kg',
-                'rpe': 'RPE',
-                'notes': 'Notes',
-                'timestamp': 'Timestamp'
-            }
-            df = df.rename(columns=column_map)
-            
-            # Add missing columns that the app expects
-            if 'Planned_Load_kg' not in df.columns:
-                df['Planned_Load_kg'] = df['Actual_Load_kg']
-            if 'Sets' not in df.columns:
-                df['Sets'] = df['Sets_Completed']
-            if 'Reps' not in df.columns:
-                df['Reps'] = df['Reps_Per_Set']
-            if 'Weight' not in df.columns:
-                df['Weight'] = df['Actual_Load_kg']
-                
-            return df
+        return _workouts_frame(_load_user_table_rows("workouts", user))
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
         return pd.DataFrame()
+
+# ==================== LEADERBOARD ====================
+LEADERBOARD_KEYS = ['username', 'exercise', 'arm']
+
+def _aggregate_leaderboard_chunk(df):
+    """Partial leaderboard stats (max load, volume sum) for one chunk of workout rows"""
+    weight = pd.to_numeric(df['weight'], errors='coerce')
+    volume = weight * pd.to_numeric(df['reps'], errors='coerce') * pd.to_numeric(df['sets'], errors='coerce')
+    return (
+        df[LEADERBOARD_KEYS].assign(max_load=weight, total_volume=volume)
+        .groupby(LEADERBOARD_KEYS, dropna=False)
+        .agg(max_load=('max_load', 'max'), total_volume=('total_volume', 'sum'))
+    )
+
+def _aggregate_leaderboard_rows():
+    """
+    Local equivalent of the leaderboard_stats RPC, for backends without it.
+    Workouts are streamed in pages and folded into running per-key partials,
+    so memory stays bounded by users x exercises rather than logged sets.
+    """
+    stats = None
+    for chunk in iter_table_frames("workouts", columns="username, exercise, arm, weight, reps, sets"):
+        partial = _aggregate_leaderboard_chunk(chunk)
+        stats = partial if stats is None else (
+            pd.concat([stats, partial])
+            .groupby(level=LEADERBOARD_KEYS, dropna=False)
+            .agg(max_load=('max_load', 'max'), total_volume=('total_volume', 'sum'))
+        )
+    if stats is None:
+        return []
+    stats = stats.reset_index()
+    return stats.astype(object).where(stats.notna(), None).to_dict('records')
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def _load_leaderboard_rows():
+    """
+    Per (username, exercise, arm) max load and total volume, shared by all sessions.
+    Aggregated on the backend by the leaderboard_stats function (see
+    sql/leaderboard_stats.sql); falls back to aggregating every workout row
+    locally if the function has not been deployed.
+    """
+    supabase = get_supabase_client()
+    if not supabase:
+        raise ConnectionError("Storage client unavailable")
+    
+    try:
+        return supabase.rpc("leaderboard_stats").execute().data or []
     except Exception as e:
-        st.error(f"Error loading data: {e}")
-        return pd.DataFrame()
+        _warn_once("leaderboard_stats", f"leaderboard_stats unavailable ({e}), aggregating workouts locally")
+        return _aggregate_leaderboard_rows()
+
+def load_leaderboard():
+    """Leaderboard stats as a DataFrame with columns User, Exercise, Arm, Max_Load_kg, Volume_kg"""
+    columns = ['User', 'Exercise', 'Arm', 'Max_Load_kg', 'Volume_kg']
+    try:
+        rows = _load_leaderboard_rows()
+    except Exception as e:
+        st.error(f"Error loading leaderboard: {e}")
+        return pd.DataFrame(columns=columns)
+    
+    df = pd.DataFrame(rows, columns=['username', 'exercise', 'arm', 'max_load', 'total_volume'])
+    df.columns = columns
+    df['Max_Load_kg'] = pd.to_numeric(df['Max_Load_kg'], errors='coerce')
+    df['Volume_kg'] = pd.to_numeric(df['Volume_kg'], errors='coerce').fillna(0.0)
+    return df
+
+def load_all_bodyweights():
+    """Current bodyweight of every user as {username: kg}"""
+    try:
+        rows = _load_user_table_rows("bodyweights", None)
+    except Exception:
+        return {}
+    return {
+        row["username"]: float(row["bodyweight_kg"])
+        for row in rows
+        if row.get("username") and row.get("bodyweight_kg")
+    }
 
 def save_workout_to_sheets(row_data):
-    """Save a new workout to the workouts table"""
+    """Queue a new workout for the workouts table (written in the background)"""
+    return bulk_write(inserts={"workouts": [_workout_record(row_data)]})
+
+def _workout_record(row_data):
+    """Map a legacy (sheet-style) workout row to the workouts table columns"""
+    return {
+        "username": row_data.get("User"),
+        "date": row_data.get("Date"),
+        "exercise": row_data.get("Exercise"),
+        "arm": row_data.get("Arm"),
+        "sets": row_data.get("Sets_Completed") or row_data.get("Sets"),
+        "reps": row_data.get("Reps_Per_Set") or row_data.get("Reps"),
+        "weight": row_data.get("Actual_Load_kg") or row_data.get("Weight"),
+        "rpe": row_data.get("RPE"),
+        "notes": row_data.get("Notes", "")
+    }
+
+# ==================== BULK WRITES ====================
+def bulk_write(inserts=None, upserts=None):
+    """
+    Commit rows across several tables in as few round trips as possible.
+    `inserts` maps table -> list of rows (one batched insert per table);
+    `upserts` maps table -> (rows, on_conflict). Inserts into tables listed in
+    CLIENT_ID_COLUMNS are queued as upserts on a client-generated id, so a
+    replayed batch cannot duplicate rows. Each table's batch is queued on the
+    write-behind queue and this returns as soon as it is on disk;
+    the background flush invalidates the cache once per batch.
+    Tables are written one after another - there is no cross-table transaction.
+    """
+    inserts = {table: rows for table, rows in (inserts or {}).items() if rows}
+    upserts = {table: spec for table, spec in (upserts or {}).items() if spec[0]}
+    if not inserts and not upserts:
+        return True
+    
     try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return False
-        
-        # Map old column names to new schema
-        workout_data = {
-            "username": row_data.get("User"),
-            "date": row_data.get("Date"),
-            "exercise": row_data.get("Exercise"),
-            "arm": row_data.get("Arm"),
-            "sets": row_data.get("Sets_Completed") or row_data.get("Sets"),
-            "reps": row_data.get("Reps_Per_Set") or row_data.get("Reps"),
-            "weight": row_data.get("Actual_Load_kg") or row_data.get("Weight"),
-            "rpe": row_data.get("RPE"),
-            "notes": row_data.get("Notes", "")
-        }
-        
-        supabase.table("workouts").insert(workout_data).execute()
-        _load_table_data.clear()
+        queue = get_write_queue()
+        for table_name, rows in inserts.items():
+            key = CLIENT_ID_COLUMNS.get(table_name)
+            if key is None:
+                queue.enqueue("insert", table_name, rows)
+                continue
+            # Stamp each row with an id of its own so a retried batch that already
+            # reached the backend updates those rows instead of duplicating them
+            rows = [row if row.get(key) else {**row, key: uuid.uuid4().hex} for row in rows]
+            queue.enqueue("upsert", table_name, rows, key)
+        for table_name, (rows, on_conflict) in upserts.items():
+            queue.enqueue("upsert", table_name, rows, on_conflict)
         return True
     except Exception as e:
-        st.error(f"Error saving workout: {e}")
+        st.error(f"Error saving session: {e}")
         return False
 
-def get_last_workout(user, exercise, arm):
+def save_workout_session(user, workouts=(), one_rep_maxes=None, settings=None, activities=()):
+    """
+    Log a full session (several exercises, both arms) with a single bulk write.
+    `workouts` are legacy-format workout rows, `one_rep_maxes` maps
+    (exercise, arm) -> kg for the user's profile, `settings` is a dict of
+    user settings and `activities` are activity_log rows.
+    """
+    upserts = {}
+    if one_rep_maxes:
+        profile_row = {"username": user}
+        for (exercise, arm), value in one_rep_maxes.items():
+            col_name = _profile_1rm_column(exercise, arm)
+            if col_name is None:
+                st.error(f"Exercise '{exercise}' has no 1RM column in user_profile")
+                return False
+            profile_row[col_name] = float(value)
+        upserts["user_profile"] = ([profile_row], "username")
+    if settings:
+        upserts["user_settings"] = (_setting_rows(user, settings), "username,setting_key")
+    
+    return bulk_write(
+        inserts={
+            "workouts": [_workout_record(row_data) for row_data in workouts],
+            "activity_log": [{"username": user, **activity} for activity in activities],
+        },
+        upserts=upserts,
+    )
+
+def get_last_workout(user, exercise, arm, bundle=None):
     """Get the most recent workout for a specific user, exercise, and arm"""
     try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return None
-        
-        # Get workouts from Supabase
-        response = supabase.table("workouts").select("*").eq("username", user).eq("exercise", exercise).eq("arm", arm).order("date", desc=True).limit(1).execute()
-        
-        if not response.data or len(response.data) == 0:
-            return None
-        
-        last_workout = response.data[0]
+        if bundle is not None:
+            df = bundle["workouts"]
+            if df.empty:
+                return None
+            
+            matches = df[(df['Exercise'] == exercise) & (df['Arm'] == arm)]
+            if matches.empty:
+                return None
+            
+            row = matches.sort_values('Date', kind='stable', na_position='first').iloc[-1]
+            last_workout = {
+                'date': row['Date'].strftime('%Y-%m-%d') if pd.notna(row['Date']) else 'Unknown',
+                'weight': float(row['Actual_Load_kg']),
+                'reps': int(row['Reps_Per_Set']) if pd.notna(row['Reps_Per_Set']) else 0,
+                'sets': int(row['Sets_Completed']) if pd.notna(row['Sets_Completed']) else 0,
+                'rpe': float(row['RPE']) if pd.notna(row['RPE']) else 0,
+                'notes': row.get('Notes', '')
+            }
+        else:
+            supabase = get_supabase_client()
+            if not supabase:
+                return None
+            
+            # Get workouts from Supabase
+            response = supabase.table("workouts").select("date, weight, reps, sets, rpe, notes").eq("username", user).eq("exercise", exercise).eq("arm", arm).order("date", desc=True).limit(1).execute()
+            
+            if not response.data or len(response.data) == 0:
+                return None
+            
+            last_workout = response.data[0]
         
         return {
             'date': last_workout.get('date', 'Unknown'),
@@ -853,6 +1247,7 @@ def user_selectbox_with_pin(available_users, user_pins, selector_key, label="Sel
 
     display_active = "🔒 Locked" if active_user == USER_PLACEHOLDER else active_user
     st.sidebar.caption(f"Active profile: {display_active}")
+    render_write_queue_status(active_user)
 
     if selected_candidate == USER_PLACEHOLDER:
         if active_user != USER_PLACEHOLDER:
@@ -888,17 +1283,81 @@ def user_selectbox_with_pin(available_users, user_pins, selector_key, label="Sel
 
     return st.session_state.current_user
 
+STREAK_TOLERANCE_DAYS = 7
+
+def _day_ordinals(dates):
+    """Sorted unique day ordinals from date objects or a datetime array/Series, missing values dropped"""
+    if isinstance(dates, (np.ndarray, pd.Series, pd.Index)):
+        days = np.asarray(dates, dtype='datetime64[D]')
+        days = days[~np.isnat(days)]
+        # Epoch days -> proleptic Gregorian ordinals, matching date.toordinal()
+        ordinals = days.astype(np.int64) + date(1970, 1, 1).toordinal()
+    else:
+        ordinals = np.fromiter(
+            # `day == day` drops NaT/NaN without a per-item pd.isna call
+            (day.toordinal() for day in dates if day is not None and day == day), dtype=np.int64
+        )
+    ordinals.sort()
+    # Sort + neighbour mask is much cheaper than np.unique on short arrays
+    keep = np.ones(len(ordinals), dtype=bool)
+    keep[1:] = ordinals[1:] != ordinals[:-1]
+    return ordinals[keep]
+
+def training_streaks(dates, tolerance_days=STREAK_TOLERANCE_DAYS):
+    """
+    Current/longest streak, their start/end dates and the gap histogram in one diff pass.
+    A streak is a run of session days with at most `tolerance_days` between neighbours.
+    """
+    days = _day_ordinals(dates)
+    if len(days) == 0:
+        return {
+            "current": 0, "current_start": None, "current_end": None,
+            "longest": 0, "longest_start": None, "longest_end": None,
+            "gaps": {},
+        }
+    
+    gaps = np.diff(days)
+    breaks = np.flatnonzero(gaps > tolerance_days)
+    starts = np.concatenate(([0], breaks + 1))
+    ends = np.concatenate((breaks, [len(days) - 1]))
+    lengths = ends - starts + 1
+    # Latest run wins a tie for longest
+    best = len(lengths) - 1 - int(np.argmax(lengths[::-1]))
+    gap_counts = np.bincount(gaps)
+    gap_values = np.flatnonzero(gap_counts)
+    as_date = lambda value: date.fromordinal(int(value))
+    return {
+        "current": int(lengths[-1]),
+        "current_start": as_date(days[starts[-1]]),
+        "current_end": as_date(days[-1]),
+        "longest": int(lengths[best]),
+        "longest_start": as_date(days[starts[best]]),
+        "longest_end": as_date(days[ends[best]]),
+        "gaps": dict(zip(gap_values.tolist(), gap_counts[gap_values].tolist())),
+    }
+
 def calculate_training_streak(unique_dates):
     """Return streak length allowing <=7 days between logged sessions."""
-    if not unique_dates:
-        return 0
-    streak = 1
-    for idx in range(len(unique_dates) - 1, 0, -1):
-        if (unique_dates[idx] - unique_dates[idx - 1]).days <= 7:
-            streak += 1
-        else:
-            break
-    return streak
+    return training_streaks(unique_dates)["current"]
+
+def _badge_levels(rule):
+    """Ascending threshold array of a badge rule (single-target rules become one level)"""
+    levels = rule.get("levels")
+    if not levels:
+        target = rule.get("target")
+        levels = [target] if target is not None else []
+    return np.sort(np.asarray(levels, dtype=float))
+
+def _badge_level_counts(rule, values):
+    """Levels reached for an array of metric values - one searchsorted over the rule's thresholds"""
+    levels = _badge_levels(rule)
+    values = np.asarray(values, dtype=float)
+    if rule.get("comparison", ">=") == "<=":
+        # Levels are ordered strictest-last, so every threshold >= value is reached
+        counts = len(levels) - np.searchsorted(levels, values, side='left')
+    else:
+        counts = np.searchsorted(levels, values, side='right')
+    return np.where(np.isnan(values), 0, counts).astype(int)
 
 def evaluate_badges(stats):
     """Determine which performance badges are earned based on stats dict."""
@@ -917,18 +1376,7 @@ def evaluate_badges(stats):
         total_levels = len(levels)
         current_level = 0
         if value is not None and total_levels > 0:
-            if comparison == ">=":
-                for threshold in levels:
-                    if value >= threshold:
-                        current_level += 1
-                    else:
-                        break
-            elif comparison == "<=":
-                for threshold in levels:
-                    if value <= threshold:
-                        current_level += 1
-                    else:
-                        break
+            current_level = int(_badge_level_counts(rule, [value])[0])
         earned_any = current_level > 0
         maxed_out = total_levels > 0 and current_level >= total_levels
         next_target = levels[current_level] if current_level < total_levels else None
@@ -954,8 +1402,158 @@ def evaluate_badges(stats):
         })
     return evaluated
 
-def get_bodyweight(user):
+def _badge_metric_series(days, volume, today):
+    """
+    Current badge metrics of one user plus, per cumulative metric, its running
+    value on each session day (used to date when each level was crossed).
+    `days` are sorted unique day ordinals, `volume` the non-test volume per day.
+    """
+    # Ordinal 1 (0001-01-01) is a Monday
+    week_starts = days - (days - 1) % 7
+    new_week = np.ones(len(days), dtype=bool)
+    new_week[1:] = week_starts[1:] != week_starts[:-1]
+    week_index = np.cumsum(new_week) - 1
+    first_in_week = np.flatnonzero(new_week)
+    new_run = np.ones(len(days), dtype=bool)
+    new_run[1:] = np.diff(days) > STREAK_TOLERANCE_DAYS
+    run_start = np.maximum.accumulate(np.where(new_run, np.arange(len(days)), 0))
+    position = np.arange(len(days))
+    
+    running = {
+        "total_sessions": position + 1.0,
+        "active_weeks": week_index + 1.0,
+        "total_volume": np.cumsum(volume),
+        # Streak/weekly counts can fall again, so a level is crossed once the running max reaches it
+        "current_streak": np.maximum.accumulate(position - run_start + 1).astype(float),
+        "sessions_this_week": np.maximum.accumulate(position - first_in_week[week_index] + 1).astype(float),
+    }
+    today_ordinal = today.toordinal()
+    this_week = today_ordinal - today.weekday()
+    current = {
+        "total_sessions": float(len(days)),
+        "active_weeks": float(week_index[-1] + 1),
+        "total_volume": float(running["total_volume"][-1]),
+        "current_streak": float(position[-1] - run_start[-1] + 1),
+        "sessions_this_week": float(np.count_nonzero((days >= this_week) & (days <= today_ordinal))),
+        "days_since_last": float(today_ordinal - days[-1]),
+    }
+    return current, running
+
+BADGE_DAY_KEYS = ['username', 'day']
+
+def _badge_day_chunk(chunk):
+    """Non-test training volume per (username, day) of one page of workout rows"""
+    chunk = chunk.reindex(columns=['username', 'date', 'exercise', 'weight', 'reps', 'sets'])
+    is_test = chunk['exercise'].astype(str).str.contains('1RM Test', na=False)
+    volume = np.where(
+        is_test,
+        0.0,
+        pd.to_numeric(chunk['weight'], errors='coerce').fillna(0)
+        * pd.to_numeric(chunk['reps'], errors='coerce').fillna(0)
+        * pd.to_numeric(chunk['sets'], errors='coerce').fillna(0),
+    )
+    frame = pd.DataFrame({
+        'username': chunk['username'],
+        'day': pd.to_datetime(chunk['date'], format='ISO8601', errors='coerce').dt.strftime('%Y-%m-%d'),
+        'volume': volume,
+    }).dropna(subset=BADGE_DAY_KEYS)
+    return frame.groupby(BADGE_DAY_KEYS)['volume'].sum()
+
+def _aggregate_badge_day_rows():
+    """
+    Local equivalent of the badge_daily_stats RPC, for backends without it.
+    Workouts are streamed in pages and folded into per (username, day) sums,
+    so memory stays bounded by users x training days rather than logged sets.
+    """
+    volume = None
+    for chunk in iter_table_frames("workouts", columns="username, date, exercise, weight, reps, sets"):
+        partial = _badge_day_chunk(chunk)
+        volume = partial if volume is None else pd.concat([volume, partial]).groupby(level=BADGE_DAY_KEYS).sum()
+    if volume is None:
+        return []
+    return volume.reset_index().to_dict('records')
+
+def _load_badge_day_rows():
+    """
+    Non-test volume per (username, day) for every user - aggregated on the backend by
+    the badge_daily_stats function (see sql/badge_daily_stats.sql), or locally if
+    the function has not been deployed.
+    """
+    supabase = get_supabase_client()
+    if not supabase:
+        raise ConnectionError("Storage client unavailable")
+    
+    try:
+        return supabase.rpc("badge_daily_stats").execute().data or []
+    except Exception as e:
+        _warn_once("badge_daily_stats", f"badge_daily_stats unavailable ({e}), aggregating workouts locally")
+        return _aggregate_badge_day_rows()
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _evaluate_group_badges(today):
+    """
+    Badge levels and earned dates for every user at once, from the per-day aggregate.
+    Cleared with the leaderboard whenever workouts change (see invalidate_user_cache).
+    Returns (standings, timeline) DataFrames.
+    """
+    rows = _load_badge_day_rows()
+    standings_columns = ['User', 'Badge', 'Name', 'Emoji', 'Value', 'Level', 'Total_Levels']
+    timeline_columns = ['User', 'Badge', 'Name', 'Emoji', 'Level', 'Threshold', 'Earned_Date']
+    if not rows:
+        return pd.DataFrame(columns=standings_columns), pd.DataFrame(columns=timeline_columns)
+    
+    daily = pd.DataFrame(rows, columns=['username', 'day', 'volume'])
+    daily['Day'] = pd.to_datetime(daily['day'], format='ISO8601', errors='coerce')
+    daily['Volume'] = pd.to_numeric(daily['volume'], errors='coerce').fillna(0.0)
+    daily = daily.dropna(subset=['username', 'Day']).sort_values(['username', 'Day'])
+    daily['Ordinal'] = daily['Day'].to_numpy(dtype='datetime64[D]').astype(np.int64) + date(1970, 1, 1).toordinal()
+    
+    users, current_rows, timeline = [], [], []
+    for user, group in daily.groupby('username', sort=True):
+        days = group['Ordinal'].to_numpy()
+        current, running = _badge_metric_series(days, group['Volume'].to_numpy(dtype=float), today)
+        users.append(user)
+        current_rows.append(current)
+        for rule in BADGE_RULES:
+            series = running.get(rule["metric"])
+            if series is None or rule.get("comparison", ">=") != ">=":
+                continue
+            levels = _badge_levels(rule)
+            # Index of the first session day on which each level's threshold was met
+            crossed = np.searchsorted(series, levels, side='left')
+            for level, (threshold, idx) in enumerate(zip(levels, crossed), start=1):
+                if idx < len(days):
+                    timeline.append((user, rule["id"], rule["name"], rule["emoji"], level, threshold, date.fromordinal(int(days[idx]))))
+    
+    metrics = pd.DataFrame(current_rows, index=users)
+    standings = []
+    for rule in BADGE_RULES:
+        values = metrics[rule["metric"]].to_numpy(dtype=float)
+        levels = _badge_level_counts(rule, values)
+        total = len(_badge_levels(rule))
+        standings.extend(
+            (user, rule["id"], rule["name"], rule["emoji"], value, int(level), total)
+            for user, value, level in zip(users, values, levels)
+        )
+    
+    return pd.DataFrame(standings, columns=standings_columns), pd.DataFrame(timeline, columns=timeline_columns)
+
+def load_badge_standings():
+    """
+    Badge standings and earned-date timeline for all users: (standings, timeline) DataFrames.
+    Cached until workouts change, so it costs no extra round trip per render.
+    """
+    try:
+        return _evaluate_group_badges(datetime.now().date())
+    except Exception as e:
+        st.error(f"Error evaluating badges: {e}")
+        return pd.DataFrame(), pd.DataFrame()
+
+def get_bodyweight(user, bundle=None):
     """Get user's bodyweight from bodyweights table"""
+    if bundle is not None:
+        return bundle["bodyweight"]
+    
     try:
         supabase = get_supabase_client()
         if not supabase:
@@ -968,28 +1566,49 @@ def get_bodyweight(user):
     except:
         return 78.0
 
-def get_bodyweight_history(user):
+def _bodyweight_history_frame(rows):
+    """Build the Date/Bodyweight_kg history frame, oldest entry first"""
+    if not rows:
+        return pd.DataFrame()
+    
+    df = _typed_frame(
+        pd.DataFrame(rows).rename(columns={'date': 'Date', 'bodyweight_kg': 'Bodyweight_kg'}),
+        dates=['Date'],
+        floats=['Bodyweight_kg'],
+    )
+    return df[['Date', 'Bodyweight_kg']].sort_values('Date', kind='stable').reset_index(drop=True)
+
+def get_bodyweight_history(user, bundle=None):
     """Get user's bodyweight history over time"""
+    if bundle is not None:
+        return bundle["bodyweight_history"]
+    
     try:
         supabase = get_supabase_client()
         if not supabase:
             return pd.DataFrame()
         
         response = supabase.table("bodyweight_history").select("date, bodyweight_kg").eq("username", user).order("date").execute()
-        if not response.data:
-            return pd.DataFrame()
-        
-        df = pd.DataFrame(response.data)
-        if len(df) > 0:
-            df['date'] = pd.to_datetime(df['date'], errors='coerce')
-            df['bodyweight_kg'] = pd.to_numeric(df['bodyweight_kg'], errors='coerce')
-            df = df.rename(columns={'date': 'Date', 'bodyweight_kg': 'Bodyweight_kg'})
-            return df[['Date', 'Bodyweight_kg']]
-        
-        return pd.DataFrame()
+        return _bodyweight_history_frame(response.data)
     except:
         return pd.DataFrame()
 
+def bodyweight_asof(dates, bw_history, fallback):
+    """
+    Most recent logged bodyweight on or before each date, in one sorted lookup.
+    Dates before the first entry (or missing) get `fallback`.
+    """
+    dates = pd.to_datetime(pd.Series(dates)).to_numpy()
+    history = bw_history.dropna(subset=['Date']) if bw_history is not None and not bw_history.empty else None
+    if history is None or history.empty:
+        return np.full(len(dates), fallback, dtype=float)
+    
+    # History is sorted oldest first; side='right' picks the last entry on a tied date
+    idx = np.searchsorted(history['Date'].to_numpy(), dates, side='right') - 1
+    values = history['Bodyweight_kg'].to_numpy(dtype=float)
+    found = (idx >= 0) & ~np.isnat(dates)
+    return np.where(found, values[np.clip(idx, 0, None)], fallback)
+
 def set_bodyweight(user, bodyweight):
     """Update user's bodyweight in bodyweights table and log history"""
     try:
@@ -1011,7 +1630,7 @@ def set_bodyweight(user, bodyweight):
             "bodyweight_kg": float(bodyweight)
         }).execute()
         
-        _load_table_data.clear()
+        invalidate_user_cache(user, "bodyweights", "bodyweight_history")
         return True
     except Exception as e:
         st.error(f"Error updating bodyweight: {e}")
@@ -1031,54 +1650,87 @@ def get_user_1rms(user, exercise, arm):
         pass
     return float(105 if "Edge" in exercise else 85 if "Pinch" in exercise else 75)
 
-def get_user_1rm(user, exercise, arm):
-    """Get user's 1RM - first try user_profile table, then fall back to workout history"""
-    try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return 0.0
-        
-        # First try user_profile table
-        response = supabase.table("user_profile").select("*").eq("username", user).execute()
-        if response.data:
-            profile = response.data[0]
-            # Map exercise name to profile column
-            key_map = {
-                '20mm Edge': ('20mm', arm.lower()),
-                '14mm Edge': ('14mm', arm.lower()),
-                'Pinch': ('pinch', arm.lower()),
-                'Wrist Roller': ('wrist_roller', arm.lower()),
-            }
-            if exercise in key_map and key_map[exercise]:
-                edge_size, side = key_map[exercise]
-                col_name = f"{side}_{edge_size}_current"
-                value = profile.get(col_name)
-                if value and value > 0:
-                    return float(value)
-    except:
-        pass
+def _profile_1rm_column(exercise, arm):
+    """Name of the user_profile column holding the stored 1RM for an exercise/arm (None if untracked)"""
+    # Edge columns spell the side out, pinch/wrist roller columns abbreviate it
+    key_map = {
+        '20mm Edge': ('20mm', 'left' if arm.upper() == 'L' else 'right'),
+        '14mm Edge': ('14mm', 'left' if arm.upper() == 'L' else 'right'),
+        'Pinch': ('pinch', 'l' if arm.upper() == 'L' else 'r'),
+        'Wrist Roller': ('wrist_roller', 'l' if arm.upper() == 'L' else 'r'),
+    }
+    if exercise not in key_map:
+        return None
+    edge_size, side = key_map[exercise]
+    return f"{side}_{edge_size}_current"
+
+def _stored_1rm_from_profile(profile, exercise, arm):
+    """Read the stored 1RM for an exercise/arm from a user_profile row (0.0 if unset)"""
+    col_name = _profile_1rm_column(exercise, arm)
+    value = profile.get(col_name) if col_name else None
+    if value and value > 0:
+        return float(value)
+    return 0.0
+
+def _strength_inputs(user, bundle=None):
+    """Profile row and workouts frame for the strength maths, from the bundle or the table cache"""
+    if bundle is not None:
+        return bundle["profile"], bundle["workouts"]
+    profile_rows = _fetch_user_rows("user_profile", user)
+    return (profile_rows[0] if profile_rows else {}), load_data_from_sheets(None, user)
+
+def get_strength_matrix(profile, workouts, exercises=None, arms=("L", "R"), weeks=8):
+    """
+    Stored 1RM, best Epley estimate over the last `weeks` and effective working
+    max for every exercise × arm, from one profile row and one workouts frame.
+    Returns a DataFrame indexed by (Exercise, Arm) with columns
+    Stored_1RM, Estimated_1RM and Working_Max.
+    """
+    exercises = list(exercises) if exercises is not None else list(STRENGTH_EXERCISES)
+    index = pd.MultiIndex.from_product([exercises, list(arms)], names=['Exercise', 'Arm'])
+    matrix = pd.DataFrame(0.0, index=index, columns=['Stored_1RM', 'Estimated_1RM', 'Working_Max'])
+    profile = profile or {}
+    
+    if workouts is None or workouts.empty:
+        for exercise, arm in index:
+            stored = _stored_1rm_from_profile(profile, exercise, arm)
+            matrix.loc[(exercise, arm)] = [stored, 0.0, stored]
+        return matrix
+    
+    exercise_names = workouts['Exercise'].astype(str)
+    arm_values = workouts['Arm'].to_numpy()
+    weights = workouts['Actual_Load_kg'].to_numpy(dtype=float)
+    reps = workouts['Reps_Per_Set'].to_numpy(dtype=float, na_value=np.nan)
     
+    cutoff_date = (datetime.now() - timedelta(weeks=weeks)).strftime("%Y-%m-%d")
+    recent = (workouts['Date'] >= pd.Timestamp(cutoff_date)).to_numpy()
+    is_test = exercise_names.str.contains('1RM Test', regex=False).to_numpy()
+    
+    # Epley for every set at once (a single rep is the load itself)
+    epley = np.nan_to_num(np.where(reps == 1, weights, weights * (1 + reps / 30)), nan=0.0)
+    logged = np.nan_to_num(weights, nan=0.0)
+    
+    for exercise in exercises:
+        matches = exercise_names.str.contains(exercise, regex=False).to_numpy()
+        for arm in arms:
+            in_arm = matches & (arm_values == arm)
+            stored = _stored_1rm_from_profile(profile, exercise, arm)
+            if stored <= 0:
+                # Fall back to the heaviest logged load (1RM tests included)
+                stored = float(logged[in_arm].max(initial=0.0))
+            estimated = float(epley[in_arm & recent & ~is_test].max(initial=0.0))
+            matrix.loc[(exercise, arm)] = [stored, estimated, max(stored, estimated)]
+    
+    return matrix
+
+def get_user_1rm(user, exercise, arm, bundle=None):
+    """Get user's 1RM - first try user_profile table, then fall back to workout history"""
     try:
-        # Fall back to workout history - find max weight for this exercise/arm
-        # Look for both exact matches and "1RM Test - " prefixed exercises
-        response = supabase.table("workouts").select("exercise", "weight").eq("username", user).eq("arm", arm).execute()
-        
-        if response.data:
-            # Filter for exercises matching exactly or containing the exercise name
-            weights = []
-            for w in response.data:
-                if w.get('weight') is not None and w.get('weight') > 0:
-                    # Match exact or "1RM Test - Exercise" or just contains exercise name
-                    if w['exercise'] == exercise or w['exercise'] == f"1RM Test - {exercise}" or exercise in w['exercise']:
-                        weights.append(w['weight'])
-            
-            if weights:
-                max_weight = max(weights)
-                return float(max_weight)
+        profile, workouts = _strength_inputs(user, bundle)
+        matrix = get_strength_matrix(profile, workouts, exercises=[exercise], arms=[arm])
+        return float(matrix.at[(exercise, arm), 'Stored_1RM'])
     except:
-        pass
-    
-    return 0.0
+        return 0.0
 
 def set_user_1rm(user, exercise, arm, new_1rm):
     """Update user's 1RM in user_profile table"""
@@ -1089,20 +1741,11 @@ def set_user_1rm(user, exercise, arm, new_1rm):
             return False
         
         # Map exercise name to profile column
-        key_map = {
-            '20mm Edge': ('20mm', 'left' if arm.upper() == 'L' else 'right'),
-            '14mm Edge': ('14mm', 'left' if arm.upper() == 'L' else 'right'),
-            'Pinch': ('pinch', 'l' if arm.upper() == 'L' else 'r'),
-            'Wrist Roller': ('wrist_roller', 'l' if arm.upper() == 'L' else 'r'),
-        }
-        
-        if exercise not in key_map:
-            print(f"ERROR: Exercise '{exercise}' not in key_map. Available: {list(key_map.keys())}")
+        col_name = _profile_1rm_column(exercise, arm)
+        if col_name is None:
+            print(f"ERROR: Exercise '{exercise}' has no 1RM column in user_profile")
             return False
         
-        edge_size, side = key_map[exercise]
-        col_name = f"{side}_{edge_size}_current"
-        
         print(f"DEBUG: Updating {col_name} for user {user} with value {new_1rm}")
         
         # Upsert to user_profile table
@@ -1110,6 +1753,7 @@ def set_user_1rm(user, exercise, arm, new_1rm):
             "username": user,
             col_name: float(new_1rm)
         }, on_conflict="username").execute()
+        invalidate_user_cache(user, "user_profile")
         
         print(f"DEBUG: Update successful for {col_name}")
         return True
@@ -1117,55 +1761,17 @@ def set_user_1rm(user, exercise, arm, new_1rm):
         print(f"ERROR in set_user_1rm: {str(e)}")
         return False
 
-def get_working_max(user, exercise, arm, weeks=8):
+def get_working_max(user, exercise, arm, weeks=8, bundle=None):
     """
     Calculate working max based on recent best performance.
     Returns the higher of: stored 1RM or estimated from recent lifts (last 8 weeks).
     """
-    # Get stored 1RM (baseline from tests)
-    stored_1rm = get_user_1rm(user, exercise, arm)
-    
-    # Get best recent lift and estimate 1RM from it
     try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return stored_1rm
-        
-        cutoff_date = (datetime.now() - timedelta(weeks=weeks)).strftime("%Y-%m-%d")
-        
-        # Query workouts table for recent sets
-        response = supabase.table("workouts").select("*").eq("username", user).eq("arm", arm).gte("date", cutoff_date).execute()
-        
-        if response.data:
-            df = pd.DataFrame(response.data)
-            
-            # Filter for this exercise and exclude 1RM tests
-            df_filtered = df[
-                (df['exercise'].str.contains(exercise, na=False)) &
-                (~df['exercise'].str.contains('1RM Test', na=False))
-            ].copy()
-            
-            if len(df_filtered) > 0:
-                # Convert to numeric - use Supabase column names
-                df_filtered['weight'] = pd.to_numeric(df_filtered['weight'], errors='coerce')
-                df_filtered['reps'] = pd.to_numeric(df_filtered['reps'], errors='coerce')
-                
-                # Calculate estimated 1RM for each set using Epley formula
-                df_filtered['Estimated_1RM'] = df_filtered.apply(
-                    lambda row: estimate_1rm_epley(row['weight'], row['reps']) 
-                    if pd.notna(row['weight']) and pd.notna(row['reps']) else 0,
-                    axis=1
-                )
-                
-                best_estimated = df_filtered['Estimated_1RM'].max()
-                
-                if pd.notna(best_estimated) and best_estimated > 0:
-                    # Return the higher of stored or estimated
-                    return max(stored_1rm, best_estimated)
+        profile, workouts = _strength_inputs(user, bundle)
+        matrix = get_strength_matrix(profile, workouts, exercises=[exercise], arms=[arm], weeks=weeks)
+        return float(matrix.at[(exercise, arm), 'Working_Max'])
     except:
-        pass
-    
-    return stored_1rm
+        return 0.0
 
 # ==================== OBSOLETE GOOGLE SHEETS FUNCTIONS ====================
 # These functions are no longer used after Supabase migration
@@ -1226,6 +1832,7 @@ def add_new_user(username, bodyweight=78.0, pin=None):
         }).execute()
         created_tables.append('user_settings')
         
+        invalidate_user_cache(username, *created_tables)
         return True, f"User '{username}' created successfully! ✅ Profile added to: {', '.join(created_tables)}"
     except Exception as e:
         # Clean up any tables that were created
@@ -1267,6 +1874,8 @@ def delete_user(username):
                 # Continue even if a table doesn't exist or has no data
                 pass
         
+        invalidate_user_cache(username, *tables)
+        
         if deleted_from:
             return True, f"User '{username}' deleted successfully! 🗑️ Removed from: {', '.join(deleted_from)}"
         else:
@@ -1326,29 +1935,90 @@ def calculate_relative_strength(avg_load, bodyweight):
         return avg_load / bodyweight
     return 0
 
+# Calendar day categories, in code order; earlier sources win a day (gym > custom > activity log)
+CALENDAR_CATEGORIES = ("Rest", "Gym", "Custom", "Board", "Climbing", "Work", "Other")
+CALENDAR_SOURCES = ("workouts", "custom_workout_logs", "activity_log")
+
+def user_data_version(user, tables):
+    """Count/max-id of each delta-synced table slice - changes whenever the user's rows do"""
+    store = _delta_sync_store()
+    version = []
+    for table in tables:
+        with _entry_lock((table, user)):
+            entry = store["entries"].get((table, user))
+            version.append((entry["count"], entry["max_id"]) if entry else None)
+    return tuple(version)
+
+def _day_indices(values, start, days):
+    """Day offsets of raw date values from `start`, with a mask of the ones inside the range"""
+    parsed = pd.to_datetime(pd.Series(values, dtype=object), format='ISO8601', errors='coerce')
+    offsets = (parsed.to_numpy(dtype='datetime64[D]') - np.datetime64(start, 'D')).astype(np.int64)
+    inside = parsed.notna().to_numpy() & (offsets >= 0) & (offsets < days)
+    return offsets, inside
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _activity_calendar(user, start, end, data_version):
+    """Categorical day array and per-category day counts for [start, end], cached per data version"""
+    days = (end - start).days + 1
+    present = {}
+    for table in ("workouts", "custom_workout_logs"):
+        offsets, inside = _day_indices([row.get("date") for row in _load_user_table_rows(table, user)], start, days)
+        present[table] = np.bincount(offsets[inside], minlength=days) > 0
+    
+    # First logged activity of each day decides its type
+    activity_rows = _load_user_table_rows("activity_log", user)
+    offsets, inside = _day_indices([row.get("date") for row in activity_rows], start, days)
+    activity_codes = np.array(
+        [
+            # Any named category but Rest (a "Gym" activity is a gym day); unknown types are Other
+            CALENDAR_CATEGORIES.index(kind) if kind in CALENDAR_CATEGORIES[1:] else CALENDAR_CATEGORIES.index("Other")
+            for kind in (row.get("activity_type") for row in activity_rows)
+        ],
+        dtype=np.int8,
+    )
+    first_row = np.full(days, len(activity_rows), dtype=np.int64)
+    np.minimum.at(first_row, offsets[inside], np.flatnonzero(inside))
+    has_activity = first_row < len(activity_rows)
+    
+    codes = np.zeros(days, dtype=np.int8)
+    codes[has_activity] = activity_codes[first_row[has_activity]]
+    codes[present["custom_workout_logs"]] = CALENDAR_CATEGORIES.index("Custom")
+    codes[present["workouts"]] = CALENDAR_CATEGORIES.index("Gym")
+    
+    calendar = pd.Series(
+        pd.Categorical.from_codes(codes, categories=CALENDAR_CATEGORIES),
+        index=pd.date_range(start, end, freq='D'),
+    )
+    counts = dict(zip(CALENDAR_CATEGORIES, np.bincount(codes, minlength=len(CALENDAR_CATEGORIES)).tolist()))
+    return calendar, counts
+
+def load_activity_calendar(user, days=365, end=None):
+    """
+    Training calendar of the last `days` days up to `end` (default today): a Series of
+    CALENDAR_CATEGORIES indexed by date, plus {category: day count} over the same range.
+    """
+    end = end or datetime.now().date()
+    start = end - timedelta(days=days - 1)
+    for table in CALENDAR_SOURCES:
+        _load_user_table_rows(table, user)
+    return _activity_calendar(user, start, end, user_data_version(user, CALENDAR_SOURCES))
+
 def create_heatmap(df):
     """Create training consistency heatmap data"""
     try:
         if len(df) == 0:
             return None
         
-        df_copy = df.copy()
-        df_copy['Date'] = pd.to_datetime(df_copy['Date'])
-        
         end_date = datetime.now()
         start_date = end_date - timedelta(weeks=12)
-        df_filtered = df_copy[(df_copy['Date'] >= start_date) & (df_copy['Date'] <= end_date)]
+        dates = df['Date'][(df['Date'] >= start_date) & (df['Date'] <= end_date)]
         
-        if len(df_filtered) == 0:
+        if len(dates) == 0:
             return None
         
         heatmap_data = np.zeros((7, 12))
-        for _, row in df_filtered.iterrows():
-            date = row['Date']
-            week = min((end_date - date).days // 7, 11)
-            day_of_week = date.weekday()
-            if week < 12 and day_of_week < 7:
-                heatmap_data[day_of_week, 11 - week] += 1
+        weeks = np.minimum((end_date - dates).dt.days.to_numpy() // 7, 11)
+        np.add.at(heatmap_data, (dates.dt.weekday.to_numpy(), 11 - weeks), 1)
         
         return heatmap_data, (start_date, end_date)
     except Exception as e:
@@ -1405,10 +2075,6 @@ def log_activity_to_sheets(user, activity_type, duration_min=None, notes="", ses
     Log a simple activity (Climbing, Board, Work Pullups, or Gym) to activity_log table.
     """
     try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return False
-        
         if session_date is None:
             session_date = datetime.now().date()
         
@@ -1422,38 +2088,38 @@ def log_activity_to_sheets(user, activity_type, duration_min=None, notes="", ses
             "notes": notes or ""
         }
         
-        supabase.table("activity_log").insert(activity_data).execute()
-        _load_table_data.clear()
-        return True
+        return bulk_write(inserts={"activity_log": [activity_data]})
     except Exception as e:
         st.error(f"Error logging activity: {e}")
         return False
 
 
 
+def _activity_frame(rows):
+    """Build the activity log DataFrame with the column names the pages expect"""
+    if not rows:
+        return pd.DataFrame()
+    
+    df = pd.DataFrame(rows)
+    df = df.rename(columns={
+        'username': 'User',
+        'date': 'Date',
+        'activity_type': 'ActivityType',
+        'duration_min': 'DurationMin',
+        'notes': 'Notes'
+    })
+    return _typed_frame(
+        df,
+        dates=['Date'],
+        categories=['User', 'ActivityType'],
+        floats=['DurationMin'],
+        texts=['Notes'],
+    )
+
 def load_activity_log(user=None):
     """Load activity log from activity_log table"""
     try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return pd.DataFrame()
-        
-        query = supabase.table("activity_log").select("*")
-        if user:
-            query = query.eq("username", user)
-        
-        response = query.execute()
-        if response.data:
-            df = pd.DataFrame(response.data)
-            df = df.rename(columns={
-                'username': 'User',
-                'date': 'Date',
-                'activity_type': 'ActivityType',
-                'duration_min': 'DurationMin',
-                'notes': 'Notes'
-            })
-            return df
-        return pd.DataFrame()
+        return _activity_frame(_load_user_table_rows("activity_log", user))
     except Exception as e:
         return pd.DataFrame()
 
@@ -1464,7 +2130,7 @@ def load_custom_workout_templates():
         if not supabase:
             return pd.DataFrame()
         
-        response = supabase.table("custom_workout_templates").select("*").execute()
+        response = supabase.table("custom_workout_templates").select(_table_columns("custom_workout_templates")).execute()
         if response.data:
             df = pd.DataFrame(response.data)
             # Rename columns to match expected format in the page
@@ -1488,46 +2154,46 @@ def load_custom_workout_templates():
     except:
         return pd.DataFrame()
 
+def _custom_logs_frame(rows):
+    """Build the custom workout log DataFrame with the column names the pages expect"""
+    if not rows:
+        # Define empty DataFrame with proper columns
+        return pd.DataFrame(columns=['User', 'Date', 'WorkoutID', 'WorkoutName', 'Weight', 'Sets', 'Reps', 'Duration', 'Distance', 'RPE', 'Notes'])
+    
+    df = pd.DataFrame(rows)
+    # Rename columns to match old format
+    column_map = {
+        'username': 'User',
+        'date': 'Date',
+        'workout_id': 'WorkoutID',
+        'workout_name': 'WorkoutName',
+        'weight_kg': 'Weight',
+        'sets': 'Sets',
+        'reps': 'Reps',
+        'duration_min': 'Duration',
+        'distance_km': 'Distance',
+        'rpe': 'RPE',
+        'notes': 'Notes'
+    }
+    df = df.rename(columns=column_map)
+    return _typed_frame(
+        df,
+        dates=['Date'],
+        categories=['User', 'WorkoutName'],
+        floats=['Weight', 'Duration', 'Distance', 'RPE'],
+        counts=['Sets', 'Reps'],
+        texts=['Notes'],
+    )
+
 def load_custom_workout_logs(user, workout_id=None):
     """Load custom workout logs for a user from custom_workout_logs table"""
-    # Define empty DataFrame with proper columns
-    empty_df = pd.DataFrame(columns=['User', 'Date', 'WorkoutID', 'WorkoutName', 'Weight', 'Sets', 'Reps', 'Duration', 'Distance', 'RPE', 'Notes'])
-    
     try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return empty_df
-        
-        query = supabase.table("custom_workout_logs").select("*").eq("username", user)
+        rows = _load_user_table_rows("custom_workout_logs", user)
         if workout_id:
-            query = query.eq("workout_id", workout_id)
-        
-        response = query.execute()
-        if response.data:
-            df = pd.DataFrame(response.data)
-            # Rename columns to match old format
-            column_map = {
-                'username': 'User',
-                'date': 'Date',
-                'workout_id': 'WorkoutID',
-                'workout_name': 'WorkoutName',
-                'weight_kg': 'Weight',
-                'sets': 'Sets',
-                'reps': 'Reps',
-                'duration_min': 'Duration',
-                'distance_km': 'Distance',
-                'rpe': 'RPE',
-                'notes': 'Notes'
-            }
-            df = df.rename(columns=column_map)
-            
-            if len(df) > 0 and 'Date' in df.columns:
-                df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-            
-            return df
-        return empty_df
+            rows = [row for row in rows if row.get("workout_id") == workout_id]
+        return _custom_logs_frame(rows)
     except:
-        return empty_df
+        return _custom_logs_frame([])
 
 def get_user_custom_workouts(user):
     """Get custom workouts for a specific user"""
@@ -1539,35 +2205,29 @@ def get_user_custom_workouts(user):
 def load_goals(user=None):
     """Load goals from Supabase goals table"""
     try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return pd.DataFrame()
-        
-        query = supabase.table("goals").select("*")
-        if user:
-            query = query.eq("username", user)
-        
-        response = query.execute()
-        if response.data:
-            df = pd.DataFrame(response.data)
-            # Rename columns to match old format but keep id
-            column_map = {
-                'username': 'User',
-                'exercise': 'Exercise',
-                'arm': 'Arm',
-                'target_weight': 'Target_Weight',
-                'completed': 'Completed',
-                'date_set': 'Date_Set',
-                'date_completed': 'Date_Completed'
-            }
-            # Only rename columns that exist
-            df = df.rename(columns={k: v for k, v in column_map.items() if k in df.columns})
-            return df
-        return pd.DataFrame()
+        return _goals_frame(_load_user_table_rows("goals", user))
     except Exception as e:
         st.error(f"Error loading goals: {e}")
         return pd.DataFrame()
 
+def _goals_frame(rows):
+    """Build the goals DataFrame with the legacy column names (keeping id)"""
+    if not rows:
+        return pd.DataFrame()
+    
+    df = pd.DataFrame(rows)
+    column_map = {
+        'username': 'User',
+        'exercise': 'Exercise',
+        'arm': 'Arm',
+        'target_weight': 'Target_Weight',
+        'completed': 'Completed',
+        'date_set': 'Date_Set',
+        'date_completed': 'Date_Completed'
+    }
+    # Only rename columns that exist
+    return df.rename(columns={k: v for k, v in column_map.items() if k in df.columns})
+
 def save_goal(user, exercise, arm, target_weight):
     """Save a new goal to Supabase goals table"""
     try:
@@ -1585,6 +2245,7 @@ def save_goal(user, exercise, arm, target_weight):
             "date_set": today
         }).execute()
         
+        invalidate_user_cache(user, "goals")
         return True
     except Exception as e:
         st.error(f"Error saving goal: {e}")
@@ -1598,11 +2259,12 @@ def complete_goal(goal_id):
             return False
         
         today = datetime.now().strftime("%Y-%m-%d")
-        supabase.table("goals").update({
+        response = supabase.table("goals").update({
             "completed": True,
             "date_completed": today
         }).eq("id", goal_id).execute()
         
+        _invalidate_returned_rows("goals", response.data)
         return True
     except Exception as e:
         st.error(f"Error completing goal: {e}")
@@ -1615,7 +2277,8 @@ def delete_goal(goal_id):
         if not supabase:
             return False
         
-        supabase.table("goals").delete().eq("id", goal_id).execute()
+        response = supabase.table("goals").delete().eq("id", goal_id).execute()
+        _invalidate_returned_rows("goals", response.data)
         return True
     except Exception as e:
         st.error(f"Error deleting goal: {e}")
@@ -1628,7 +2291,8 @@ def delete_workout_entry(workout_id):
         if not supabase:
             return False
         
-        supabase.table("workouts").delete().eq("id", workout_id).execute()
+        response = supabase.table("workouts").delete().eq("id", workout_id).execute()
+        _invalidate_returned_rows("workouts", response.data)
         return True
     except Exception as e:
         st.error(f"Error deleting workout: {e}")
@@ -1641,7 +2305,8 @@ def delete_custom_workout_log(log_id):
         if not supabase:
             return False
         
-        supabase.table("custom_workout_logs").delete().eq("id", log_id).execute()
+        response = supabase.table("custom_workout_logs").delete().eq("id", log_id).execute()
+        _invalidate_returned_rows("custom_workout_logs", response.data)
         return True
     except Exception as e:
         st.error(f"Error deleting custom workout log: {e}")
@@ -1654,7 +2319,8 @@ def delete_activity_log(log_id):
         if not supabase:
             return False
         
-        supabase.table("activity_log").delete().eq("id", log_id).execute()
+        response = supabase.table("activity_log").delete().eq("id", log_id).execute()
+        _invalidate_returned_rows("activity_log", response.data)
         return True
     except Exception as e:
         st.error(f"Error deleting activity log: {e}")
@@ -1665,10 +2331,6 @@ def log_custom_workout(user, workout_id, workout_name, date,
                        distance=None, rpe=None, notes=""):
     """Log a custom workout session"""
     try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return False
-        
         # Generate unique log ID
         log_id = f"{user}_{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
         
@@ -1688,8 +2350,6 @@ def log_custom_workout(user, workout_id, workout_name, date,
             "notes": str(notes) if notes else ""
         }
         
-        supabase.table("custom_workout_logs").insert(log_data).execute()
-        
         # Update activity log
         activity_data = {
             "username": user,
@@ -1697,75 +2357,157 @@ def log_custom_workout(user, workout_id, workout_name, date,
             "activity_type": "Custom Workout",
             "notes": workout_name
         }
-        supabase.table("activity_log").insert(activity_data).execute()
         
-        _load_table_data.clear()
-        return True
+        return bulk_write(inserts={
+            "custom_workout_logs": [log_data],
+            "activity_log": [activity_data],
+        })
     except Exception as e:
         st.error(f"Error logging custom workout: {e}")
         return False
 
 # ==================== USER SETTINGS FOR ENDURANCE TRAINING ====================
 
-def get_user_setting(user, setting_key, default_value=None):
-    """Get a user setting value from user_settings table"""
+# Declared types for stored settings (everything is persisted as text)
+SETTING_TYPES = {
+    "endurance_training_enabled": bool,
+    "weight_units": str,
+    "weekly_goal_1_type": str,
+    "weekly_goal_1_target": int,
+    "weekly_goal_2_type": str,
+    "weekly_goal_2_target": int,
+    "weekly_goal_3_type": str,
+    "weekly_goal_3_target": int,
+    "timer_protocols": str,
+}
+
+def _parse_setting_value(setting_key, raw_value):
+    """Convert a stored setting string back to its declared type"""
+    setting_type = SETTING_TYPES.get(setting_key)
+    if setting_type is None and setting_key.startswith("workout_count_"):
+        setting_type = int
+    
+    if raw_value is None or setting_type in (None, str):
+        return raw_value
+    if setting_type is bool:
+        return str(raw_value).strip().lower() in ("true", "1", "yes")
     try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return default_value
-        
-        response = supabase.table("user_settings").select("setting_value").eq("username", user).eq("setting_key", setting_key).execute()
-        if response.data and len(response.data) > 0:
-            return response.data[0]["setting_value"]
-        return default_value
-    except:
-        return default_value
+        return setting_type(float(raw_value)) if setting_type is int else setting_type(raw_value)
+    except (TypeError, ValueError):
+        return raw_value
+
+def load_user_settings(user):
+    """Load all of a user's settings in one (cached) request as a typed dict"""
+    return _user_settings(user, _fetch_user_rows("user_settings", user))
+
+def _settings_from_rows(rows):
+    """Typed {setting_key: value} dict from raw user_settings rows"""
+    return {
+        row["setting_key"]: _parse_setting_value(row["setting_key"], row.get("setting_value"))
+        for row in rows
+    }
 
-def set_user_setting(user, setting_key, setting_value):
-    """Set a user setting value in user_settings table"""
+def _user_settings(user, rows):
+    """
+    Typed settings from the loaded rows, overlaid with the user's settings
+    still waiting on the write queue (newest last), so a setting saved a
+    moment ago - e.g. a workout count - is read back before it is flushed.
+    """
     try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return False
-        
-        supabase.table("user_settings").upsert({
+        queued = get_write_queue().pending_rows("user_settings", user)
+    except Exception:
+        queued = []
+    return _settings_from_rows(list(rows) + queued)
+
+def get_user_setting(user, setting_key, default_value=None, bundle=None):
+    """Get a user setting value from user_settings table"""
+    settings = bundle["settings"] if bundle is not None else load_user_settings(user)
+    return settings.get(setting_key, default_value)
+
+def _setting_rows(user, settings):
+    """user_settings rows (values stored as text) for a {setting_key: value} dict"""
+    return [
+        {
             "username": user,
             "setting_key": setting_key,
             "setting_value": str(setting_value)
-        }, on_conflict="username,setting_key").execute()
-        
-        _load_table_data.clear()
+        }
+        for setting_key, setting_value in settings.items()
+    ]
+
+def set_user_settings(user, settings, bundle=None):
+    """
+    Write several settings as one bulk upsert (and into the bundle, if given).
+    Like the settings saved with a workout session, they go through the write
+    queue, so settings writes always reach the backend in the order they were made.
+    """
+    if not settings:
         return True
-    except Exception as e:
-        st.error(f"Error setting user setting: {e}")
+    
+    if not bulk_write(upserts={"user_settings": (_setting_rows(user, settings), "username,setting_key")}):
         return False
+    
+    if bundle is not None:
+        bundle["settings"].update({
+            setting_key: _parse_setting_value(setting_key, str(setting_value))
+            for setting_key, setting_value in settings.items()
+        })
+    return True
+
+def set_user_setting(user, setting_key, setting_value, bundle=None):
+    """Set a user setting value in user_settings table (and in the bundle, if given)"""
+    return set_user_settings(user, {setting_key: setting_value}, bundle=bundle)
 
-def get_endurance_training_enabled(user):
+def get_endurance_training_enabled(user, bundle=None):
     """Check if endurance training is enabled for user"""
-    return get_user_setting(user, "endurance_training_enabled", False)
+    return get_user_setting(user, "endurance_training_enabled", False, bundle=bundle)
 
-def set_endurance_training_enabled(user, enabled):
+def set_endurance_training_enabled(user, enabled, bundle=None):
     """Enable or disable endurance training for user"""
-    return set_user_setting(user, "endurance_training_enabled", enabled)
+    return set_user_setting(user, "endurance_training_enabled", enabled, bundle=bundle)
 
-def get_workout_count(user, exercise):
+def get_timer_protocols(user, bundle=None):
+    """A user's saved hangboard timer protocols as {name: protocol dict}"""
+    raw = get_user_setting(user, "timer_protocols", None, bundle=bundle)
+    try:
+        protocols = json.loads(raw) if raw else {}
+    except (TypeError, ValueError):
+        return {}
+    return protocols if isinstance(protocols, dict) else {}
+
+def save_timer_protocol(user, protocol, bundle=None):
+    """Add or replace one of the user's timer protocols (keyed by its name)"""
+    protocols = get_timer_protocols(user, bundle=bundle)
+    protocols[protocol["name"]] = protocol
+    return set_user_setting(user, "timer_protocols", json.dumps(protocols), bundle=bundle)
+
+def delete_timer_protocol(user, name, bundle=None):
+    """Remove one of the user's saved timer protocols"""
+    protocols = get_timer_protocols(user, bundle=bundle)
+    protocols.pop(name, None)
+    return set_user_setting(user, "timer_protocols", json.dumps(protocols), bundle=bundle)
+
+def get_workout_count(user, exercise, bundle=None):
     """Get the workout count for tracking endurance cycles (resets every 3)"""
-    count = get_user_setting(user, f"workout_count_{exercise}", 0)
+    count = get_user_setting(user, f"workout_count_{exercise}", 0, bundle=bundle)
     try:
         return int(count)
     except:
         return 0
 
-def increment_workout_count(user, exercise):
+def next_workout_count(user, exercise, bundle=None):
+    """The workout count the next logged session moves to (cycles 1, 2, 0)"""
+    return (get_workout_count(user, exercise, bundle=bundle) + 1) % 3
+
+def increment_workout_count(user, exercise, bundle=None):
     """Increment workout count and return new count (cycles 1, 2, 0)"""
-    current_count = get_workout_count(user, exercise)
-    new_count = (current_count + 1) % 3
-    set_user_setting(user, f"workout_count_{exercise}", new_count)
+    new_count = next_workout_count(user, exercise, bundle=bundle)
+    set_user_setting(user, f"workout_count_{exercise}", new_count, bundle=bundle)
     return new_count
 
-def is_endurance_workout(user, exercise):
+def is_endurance_workout(user, exercise, bundle=None):
     """Determine if the next workout should be an endurance workout"""
-    if not get_endurance_training_enabled(user):
+    if not get_endurance_training_enabled(user, bundle=bundle):
         return False
     
     # Only apply to 20mm Edge exercise
@@ -1773,18 +2515,18 @@ def is_endurance_workout(user, exercise):
         return False
     
     # Check if we're at the 3rd workout (count == 2, since we count 0,1,2)
-    count = get_workout_count(user, exercise)
+    count = get_workout_count(user, exercise, bundle=bundle)
     return count == 2
 
-def get_weight_units(user):
+def get_weight_units(user, bundle=None):
     """Get user's preferred weight units (kg or lbs)"""
-    units = get_user_setting(user, "weight_units", "kg")
+    units = get_user_setting(user, "weight_units", "kg", bundle=bundle)
     return units if units in ["kg", "lbs"] else "kg"
 
-def set_weight_units(user, units):
+def set_weight_units(user, units, bundle=None):
     """Set user's preferred weight units"""
     if units in ["kg", "lbs"]:
-        return set_user_setting(user, "weight_units", units)
+        return set_user_setting(user, "weight_units", units, bundle=bundle)
     return False
 
 def kg_to_lbs(kg):
@@ -1821,7 +2563,7 @@ def change_user_pin(user, old_pin, new_pin):
             return False, "Database connection error"
         
         # Verify old PIN first
-        response = supabase.table("users").select("*").eq("username", user).execute()
+        response = supabase.table("users").select("pin").eq("username", user).execute()
         
         if not response.data:
             return False, "User not found"
@@ -1838,7 +2580,7 @@ def change_user_pin(user, old_pin, new_pin):
         
         # Update PIN
         supabase.table("users").update({"pin": new_pin}).eq("username", user).execute()
-        _load_table_data.clear()
+        invalidate_user_cache(user, "users")
         return True, "PIN changed successfully"
         
     except Exception as e:
@@ -1945,7 +2687,7 @@ def save_custom_workout_template(username, workout_name, workout_type, descripti
         }
         
         supabase.table("custom_workout_templates").insert(template_data).execute()
-        _load_table_data.clear()
+        invalidate_user_cache(username, "custom_workout_templates")
         return True
     except Exception as e:
         error_msg = str(e)
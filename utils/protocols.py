@@ -0,0 +1,93 @@
+from bisect import bisect_right
+from itertools import accumulate
+
+# Built-in hangboard protocols; users can save their own alongside these
+DEFAULT_PROTOCOLS = {
+    "Repeaters 7/3 × 6": {
+        "name": "Repeaters 7/3 × 6",
+        "prep_seconds": 10,
+        "on_seconds": 7,
+        "off_seconds": 3,
+        "reps": 6,
+        "sets": 1,
+        "set_rest_seconds": 0,
+        "switch_hands": True,
+        "switch_seconds": 10,
+    },
+}
+
+# Fallbacks for fields missing from a saved protocol
+PROTOCOL_DEFAULTS = DEFAULT_PROTOCOLS["Repeaters 7/3 × 6"]
+
+PHASE_STYLES = {
+    "ready": ("🟡 GET READY", "yellow"),
+    "on": ("🟢 LIFT", "#00ff00"),
+    "off": ("🔴 REST", "red"),
+    "switch": ("🔄 SWITCH HANDS", "orange"),
+    "set_rest": ("😮‍💨 REST BETWEEN SETS", "#4facfe"),
+}
+
+
+def normalize_protocol(protocol):
+    """Protocol dict with every field present and sensible (non-negative, at least one rep/set)"""
+    merged = {**PROTOCOL_DEFAULTS, **{k: v for k, v in protocol.items() if v is not None}}
+    for field in ("prep_seconds", "on_seconds", "off_seconds", "set_rest_seconds", "switch_seconds"):
+        merged[field] = max(0, int(merged[field]))
+    merged["on_seconds"] = max(1, merged["on_seconds"])
+    merged["reps"] = max(1, int(merged["reps"]))
+    merged["sets"] = max(1, int(merged["sets"]))
+    merged["switch_hands"] = bool(merged["switch_hands"])
+    merged["name"] = str(merged["name"]).strip() or PROTOCOL_DEFAULTS["name"]
+    return merged
+
+
+def compile_protocol(protocol):
+    """
+    Flatten a protocol into its ordered timed segments plus the cumulative end
+    time of each one, so any moment of the workout is found by bisecting `ends`.
+    """
+    protocol = normalize_protocol(protocol)
+    hands = [("right", "RIGHT HAND"), ("left", "LEFT HAND")] if protocol["switch_hands"] else [(None, "")]
+    reps, sets = protocol["reps"], protocol["sets"]
+    segments = []
+
+    def add(phase, duration, hand="", set_num=None, rep=None):
+        if duration <= 0:
+            return
+        label, color = PHASE_STYLES[phase]
+        header = ""
+        if rep is not None:
+            header = f"{hand} - Round {rep}/{reps}" if hand else f"Round {rep}/{reps}"
+            if sets > 1:
+                header += f" • Set {set_num}/{sets}"
+        segments.append({
+            "phase": phase,
+            "duration": duration,
+            "label": f"{label} - {hand}" if phase == "on" and hand else label,
+            "color": color,
+            "header": header,
+            # Last lift of each hand gets a banner
+            "banner": phase == "on" and rep == reps,
+        })
+
+    add("ready", protocol["prep_seconds"])
+    for set_num in range(1, sets + 1):
+        if set_num > 1:
+            add("set_rest", protocol["set_rest_seconds"])
+        for hand_index, (_, hand) in enumerate(hands):
+            if hand_index > 0:
+                add("switch", protocol["switch_seconds"])
+            for rep in range(1, reps + 1):
+                add("on", protocol["on_seconds"], hand, set_num, rep)
+                add("off", protocol["off_seconds"], hand, set_num, rep)
+
+    ends = list(accumulate(segment["duration"] for segment in segments))
+    return {"protocol": protocol, "segments": segments, "ends": ends, "total": ends[-1] if ends else 0}
+
+
+def phase_at(compiled, elapsed):
+    """(segment, seconds left in it) at `elapsed` seconds into the workout, or (None, 0) once complete"""
+    index = bisect_right(compiled["ends"], elapsed)
+    if index >= len(compiled["segments"]):
+        return None, 0
+    return compiled["segments"][index], compiled["ends"][index] - elapsed
@@ -0,0 +1,417 @@
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+
+# Tables the app uses, with the columns, keys and indexes a local deployment needs.
+# Columns not listed here are added the first time a write carries them, so new
+# fields need no migration; reads of a column that was never written fail instead.
+SQLITE_TABLES = {
+    "users": {
+        "columns": ["username", "pin"],
+        "unique": [("username",)],
+    },
+    "bodyweights": {
+        "columns": ["username", "bodyweight_kg"],
+        "unique": [("username",)],
+    },
+    "bodyweight_history": {
+        "columns": ["username", "date", "bodyweight_kg"],
+        "indexes": [("username", "date")],
+    },
+    "user_profile": {
+        "columns": [
+            "username", "bodyweight_kg",
+            "left_20mm_current", "right_20mm_current", "left_14mm_current", "right_14mm_current",
+            "left_20mm_goal", "right_20mm_goal", "left_14mm_goal", "right_14mm_goal",
+            "l_pinch_current", "r_pinch_current", "l_wrist_roller_current", "r_wrist_roller_current",
+        ],
+        "unique": [("username",)],
+    },
+    "user_settings": {
+        "columns": ["username", "setting_key", "setting_value"],
+        "unique": [("username", "setting_key")],
+    },
+    "workouts": {
+        "columns": [
+            "username", "date", "exercise", "arm", "sets", "reps", "weight", "rpe", "notes", "timestamp", "client_id",
+        ],
+        "auto_timestamp": "timestamp",
+        "unique": [("client_id",)],
+        "indexes": [("username", "exercise", "arm", "date"), ("username", "date")],
+    },
+    "activity_log": {
+        "columns": ["username", "date", "activity_type", "duration_min", "notes", "created_at", "client_id"],
+        "auto_timestamp": "created_at",
+        "unique": [("client_id",)],
+        "indexes": [("username", "date")],
+    },
+    "custom_workout_templates": {
+        "columns": [
+            "username", "workout_name", "workout_type", "description",
+            "tracks_weight", "tracks_sets", "tracks_reps", "tracks_duration", "tracks_distance", "tracks_rpe",
+            "created_at",
+        ],
+        "auto_timestamp": "created_at",
+        "booleans": ["tracks_weight", "tracks_sets", "tracks_reps", "tracks_duration", "tracks_distance", "tracks_rpe"],
+        "indexes": [("username",)],
+    },
+    "custom_workout_logs": {
+        "columns": [
+            "log_id", "username", "workout_id", "workout_name", "date",
+            "weight_kg", "sets", "reps", "duration_min", "distance_km", "rpe", "notes", "created_at",
+        ],
+        "auto_timestamp": "created_at",
+        "unique": [("log_id",)],
+        "indexes": [("username", "workout_id", "date"), ("username", "date")],
+    },
+    "goals": {
+        "columns": ["username", "exercise", "arm", "target_weight", "completed", "date_set", "date_completed"],
+        "booleans": ["completed"],
+        "indexes": [("username", "exercise", "arm")],
+    },
+}
+
+# Local equivalents of the backend functions in sql/, callable through rpc()
+SQLITE_FUNCTIONS = {
+    "leaderboard_stats": """
+        SELECT username, exercise, arm,
+               MAX(CAST(weight AS REAL)) AS max_load,
+               COALESCE(SUM(CAST(weight AS REAL) * CAST(reps AS REAL) * CAST(sets AS REAL)), 0) AS total_volume
+        FROM workouts
+        GROUP BY username, exercise, arm
+    """,
+    "badge_daily_stats": """
+        SELECT username, substr(date, 1, 10) AS day,
+               COALESCE(SUM(CASE WHEN instr(exercise, '1RM Test') > 0 THEN 0
+                                 ELSE CAST(weight AS REAL) * CAST(reps AS REAL) * CAST(sets AS REAL) END), 0) AS volume
+        FROM workouts
+        WHERE username IS NOT NULL AND date IS NOT NULL
+        GROUP BY username, day
+    """,
+}
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _quote(name):
+    """Quote a table/column identifier, rejecting anything that is not a plain name"""
+    if not _IDENTIFIER.match(str(name)):
+        raise ValueError(f"Invalid identifier: {name!r}")
+    return f'"{name}"'
+
+
+# PostgreSQL error code PostgREST reports for a column that does not exist
+UNDEFINED_COLUMN = "42703"
+
+
+class StorageError(Exception):
+    """Backend error with a PostgREST-style `code`, so callers can handle both backends alike"""
+
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+@dataclass
+class StorageResponse:
+    """Result of an executed query - mirrors the `.data` / `.count` shape of the Supabase client"""
+    data: list = field(default_factory=list)
+    count: int = None
+
+
+class SQLiteQuery:
+    """Chainable query on one table, covering the subset of the Supabase builder the app uses"""
+
+    def __init__(self, client, table_name):
+        self._client = client
+        self._table = table_name
+        self._action = "select"
+        self._columns = ["*"]
+        self._count = None
+        self._payload = None
+        self._on_conflict = None
+        self._filters = []
+        self._order = []
+        self._limit = None
+        self._offset = None
+
+    # ----- actions -----
+    def select(self, columns="*", count=None):
+        self._action = "select"
+        self._columns = [c.strip() for c in columns.split(",") if c.strip()] or ["*"]
+        self._count = count
+        return self
+
+    def insert(self, data):
+        self._action = "insert"
+        self._payload = data if isinstance(data, list) else [data]
+        return self
+
+    def upsert(self, data, on_conflict=""):
+        self._action = "upsert"
+        self._payload = data if isinstance(data, list) else [data]
+        self._on_conflict = [c.strip() for c in on_conflict.split(",") if c.strip()]
+        return self
+
+    def update(self, data):
+        self._action = "update"
+        self._payload = data
+        return self
+
+    def delete(self):
+        self._action = "delete"
+        return self
+
+    # ----- filters and modifiers -----
+    def _filter(self, column, operator, value):
+        self._filters.append((column, operator, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, "=", value)
+
+    def neq(self, column, value):
+        return self._filter(column, "!=", value)
+
+    def gt(self, column, value):
+        return self._filter(column, ">", value)
+
+    def gte(self, column, value):
+        return self._filter(column, ">=", value)
+
+    def lt(self, column, value):
+        return self._filter(column, "<", value)
+
+    def lte(self, column, value):
+        return self._filter(column, "<=", value)
+
+    def in_(self, column, values):
+        return self._filter(column, "IN", list(values))
+
+    def order(self, column, desc=False):
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size):
+        self._limit = int(size)
+        return self
+
+    def range(self, start, end):
+        self._offset = int(start)
+        self._limit = int(end) - int(start) + 1
+        return self
+
+    def execute(self):
+        return self._client._execute(self)
+
+
+class SQLiteRPC:
+    """Pending rpc() call - executes on .execute() like the Supabase builder"""
+
+    def __init__(self, client, sql, params):
+        self._client = client
+        self._sql = sql
+        self._params = params
+
+    def execute(self):
+        return self._client._execute_rpc(self._sql, self._params)
+
+
+class SQLiteClient:
+    """
+    Local storage backend exposing the same table API as the Supabase client.
+    One connection is shared between script threads and serialized by a lock.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._known_columns = {}
+        for table_name in SQLITE_TABLES:
+            self._ensure_table(table_name)
+
+    def table(self, table_name):
+        return SQLiteQuery(self, table_name)
+
+    def rpc(self, name, params=None):
+        """Call a local function from SQLITE_FUNCTIONS; `params` bind as named parameters"""
+        if name not in SQLITE_FUNCTIONS:
+            raise ValueError(f"Unknown function: {name}")
+        return SQLiteRPC(self, SQLITE_FUNCTIONS[name], params or {})
+
+    def _execute_rpc(self, sql, params):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            return StorageResponse(data=[dict(row) for row in cursor.fetchall()])
+
+    # ----- schema -----
+    def _ensure_table(self, table_name):
+        """Create a table (plus its declared keys and indexes) the first time it is touched"""
+        if table_name in self._known_columns:
+            return
+        spec = SQLITE_TABLES.get(table_name, {})
+        table = _quote(table_name)
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY AUTOINCREMENT)")
+        self._known_columns[table_name] = {
+            row["name"] for row in self._conn.execute(f"PRAGMA table_info({table})")
+        }
+        self._ensure_columns(table_name, spec.get("columns", []))
+        for columns in spec.get("unique", []):
+            self._ensure_index(table_name, columns, unique=True)
+        for columns in spec.get("indexes", []):
+            self._ensure_index(table_name, columns)
+
+    def _ensure_columns(self, table_name, columns):
+        """Add any missing (untyped) columns so values round-trip with their Python types"""
+        known = self._known_columns[table_name]
+        for column in columns:
+            if column != "*" and column not in known:
+                self._conn.execute(f"ALTER TABLE {_quote(table_name)} ADD COLUMN {_quote(column)}")
+                known.add(column)
+
+    def _require_columns(self, table_name, columns):
+        """Fail like the hosted backend (42703) when a read or filter names an unknown column"""
+        known = self._known_columns[table_name]
+        for column in columns:
+            if column != "*" and column not in known:
+                raise StorageError(f"column {table_name}.{column} does not exist", code=UNDEFINED_COLUMN)
+
+    def _ensure_index(self, table_name, columns, unique=False):
+        self._ensure_columns(table_name, columns)
+        name = f"{'ux' if unique else 'ix'}_{table_name}_{'_'.join(columns)}"
+        self._conn.execute(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {_quote(name)} "
+            f"ON {_quote(table_name)} ({', '.join(_quote(c) for c in columns)})"
+        )
+
+    # ----- execution -----
+    def _where(self, query):
+        clauses, params = [], []
+        for column, operator, value in query._filters:
+            if operator == "IN":
+                if not value:
+                    clauses.append("0")
+                    continue
+                clauses.append(f"{_quote(column)} IN ({', '.join('?' * len(value))})")
+                params.extend(self._to_sql(v) for v in value)
+            else:
+                clauses.append(f"{_quote(column)} {operator} ?")
+                params.append(self._to_sql(value))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    @staticmethod
+    def _to_sql(value):
+        if isinstance(value, bool):
+            return int(value)
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        return value
+
+    def _rows(self, table_name, cursor):
+        booleans = SQLITE_TABLES.get(table_name, {}).get("booleans", [])
+        rows = [dict(row) for row in cursor.fetchall()]
+        for row in rows:
+            for column in booleans:
+                if row.get(column) is not None:
+                    row[column] = bool(row[column])
+        return rows
+
+    def _execute(self, query):
+        table_name = query._table
+        referenced = [c for c, _, _ in query._filters] + [c for c, _ in query._order]
+        with self._lock:
+            self._ensure_table(table_name)
+            self._require_columns(table_name, referenced)
+            handler = getattr(self, f"_run_{query._action}")
+            return handler(query)
+
+    def _run_select(self, query):
+        table_name = query._table
+        self._require_columns(table_name, query._columns)
+        table = _quote(table_name)
+        where, params = self._where(query)
+        columns = "*" if "*" in query._columns else ", ".join(_quote(c) for c in query._columns)
+        sql = f"SELECT {columns} FROM {table}{where}"
+        if query._order:
+            sql += " ORDER BY " + ", ".join(f"{_quote(c)} {'DESC' if desc else 'ASC'}" for c, desc in query._order)
+        if query._limit is not None or query._offset is not None:
+            sql += f" LIMIT {query._limit if query._limit is not None else -1} OFFSET {query._offset or 0}"
+        data = self._rows(table_name, self._conn.execute(sql, params))
+
+        count = None
+        if query._count:
+            count = self._conn.execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+        return StorageResponse(data=data, count=count)
+
+    def _run_insert(self, query, conflict_clause=None):
+        table_name = query._table
+        rows = query._payload or []
+        if not rows:
+            return StorageResponse()
+        timestamp_column = SQLITE_TABLES.get(table_name, {}).get("auto_timestamp")
+        if timestamp_column:
+            # Mirror the server-side `default now()` of the hosted schema
+            now = datetime.now().isoformat()
+            rows = [{timestamp_column: now, **row} for row in rows]
+        columns = list(dict.fromkeys(c for row in rows for c in row))
+        self._ensure_columns(table_name, columns)
+        sql = (
+            f"INSERT INTO {_quote(table_name)} ({', '.join(_quote(c) for c in columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))})"
+        )
+        if conflict_clause:
+            sql += conflict_clause(columns)
+        sql += " RETURNING *"
+
+        data = []
+        self._conn.execute("BEGIN")
+        try:
+            for row in rows:
+                cursor = self._conn.execute(sql, [self._to_sql(row.get(c)) for c in columns])
+                data.extend(self._rows(table_name, cursor))
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return StorageResponse(data=data)
+
+    def _run_upsert(self, query):
+        table_name = query._table
+        target = query._on_conflict or list(SQLITE_TABLES.get(table_name, {}).get("unique", [("id",)])[0])
+        if target != ["id"]:
+            self._ensure_index(table_name, target, unique=True)
+
+        def conflict_clause(columns):
+            updates = [c for c in columns if c not in target]
+            if not updates:
+                return f" ON CONFLICT ({', '.join(_quote(c) for c in target)}) DO NOTHING"
+            assignments = ", ".join(f"{_quote(c)} = excluded.{_quote(c)}" for c in updates)
+            return f" ON CONFLICT ({', '.join(_quote(c) for c in target)}) DO UPDATE SET {assignments}"
+
+        return self._run_insert(query, conflict_clause)
+
+    def _run_update(self, query):
+        table_name = query._table
+        values = query._payload or {}
+        if not values:
+            return StorageResponse()
+        self._ensure_columns(table_name, list(values))
+        where, params = self._where(query)
+        assignments = ", ".join(f"{_quote(c)} = ?" for c in values)
+        cursor = self._conn.execute(
+            f"UPDATE {_quote(table_name)} SET {assignments}{where} RETURNING *",
+            [self._to_sql(v) for v in values.values()] + params,
+        )
+        return StorageResponse(data=self._rows(table_name, cursor))
+
+    def _run_delete(self, query):
+        table_name = query._table
+        where, params = self._where(query)
+        cursor = self._conn.execute(f"DELETE FROM {_quote(table_name)}{where} RETURNING *", params)
+        return StorageResponse(data=self._rows(table_name, cursor))
@@ -0,0 +1,269 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+# Retry delays grow 2s, 4s, 8s, ... up to five minutes between attempts
+RETRY_BASE_SECONDS = 2
+RETRY_MAX_SECONDS = 300
+# A write still failing after this many attempts (about eight minutes of backoff) is parked as failed
+MAX_ATTEMPTS = 8
+# Upper bound on how long the worker sleeps before re-checking the queue
+IDLE_POLL_SECONDS = 30
+# SQLSTATE classes no retry can fix: data exception, integrity violation, syntax error / undefined object
+PERMANENT_SQLSTATE_CLASSES = ("22", "23", "42")
+# PostgREST request (PGRST1xx) and schema-cache (PGRST2xx) errors
+PERMANENT_POSTGREST_PREFIXES = ("PGRST1", "PGRST2")
+
+
+def is_permanent_error(error):
+    """Whether a failed write can never succeed as queued (bad payload, constraint or schema error)"""
+    if isinstance(error, (sqlite3.IntegrityError, sqlite3.ProgrammingError, ValueError, TypeError, KeyError)):
+        return True
+    code = str(getattr(error, "code", None) or "")
+    return code[:2] in PERMANENT_SQLSTATE_CLASSES or code.startswith(PERMANENT_POSTGREST_PREFIXES)
+
+
+def _batch_username(rows):
+    """The user a batch belongs to, or None if its rows span several users"""
+    usernames = {row.get("username") for row in rows}
+    return usernames.pop() if len(usernames) == 1 else None
+
+
+class WriteQueue:
+    """
+    Persistent write-behind queue.
+    Writes are stored in a local SQLite file and return immediately; a daemon
+    thread applies them through `apply_fn(op, table_name, rows, on_conflict)`.
+    Each user's writes reach the backend in the order they were logged: a write
+    that fails transiently is retried with exponential backoff and holds back
+    only that user's later writes. A write that fails permanently, or is still
+    failing after MAX_ATTEMPTS, moves to `failed_writes` so the rest of the
+    queue keeps draining; the user can retry or discard it from there.
+    Pending writes survive a restart and are flushed when the worker starts.
+    """
+
+    def __init__(self, path, apply_fn):
+        self._apply = apply_fn
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pending_writes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                op TEXT NOT NULL,
+                table_name TEXT NOT NULL,
+                rows TEXT NOT NULL,
+                on_conflict TEXT,
+                username TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL DEFAULT 0,
+                last_error TEXT,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS failed_writes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                op TEXT NOT NULL,
+                table_name TEXT NOT NULL,
+                rows TEXT NOT NULL,
+                on_conflict TEXT,
+                username TEXT,
+                attempts INTEGER NOT NULL,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                failed_at REAL NOT NULL
+            )
+            """
+        )
+        self._migrate()
+        self._flushed = Counter()
+        self._worker = threading.Thread(target=self._run, name="write-queue", daemon=True)
+        self._worker.start()
+
+    def _migrate(self):
+        """Add the username column to queue files written before writes were tracked per user"""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(pending_writes)")}
+        if "username" in columns:
+            return
+        self._conn.execute("ALTER TABLE pending_writes ADD COLUMN username TEXT")
+        for write_id, rows in self._conn.execute("SELECT id, rows FROM pending_writes").fetchall():
+            self._conn.execute(
+                "UPDATE pending_writes SET username = ? WHERE id = ?",
+                (_batch_username(json.loads(rows)), write_id),
+            )
+
+    def enqueue(self, op, table_name, rows, on_conflict=None):
+        """Persist one batched insert/upsert and wake the worker"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO pending_writes (op, table_name, rows, on_conflict, username, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (op, table_name, json.dumps(rows, default=str), on_conflict, _batch_username(rows), time.time()),
+            )
+        self._wake.set()
+
+    def pending_rows(self, table_name, username):
+        """Rows of a user's writes to a table that are still queued, oldest first"""
+        with self._lock:
+            pending = self._conn.execute(
+                "SELECT rows FROM pending_writes WHERE table_name = ? AND username IS ? ORDER BY id",
+                (table_name, username),
+            ).fetchall()
+        return [row for (rows,) in pending for row in json.loads(rows)]
+
+    def retry_now(self, username=None):
+        """Clear the backoff on a user's pending writes (all users' if None) and flush immediately"""
+        with self._lock:
+            if username is None:
+                self._conn.execute("UPDATE pending_writes SET next_attempt = 0")
+            else:
+                self._conn.execute("UPDATE pending_writes SET next_attempt = 0 WHERE username IS ?", (username,))
+        self._wake.set()
+
+    def status(self, username=None):
+        """
+        One user's pending and failed counts, writes flushed since start, and the
+        current error/backoff if any. Without a username, covers the whole queue.
+        """
+        scope, params = ("WHERE username IS ?", (username,)) if username is not None else ("", ())
+        with self._lock:
+            pending = self._conn.execute(f"SELECT COUNT(*) FROM pending_writes {scope}", params).fetchone()[0]
+            head = self._conn.execute(
+                f"SELECT attempts, last_error, next_attempt FROM pending_writes {scope} ORDER BY id LIMIT 1", params
+            ).fetchone()
+            failed = self._conn.execute(f"SELECT COUNT(*) FROM failed_writes {scope}", params).fetchone()[0]
+        attempts, last_error, next_attempt = head if head else (0, None, 0)
+        return {
+            "pending": pending,
+            "failed": failed,
+            "flushed": self._flushed[username] if username is not None else sum(self._flushed.values()),
+            "attempts": attempts,
+            "last_error": last_error,
+            "retry_in": max(0.0, next_attempt - time.time()),
+        }
+
+    def failed_writes(self, username):
+        """A user's parked writes, oldest first, as dicts (id, table_name, row_count, attempts, last_error, failed_at)"""
+        with self._lock:
+            failed = self._conn.execute(
+                "SELECT id, table_name, rows, attempts, last_error, failed_at "
+                "FROM failed_writes WHERE username IS ? ORDER BY id",
+                (username,),
+            ).fetchall()
+        return [
+            {
+                "id": failed_id,
+                "table_name": table_name,
+                "row_count": len(json.loads(rows)),
+                "attempts": attempts,
+                "last_error": last_error,
+                "failed_at": failed_at,
+            }
+            for failed_id, table_name, rows, attempts, last_error, failed_at in failed
+        ]
+
+    def retry_failed(self, failed_id):
+        """Move a parked write back onto the queue with a fresh set of attempts"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT INTO pending_writes (op, table_name, rows, on_conflict, username, created_at) "
+                    "SELECT op, table_name, rows, on_conflict, username, created_at FROM failed_writes WHERE id = ?",
+                    (failed_id,),
+                )
+                self._conn.execute("DELETE FROM failed_writes WHERE id = ?", (failed_id,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._wake.set()
+
+    def discard_failed(self, failed_id):
+        """Drop a parked write for good"""
+        with self._lock:
+            self._conn.execute("DELETE FROM failed_writes WHERE id = ?", (failed_id,))
+
+    def _park(self, write_id, attempts, error):
+        """Move a write that cannot succeed from the queue to failed_writes"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT INTO failed_writes "
+                    "(op, table_name, rows, on_conflict, username, attempts, last_error, created_at, failed_at) "
+                    "SELECT op, table_name, rows, on_conflict, username, ?, ?, created_at, ? "
+                    "FROM pending_writes WHERE id = ?",
+                    (attempts, str(error), time.time(), write_id),
+                )
+                self._conn.execute("DELETE FROM pending_writes WHERE id = ?", (write_id,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def flush(self):
+        """
+        One pass over the queue, oldest first. Returns seconds until the next
+        pending write is due, or None once the queue is empty.
+        """
+        with self._lock:
+            pending = self._conn.execute(
+                "SELECT id, op, table_name, rows, on_conflict, username, attempts, next_attempt "
+                "FROM pending_writes ORDER BY id"
+            ).fetchall()
+
+        # Users with an earlier write still waiting - their later writes must wait too
+        held = set()
+        for write_id, op, table_name, rows, on_conflict, username, attempts, next_attempt in pending:
+            if username in held:
+                continue
+            if next_attempt > time.time():
+                held.add(username)
+                continue
+
+            try:
+                self._apply(op, table_name, json.loads(rows), on_conflict)
+            except Exception as e:
+                attempts += 1
+                if is_permanent_error(e) or attempts >= MAX_ATTEMPTS:
+                    self._park(write_id, attempts, e)
+                    continue
+                delay = min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+                with self._lock:
+                    self._conn.execute(
+                        "UPDATE pending_writes SET attempts = ?, next_attempt = ?, last_error = ? WHERE id = ?",
+                        (attempts, time.time() + delay, str(e), write_id),
+                    )
+                held.add(username)
+                continue
+
+            with self._lock:
+                self._conn.execute("DELETE FROM pending_writes WHERE id = ?", (write_id,))
+            self._flushed[username] += 1
+
+        # Only each user's oldest write can be due next; the ones behind it wait for it
+        with self._lock:
+            pending_count, next_attempt = self._conn.execute(
+                "SELECT COUNT(*), MIN(next_attempt) FROM pending_writes "
+                "WHERE id IN (SELECT MIN(id) FROM pending_writes GROUP BY username)"
+            ).fetchone()
+        if not pending_count:
+            return None
+        return max(0.0, next_attempt - time.time())
+
+    def _run(self):
+        while True:
+            try:
+                wait = self.flush()
+            except Exception:
+                wait = RETRY_BASE_SECONDS
+            self._wake.wait(timeout=min(wait if wait is not None else IDLE_POLL_SECONDS, IDLE_POLL_SECONDS))
+            self._wake.clear()